@@ -1,8 +1,9 @@
 from django.contrib import admin
 from .models import (
     Paciente, Medico, Especialidade,
-    Consulta, Prontuario, Exame, Convenio
+    Consulta, Prontuario, Exame, Convenio, CID
 )
+from .busca import buscar_cids, buscar_pacientes
 
 # ===============================================================
 # CONVÊNIOS
@@ -29,6 +30,31 @@ class PacienteAdmin(admin.ModelAdmin):
     search_fields = ('nome', 'cpf', 'email')
     list_filter = ('data_nascimento', 'criado_em', 'atualizado_em')
 
+    def get_search_results(self, request, queryset, search_term):
+        # nome/CPF pelos índices de busca; e-mail só por igualdade
+        if not search_term:
+            return queryset, False
+
+        if "@" in search_term:
+            return queryset.filter(email__iexact=search_term.strip()), False
+
+        return buscar_pacientes(search_term, queryset), False
+
+
+# ===============================================================
+# CID-10
+# ===============================================================
+
+@admin.register(CID)
+class CIDAdmin(admin.ModelAdmin):
+    list_display = ('codigo', 'descricao')
+    search_fields = ('codigo', 'descricao')
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return buscar_cids(search_term, queryset), False
+
 
 # ===============================================================
 # ESPECIALIDADES
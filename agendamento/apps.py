@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AgendamentoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'agendamento'
+
+    def ready(self):
+        # contador de não lidas, publicação para o stream SSE, resumo da agenda
+        # e invalidação do cache de dados de referência
+        from . import eventos, notificacoes, referencias, resumo_agenda  # noqa: F401
@@ -0,0 +1,145 @@
+# ===============================================================
+# AUTOCOMPLETE (TYPEAHEAD)
+# ===============================================================
+#
+# Os formulários não renderizam mais <select> com todos os médicos,
+# especialidades ou usuários: o campo traz só a opção escolhida e as
+# demais vêm destes endpoints conforme o usuário digita.
+#
+# Pacientes usam a busca indexada do banco (agendamento/busca.py). Para
+# médicos, especialidades, usuários e o catálogo CID cada processo mantém
+# um índice de prefixos em memória — lista ordenada de (palavra, id)
+# consultada com bisect —, refeito a cada AUTOCOMPLETE_TTL segundos (o
+# catálogo CID, que quase nunca muda, a cada hora).
+
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from .busca import ORDEM_BUSCA, buscar_pacientes, normalizar, palavras
+from .models import CID, Especialidade, Medico, formatar_cid
+
+LIMITE_RESULTADOS = 10
+
+
+# ===============================================================
+# ÍNDICE DE PREFIXOS
+# ===============================================================
+
+class IndicePrefixos:
+    """
+    Busca por prefixo de cada palavra do texto, sem acento nem caixa.
+    Itens são (id, texto) ou (id, texto, palavras extras para a busca).
+    """
+
+    def __init__(self, itens):
+        self.textos = {}
+        entradas = []
+
+        for pk, texto, *extras in itens:
+            self.textos[pk] = texto
+            busca = " ".join([texto, *extras])
+            entradas.extend((palavra, pk) for palavra in set(palavras(busca)))
+
+        entradas.sort()
+        self.palavras = [palavra for palavra, _ in entradas]
+        self.ids = [pk for _, pk in entradas]
+
+    def com_prefixo(self, prefixo):
+        inicio = bisect_left(self.palavras, prefixo)
+        fim = bisect_left(self.palavras, prefixo + "\uffff")
+        return set(self.ids[inicio:fim])
+
+    def buscar(self, termo, limite=LIMITE_RESULTADOS):
+        """[(id, texto)] cujo texto tem uma palavra começando com cada termo."""
+        termos = palavras(termo)
+        if not termos:
+            return []
+
+        ids = set.intersection(*(self.com_prefixo(t) for t in termos))
+        encontrados = sorted(ids, key=lambda pk: (normalizar(self.textos[pk]), pk))
+
+        return [(pk, self.textos[pk]) for pk in encontrados[:limite]]
+
+
+# ===============================================================
+# FONTES
+# ===============================================================
+
+def _especialidades():
+    return Especialidade.objects.values_list("id", "nome")
+
+
+def _medicos():
+    # mesmo texto de Medico.__str__, que é o rótulo da opção no formulário
+    for pk, nome, sobrenome, especialidade in Medico.objects.values_list(
+        "id", "user__first_name", "user__last_name", "especialidade__nome"
+    ):
+        yield pk, f"{nome} {sobrenome}".strip() + f" ({especialidade})"
+
+
+def _usuarios():
+    for pk, username, nome, sobrenome in User.objects.filter(is_active=True).values_list(
+        "id", "username", "first_name", "last_name"
+    ):
+        completo = f"{nome} {sobrenome}".strip()
+        yield pk, f"{username} — {completo}" if completo else username
+
+
+def _cids():
+    # "J45.0 — Asma ..." também é achado por "j450"
+    for pk, codigo, descricao in CID.objects.values_list("id", "codigo", "descricao"):
+        yield pk, f"{formatar_cid(codigo)} — {descricao}", codigo
+
+
+FONTES = {
+    "especialidades": _especialidades,
+    "medicos": _medicos,
+    "usuarios": _usuarios,
+    "cids": _cids,
+}
+
+# segundos de validade por fonte; as demais usam AUTOCOMPLETE_TTL
+VALIDADE = {"cids": 3600}
+
+TIPOS = ("pacientes", *FONTES)
+
+_indices = {}
+
+
+def indice(nome):
+    """Índice em memória da fonte `nome`, refeito quando passa de AUTOCOMPLETE_TTL."""
+    agora = time.monotonic()
+    validade = VALIDADE.get(nome, getattr(settings, "AUTOCOMPLETE_TTL", 60))
+    atual = _indices.get(nome)
+
+    if atual is None or agora - atual[0] >= validade:
+        atual = (agora, IndicePrefixos(FONTES[nome]()))
+        _indices[nome] = atual
+
+    return atual[1]
+
+
+def limpar_indices():
+    _indices.clear()
+
+
+# ===============================================================
+# BUSCA
+# ===============================================================
+
+def sugestoes_pacientes(termo, limite=LIMITE_RESULTADOS):
+    pacientes = buscar_pacientes(termo).order_by(*ORDEM_BUSCA).values_list("id", "nome", "cpf")[:limite]
+    return [(pk, f"{nome} — {cpf}" if cpf else nome) for pk, nome, cpf in pacientes]
+
+
+def sugestoes(tipo, termo, limite=LIMITE_RESULTADOS):
+    """[{"id", "texto"}] para o tipo ("pacientes" ou uma das FONTES)."""
+    if tipo == "pacientes":
+        itens = sugestoes_pacientes(termo, limite)
+    else:
+        itens = indice(tipo).buscar(termo, limite)
+
+    return [{"id": pk, "texto": texto} for pk, texto in itens]
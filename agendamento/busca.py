@@ -0,0 +1,214 @@
+# ===============================================================
+# BUSCA DE PACIENTES
+# ===============================================================
+#
+# Paciente tem duas colunas geradas pelo banco: `nome_busca` (minúsculas,
+# sem acentos) e `cpf_digitos` (só os números). A busca:
+#   - só dígitos → prefixo de cpf_digitos (btree varchar_pattern_ops);
+#   - texto → prefixos de palavra no full-text "simple" de nome_busca
+#     ("jose conc" acha "José da Conceição"), pelo índice GIN;
+#   - com pg_trgm instalado, também por similaridade de trigramas, que
+#     tolera erros de digitação ("jose conseicao").
+# O resultado vem com `relevancia` (0–1000) para ordenar e paginar.
+# O catálogo CID usa o mesmo esquema (código por prefixo, descrição por
+# palavras).
+#
+# Prontuários têm a coluna gerada `busca` (tsvector "portuguese" dos
+# campos clínicos, com pesos) e índice GIN. A consulta aceita a sintaxe
+# de buscador ("dor toracica" -febre, "entre aspas") e os trechos
+# destacados são calculados só para os itens da página.
+
+import re
+from functools import lru_cache
+
+from django.contrib.postgres.search import (
+    SearchHeadline, SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+)
+from django.db import connection
+from django.db.models import F, Func, IntegerField, Q, TextField, Value
+from django.db.models.functions import Cast
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import ACENTOS, CAMPOS_CLINICOS, CID, SEM_ACENTOS, Paciente, Prontuario, normalizar_cid
+
+MIN_DIGITOS_CPF = 3
+
+ORDEM_BUSCA = ("-relevancia", "nome", "id")
+ORDEM_BUSCA_PRONTUARIOS = ("-relevancia", "-criado_em", "-id")
+ORDEM_BUSCA_CID = ("-relevancia", "codigo", "id")
+
+# delimitadores do ts_headline, trocados por <mark> depois de escapar o texto
+_INICIO_DESTAQUE = "\x02"
+_FIM_DESTAQUE = "\x03"
+
+_SEM_ACENTOS = str.maketrans(ACENTOS, SEM_ACENTOS)
+
+
+# ===============================================================
+# NORMALIZAÇÃO DO TERMO
+# ===============================================================
+
+def normalizar(texto):
+    """Mesma transformação de SemAcentos, em Python."""
+    return texto.translate(_SEM_ACENTOS).lower()
+
+
+def palavras(texto):
+    return re.findall(r"[a-z0-9]+", normalizar(texto))
+
+
+def so_digitos(texto):
+    return re.sub(r"\D", "", texto)
+
+
+def parece_cpf(termo):
+    """Só dígitos e pontuação de CPF, com ao menos MIN_DIGITOS_CPF números."""
+    return bool(re.fullmatch(r"[\d.\-\s]+", termo)) and len(so_digitos(termo)) >= MIN_DIGITOS_CPF
+
+
+@lru_cache(maxsize=None)
+def trigramas_disponiveis():
+    """True se a extensão pg_trgm está instalada no banco (verificado uma vez por processo)."""
+    if connection.vendor != "postgresql":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+# ===============================================================
+# BUSCA
+# ===============================================================
+
+def busca_por_palavras(queryset, campo, termo):
+    """
+    Filtra `campo` (coluna normalizada com SemAcentos e índice GIN
+    "simple") por prefixos de palavra — e por trigramas, se houver
+    pg_trgm — anotando `relevancia`.
+    """
+    termos = palavras(termo)
+    if not termos:
+        return queryset.none().annotate(relevancia=Value(0, output_field=IntegerField()))
+
+    # mesma expressão dos índices *_busca_fts_idx
+    vetor = SearchVector(campo, config="simple")
+    consulta = SearchQuery(" & ".join(f"{t}:*" for t in termos), search_type="raw", config="simple")
+
+    filtro = Q(vetor_busca=consulta)
+    relevancia = SearchRank(vetor, consulta)
+
+    if trigramas_disponiveis():
+        normalizado = " ".join(termos)
+        filtro |= Q(**{f"{campo}__trigram_word_similar": normalizado})
+        relevancia = TrigramWordSimilarity(normalizado, campo)
+
+    return (
+        queryset
+        .alias(vetor_busca=vetor)
+        .filter(filtro)
+        .annotate(relevancia=Cast(relevancia * 1000, IntegerField()))
+    )
+
+
+def buscar_pacientes(termo, pacientes=None):
+    """
+    Pacientes que casam com `termo` (nome ou CPF), anotados com
+    `relevancia`; ordene com ORDEM_BUSCA.
+    """
+    pacientes = Paciente.objects.all() if pacientes is None else pacientes
+    termo = (termo or "").strip()
+
+    if parece_cpf(termo):
+        return pacientes.filter(cpf_digitos__startswith=so_digitos(termo)).annotate(
+            relevancia=Value(1000, output_field=IntegerField())
+        )
+
+    return busca_por_palavras(pacientes, "nome_busca", termo)
+
+
+def parece_codigo_cid(termo):
+    """Letra seguida de dígitos, com ou sem ponto: "J4", "J45.0", "j450"."""
+    return bool(re.fullmatch(r"[A-Za-z]\d{1,2}(\.?\d{0,2})?", termo))
+
+
+def buscar_cids(termo, cids=None):
+    """CIDs pelo prefixo do código ou por palavras da descrição; ordene com ORDEM_BUSCA_CID."""
+    cids = CID.objects.all() if cids is None else cids
+    termo = (termo or "").strip()
+
+    if parece_codigo_cid(termo):
+        return cids.filter(codigo__startswith=normalizar_cid(termo)).annotate(
+            relevancia=Value(1000, output_field=IntegerField())
+        )
+
+    return busca_por_palavras(cids, "descricao_busca", termo)
+
+
+# ===============================================================
+# BUSCA EM PRONTUÁRIOS
+# ===============================================================
+
+def consulta_clinica(termo):
+    """Consulta "portuguese" com o termo como digitado ou sem acentos."""
+    return (
+        SearchQuery(termo, search_type="websearch", config="portuguese")
+        | SearchQuery(normalizar(termo), search_type="websearch", config="portuguese")
+    )
+
+
+def buscar_prontuarios(termo, prontuarios=None):
+    """
+    Prontuários cujo texto clínico casa com `termo`, anotados com
+    `relevancia`; ordene com ORDEM_BUSCA_PRONTUARIOS. Recebe o queryset
+    já restrito ao que o usuário pode ver.
+    """
+    prontuarios = Prontuario.objects.all() if prontuarios is None else prontuarios
+    consulta = consulta_clinica(termo)
+
+    return (
+        prontuarios
+        .filter(busca=consulta)
+        .annotate(relevancia=Cast(SearchRank(F("busca"), consulta) * 1000, IntegerField()))
+    )
+
+
+class TextoClinico(Func):
+    """concat_ws(' · ', campos clínicos) — texto onde os trechos são procurados."""
+    function = "CONCAT_WS"
+    output_field = TextField()
+
+    def __init__(self):
+        campos = [campo for grupo in CAMPOS_CLINICOS.values() for campo in grupo]
+        super().__init__(Value(" · "), *campos)
+
+
+def destacar_trechos(prontuarios, termo):
+    """Define `trecho` (HTML seguro, termos em <mark>) em cada prontuário da página."""
+    prontuarios = list(prontuarios)
+    if not prontuarios:
+        return
+
+    trechos = dict(
+        Prontuario.objects
+        .filter(pk__in=[p.pk for p in prontuarios])
+        .annotate(trecho=SearchHeadline(
+            TextoClinico(),
+            consulta_clinica(termo),
+            config="portuguese",
+            start_sel=_INICIO_DESTAQUE,
+            stop_sel=_FIM_DESTAQUE,
+            max_fragments=2,
+            max_words=25,
+            min_words=10,
+            fragment_delimiter=" … ",
+        ))
+        .values_list("pk", "trecho")
+    )
+
+    for prontuario in prontuarios:
+        texto = escape(trechos.get(prontuario.pk) or "")
+        prontuario.trecho = mark_safe(
+            texto.replace(_INICIO_DESTAQUE, "<mark>").replace(_FIM_DESTAQUE, "</mark>")
+        )
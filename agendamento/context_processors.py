@@ -0,0 +1,40 @@
+# ===============================================================
+# CONTEXT PROCESSORS
+# ===============================================================
+#
+# `usuario` disponibiliza em todo template renderizado com request o que o
+# menu de base.html precisa — flags de papel, foto do perfil e o total de
+# notificações não lidas. Os valores são preguiçosos: só consultam algo
+# se o template os usar, e o badge já vem no HTML, sem o fetch inicial de
+# notificacoes_count.
+
+from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import SimpleLazyObject
+
+from .notificacoes import nao_lidas_em_cache
+from .papeis import is_medico, is_usuario_padrao, papeis
+
+
+def _foto_perfil_url(user):
+    if not papeis(user)["paciente"]:
+        return ""
+
+    foto = user.perfil_paciente.foto
+    return foto.url if foto else ""
+
+
+def _notificacoes_nao_lidas(user):
+    return nao_lidas_em_cache(user.pk) if user.is_authenticated else 0
+
+
+def usuario(request):
+    user = getattr(request, "user", None)
+    if user is None:
+        user = AnonymousUser()
+
+    return {
+        "is_usuario_padrao": SimpleLazyObject(lambda: is_usuario_padrao(user)),
+        "is_medico_user": SimpleLazyObject(lambda: is_medico(user)),
+        "foto_perfil_url": SimpleLazyObject(lambda: _foto_perfil_url(user)),
+        "notificacoes_nao_lidas": SimpleLazyObject(lambda: _notificacoes_nao_lidas(user)),
+    }
@@ -0,0 +1,21 @@
+# ===============================================================
+# CONVERSÃO HTML → PDF (xhtml2pdf)
+# ===============================================================
+#
+# Único módulo que importa o xhtml2pdf. Não importe daqui no topo de
+# outros módulos: pdf.html_para_pdf o carrega na primeira conversão.
+
+import io
+
+from xhtml2pdf import pisa
+
+
+def converter(html):
+    """Bytes do PDF gerado a partir do HTML."""
+    saida = io.BytesIO()
+    resultado = pisa.CreatePDF(io.BytesIO(html.encode("utf-8")), dest=saida)
+
+    if resultado.err:
+        raise RuntimeError(f"xhtml2pdf falhou com {resultado.err} erro(s).")
+
+    return saida.getvalue()
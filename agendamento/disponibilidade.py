@@ -0,0 +1,336 @@
+# ===============================================================
+# DISPONIBILIDADE — MOTOR DE HORÁRIOS EM BITMAP
+# ===============================================================
+#
+# Cada dia da agenda de um médico é um inteiro em que o bit ``i``
+# representa o bloco de RESOLUCAO_MINUTOS que começa ``i * RESOLUCAO_MINUTOS``
+# minutos após a meia-noite (horário local). Consultas ativas ligam os
+# bits dos blocos que ocupam; os horários livres saem de operações de
+# bits sobre esse inteiro, sem laços de datetime nem formatação de strings.
+
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+
+from django.utils import timezone
+
+from .models import CONSTRAINT_SOBREPOSICAO, Consulta, ResumoAgendaDia
+
+
+# ===============================================================
+# CONSTANTES
+# ===============================================================
+
+RESOLUCAO_MINUTOS = 5
+MINUTOS_DIA = 24 * 60
+BLOCOS_DIA = MINUTOS_DIA // RESOLUCAO_MINUTOS
+DIA_COMPLETO = (1 << BLOCOS_DIA) - 1
+
+SLOT_MINUTOS = 30
+STATUS_ATIVOS = ("agendada", "confirmada")
+
+HORA_INICIO_PADRAO = time(8, 0)
+HORA_FIM_PADRAO = time(17, 0)
+
+
+# ===============================================================
+# FUNÇÕES AUXILIARES
+# ===============================================================
+
+def expediente_medico(medico):
+    """Retorna (hora_inicio, hora_fim) do médico, com o padrão da clínica."""
+    return (
+        medico.hora_inicio or HORA_INICIO_PADRAO,
+        medico.hora_fim or HORA_FIM_PADRAO,
+    )
+
+
+def minutos_do_dia(valor):
+    """Minutos desde a meia-noite de um time/datetime."""
+    return valor.hour * 60 + valor.minute
+
+
+def formatar_minutos(minutos):
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def bits_intervalo(inicio_min, fim_min):
+    """Bitmap dos blocos que intersectam [inicio_min, fim_min)."""
+    inicio_min = max(inicio_min, 0)
+    fim_min = min(fim_min, MINUTOS_DIA)
+
+    if fim_min <= inicio_min:
+        return 0
+
+    primeiro = inicio_min // RESOLUCAO_MINUTOS
+    ultimo = -(-fim_min // RESOLUCAO_MINUTOS)  # arredonda para cima
+
+    return ((1 << (ultimo - primeiro)) - 1) << primeiro
+
+
+@lru_cache(maxsize=256)
+def mascara_slots(hora_inicio, hora_fim, slot_minutos=SLOT_MINUTOS):
+    """Bits ligados no início de cada slot do expediente."""
+    # início alinhado à resolução para que o bit represente o horário exato
+    atual = -(-minutos_do_dia(hora_inicio) // RESOLUCAO_MINUTOS) * RESOLUCAO_MINUTOS
+    fim = minutos_do_dia(hora_fim)
+
+    mascara = 0
+    while atual < fim:
+        mascara |= 1 << (atual // RESOLUCAO_MINUTOS)
+        atual += slot_minutos
+
+    return mascara
+
+
+def inicios_livres(livre, duracao):
+    """Bit ``j`` ligado se os blocos de ``j`` até ``j + duracao`` estão livres."""
+    blocos = -(-duracao // RESOLUCAO_MINUTOS)
+
+    corrida = livre
+    for deslocamento in range(1, blocos):
+        corrida &= livre >> deslocamento
+
+    return corrida
+
+
+def bits_para_horarios(bits):
+    """Converte um bitmap de inícios em ['HH:MM', ...] em ordem crescente."""
+    horarios = []
+    while bits:
+        menor = bits & -bits
+        horarios.append(formatar_minutos((menor.bit_length() - 1) * RESOLUCAO_MINUTOS))
+        bits ^= menor
+    return horarios
+
+
+def primeiro_horario(bits):
+    """Horário 'HH:MM' do menor bit ligado, ou None."""
+    if not bits:
+        return None
+    return formatar_minutos(((bits & -bits).bit_length() - 1) * RESOLUCAO_MINUTOS)
+
+
+def inicio_do_dia(data):
+    """Meia-noite (aware) da data no fuso atual."""
+    return timezone.make_aware(datetime.combine(data, time.min))
+
+
+# ===============================================================
+# AGENDA DE UM DIA
+# ===============================================================
+
+class AgendaDia:
+    """Ocupação de um médico em um dia, representada como bitmap."""
+
+    __slots__ = ("data", "hora_inicio", "hora_fim", "ocupado")
+
+    def __init__(self, data, hora_inicio, hora_fim, ocupado=0):
+        self.data = data
+        self.hora_inicio = hora_inicio
+        self.hora_fim = hora_fim
+        self.ocupado = ocupado
+
+    def ocupar(self, inicio_min, duracao):
+        self.ocupado |= bits_intervalo(inicio_min, inicio_min + duracao)
+
+    @property
+    def mascara(self):
+        return mascara_slots(self.hora_inicio, self.hora_fim)
+
+    @property
+    def livres(self):
+        """Bitmap dos inícios de slot que comportam uma consulta de SLOT_MINUTOS."""
+        livre = DIA_COMPLETO & ~self.ocupado
+        return inicios_livres(livre, SLOT_MINUTOS) & self.mascara
+
+    def slots(self):
+        """Todos os horários do expediente, livres ou não."""
+        return bits_para_horarios(self.mascara)
+
+    def horarios(self):
+        """Horários livres do dia."""
+        return bits_para_horarios(self.livres)
+
+    @property
+    def total_slots(self):
+        return self.mascara.bit_count()
+
+    @property
+    def total_livres(self):
+        return self.livres.bit_count()
+
+    def primeiro_livre(self):
+        return primeiro_horario(self.livres)
+
+    def comporta(self, inicio_min, duracao):
+        """True se [inicio_min, inicio_min + duracao) não colide com nenhuma consulta."""
+        return not self.ocupado & bits_intervalo(inicio_min, inicio_min + duracao)
+
+
+# ===============================================================
+# CARREGAMENTO DAS AGENDAS
+# ===============================================================
+
+def ocupacoes(medico_ids, inicio, fim, excluir_pk=None):
+    """(medico_id, data_hora, duracao) das consultas ativas em [inicio, fim)."""
+    qs = Consulta.objects.filter(
+        medico_id__in=medico_ids,
+        data_hora__gte=inicio,
+        data_hora__lt=fim,
+        status__in=STATUS_ATIVOS,
+    )
+
+    if excluir_pk:
+        qs = qs.exclude(pk=excluir_pk)
+
+    return qs.order_by().values_list("medico_id", "data_hora", "duracao_minutos")
+
+
+def medicos_com_ocupacao(medico_ids, data_inicio, data_fim):
+    """
+    IDs (subquery, não avaliada) dos médicos com minutos ocupados no
+    período segundo o ResumoAgendaDia.
+    """
+    return (
+        ResumoAgendaDia.objects
+        .filter(
+            medico_id__in=medico_ids,
+            data__gte=data_inicio,
+            data__lte=data_fim,
+            minutos_ocupados__gt=0,
+        )
+        .values("medico_id")
+    )
+
+
+def agendas_do_periodo(medicos, data_inicio, data_fim, excluir_pk=None, pelo_resumo=False):
+    """
+    Agendas de vários médicos entre data_inicio e data_fim (inclusive),
+    montadas com uma única consulta: {medico_id: {data: AgendaDia}}.
+
+    Com pelo_resumo=True, a mesma consulta só procura em Consulta os
+    médicos que o ResumoAgendaDia aponta com horários ocupados no período
+    (semi-join na tabela pequena); os demais ficam com a agenda vazia.
+    Serve para exibir disponibilidade — a validação de um agendamento
+    continua lendo só Consulta.
+    """
+    dias = [
+        data_inicio + timedelta(days=i)
+        for i in range((data_fim - data_inicio).days + 1)
+    ]
+
+    agendas = {}
+    for medico in medicos:
+        hora_inicio, hora_fim = expediente_medico(medico)
+        agendas[medico.pk] = {
+            dia: AgendaDia(dia, hora_inicio, hora_fim) for dia in dias
+        }
+
+    if not agendas or not dias:
+        return agendas
+
+    medico_ids = list(agendas)
+    if pelo_resumo:
+        medico_ids = medicos_com_ocupacao(medico_ids, data_inicio, data_fim)
+
+    linhas = ocupacoes(
+        medico_ids,
+        inicio_do_dia(data_inicio),
+        inicio_do_dia(data_fim + timedelta(days=1)),
+        excluir_pk,
+    )
+
+    for medico_id, data_hora, duracao in linhas:
+        local = timezone.localtime(data_hora)
+        agenda = agendas[medico_id].get(local.date())
+
+        if agenda is not None:
+            agenda.ocupar(minutos_do_dia(local), duracao or SLOT_MINUTOS)
+
+    return agendas
+
+
+def agenda_do_dia(medico, data, excluir_pk=None):
+    """Agenda de um único médico em um dia."""
+    return agendas_do_periodo([medico], data, data, excluir_pk)[medico.pk][data]
+
+
+def horario_livre(medico, data_hora, duracao=SLOT_MINUTOS, excluir_pk=None):
+    """True se o médico não tem consulta ativa sobreposta ao intervalo pedido."""
+    local = timezone.localtime(data_hora)
+    agenda = agenda_do_dia(medico, local.date(), excluir_pk)
+    return agenda.comporta(minutos_do_dia(local), duracao or SLOT_MINUTOS)
+
+
+def conflito_de_horario(erro):
+    """True se o IntegrityError veio da constraint de sobreposição de consultas."""
+    return CONSTRAINT_SOBREPOSICAO in str(erro)
+
+
+def sobreposicoes(linhas):
+    """
+    Consultas ativas que colidem com outra do mesmo médico, a partir de
+    (id, medico_id, data_hora, duracao) ordenadas por médico, data_hora e id:
+    [(id_excedente, id_mantido)]. Fica a que começa antes (ou a mais antiga).
+    """
+    excedentes = []
+    medico_atual = mantida = fim_mantida = None
+
+    for pk, medico_id, data_hora, duracao in linhas:
+        if not duracao:
+            continue  # intervalo vazio: a constraint não o considera
+
+        fim = data_hora + timedelta(minutes=duracao)
+
+        if medico_id == medico_atual and data_hora < fim_mantida:
+            excedentes.append((pk, mantida))
+            continue
+
+        medico_atual, mantida, fim_mantida = medico_id, pk, fim
+
+    return excedentes
+
+
+def consultas_sobrepostas():
+    """[(id_excedente, id_mantido)] das consultas ativas que violam a constraint de sobreposição."""
+    linhas = (
+        Consulta.objects
+        .filter(status__in=STATUS_ATIVOS)
+        .order_by("medico_id", "data_hora", "id")
+        .values_list("id", "medico_id", "data_hora", "duracao_minutos")
+    )
+    return sobreposicoes(linhas.iterator())
+
+
+# ===============================================================
+# CALENDÁRIO — RESUMO DE VÁRIOS DIAS
+# ===============================================================
+
+def calendario(medicos, data_inicio, data_fim, hoje=None):
+    """
+    Resumo diário de um ou vários médicos entre data_inicio e data_fim:
+    total de slots livres e primeiro horário livre em qualquer um deles.
+    Dias passados aparecem sem horários.
+    """
+    agendas = agendas_do_periodo(medicos, data_inicio, data_fim, pelo_resumo=True)
+    hoje = hoje or timezone.localdate()
+
+    dias = []
+    for i in range((data_fim - data_inicio).days + 1):
+        dia = data_inicio + timedelta(days=i)
+        uniao = 0
+        total = 0
+
+        if dia >= hoje:
+            for por_dia in agendas.values():
+                livres = por_dia[dia].livres
+                uniao |= livres
+                total += livres.bit_count()
+
+        dias.append({
+            "data": dia.isoformat(),
+            "livres": total,
+            "primeiro": primeiro_horario(uniao),
+        })
+
+    return dias
@@ -0,0 +1,190 @@
+# ===============================================================
+# ESTATÍSTICAS DO DASHBOARD
+# ===============================================================
+#
+# Os contadores da página inicial saem de no máximo duas consultas:
+#   - agregação condicional sobre Consulta (total e por status);
+#   - um UNION ALL com um COUNT por tabela para os demais números.
+# As listas "pendentes/confirmadas/canceladas" vêm de uma única
+# consulta com ROW_NUMBER() particionado por status.
+#
+# Os contadores podem ser servidos de cache por DASHBOARD_CACHE_SEGUNDOS
+# (0 desliga), com chave por papel e usuário.
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, F, Q, Value, Window
+from django.db.models.functions import RowNumber
+
+from .models import CID, CodigoCID, Consulta, Especialidade, Exame, Medico, Paciente, Prontuario, formatar_cid
+
+STATUS_DASHBOARD = ("agendada", "confirmada", "cancelada")
+LIMITE_POR_STATUS = 10
+
+
+# ===============================================================
+# FUNÇÕES AUXILIARES
+# ===============================================================
+
+def contar_tabelas(**querysets):
+    """{nome: COUNT(*)} de vários querysets em uma única consulta (UNION ALL)."""
+    partes = [
+        qs.order_by()
+        .annotate(chave=Value(nome, output_field=CharField()))
+        .values("chave")
+        .annotate(total=Count("pk"))
+        .values_list("chave", "total")
+        for nome, qs in querysets.items()
+    ]
+
+    if not partes:
+        return {}
+
+    return dict(partes[0].union(*partes[1:], all=True))
+
+
+def contar_consultas(consultas):
+    """Total e totais por status em uma agregação condicional."""
+    return consultas.order_by().aggregate(
+        total_consultas=Count("id"),
+        total_pendentes=Count("id", filter=Q(status="agendada")),
+        total_confirmadas=Count("id", filter=Q(status="confirmada")),
+        total_canceladas=Count("id", filter=Q(status="cancelada")),
+        total_pacientes_medico=Count("paciente", distinct=True),
+    )
+
+
+def consultas_por_status(consultas, limite=LIMITE_POR_STATUS):
+    """As `limite` primeiras consultas de cada status do dashboard, em uma consulta."""
+    linhas = (
+        consultas
+        .filter(status__in=STATUS_DASHBOARD)
+        .annotate(posicao=Window(RowNumber(), partition_by=F("status"), order_by=F("data_hora").asc()))
+        .filter(posicao__lte=limite)
+        .order_by("status", "data_hora")
+    )
+
+    grupos = {status: [] for status in STATUS_DASHBOARD}
+    for consulta in linhas:
+        grupos[consulta.status].append(consulta)
+
+    return grupos
+
+
+# ===============================================================
+# CONTADORES POR PAPEL
+# ===============================================================
+
+def _estatisticas_medico(usuario):
+    medico = usuario.perfil_medico
+    consultas = Consulta.objects.filter(medico=medico)
+    pacientes_ids = consultas.values("paciente_id")
+
+    outros = contar_tabelas(
+        prontuarios=Prontuario.objects.filter(paciente__in=pacientes_ids),
+        exames=Exame.objects.filter(prontuario__paciente__in=pacientes_ids),
+    )
+
+    return {
+        **contar_consultas(consultas),
+        "total_prontuarios": outros["prontuarios"],
+        "total_exames": outros["exames"],
+    }
+
+
+def _estatisticas_paciente(usuario):
+    paciente = getattr(usuario, "perfil_paciente", None)
+
+    if paciente is None:
+        return {"total_consultas": 0, "total_prontuarios": 0, "total_exames": 0}
+
+    totais = contar_tabelas(
+        consultas=Consulta.objects.filter(paciente=paciente),
+        prontuarios=Prontuario.objects.filter(paciente=paciente),
+        exames=Exame.objects.filter(prontuario__paciente=paciente),
+    )
+
+    return {f"total_{nome}": total for nome, total in totais.items()}
+
+
+def _estatisticas_secretaria(usuario):
+    totais = contar_tabelas(
+        pacientes=Paciente.objects.all(),
+        medicos=Medico.objects.all(),
+        especialidades=Especialidade.objects.all(),
+        prontuarios=Prontuario.objects.all(),
+        exames=Exame.objects.all(),
+    )
+
+    return {
+        **contar_consultas(Consulta.objects.all()),
+        **{f"total_{nome}": total for nome, total in totais.items()},
+    }
+
+
+CALCULOS = {
+    "medico": _estatisticas_medico,
+    "paciente": _estatisticas_paciente,
+    "secretaria": _estatisticas_secretaria,
+}
+
+
+def chave_cache(papel, usuario):
+    # os números da secretaria são globais — a mesma entrada serve toda a equipe
+    return "dashboard:secretaria" if papel == "secretaria" else f"dashboard:{papel}:{usuario.pk}"
+
+
+def estatisticas_dashboard(papel, usuario):
+    """
+    Contadores da página inicial para o papel ("medico", "paciente" ou
+    "secretaria"), lidos do cache quando DASHBOARD_CACHE_SEGUNDOS > 0.
+    """
+    calcular = CALCULOS[papel]
+    segundos = getattr(settings, "DASHBOARD_CACHE_SEGUNDOS", 0)
+
+    if not segundos:
+        return calcular(usuario)
+
+    return cache.get_or_set(chave_cache(papel, usuario), lambda: calcular(usuario), segundos)
+
+
+# ===============================================================
+# RELATÓRIO — DIAGNÓSTICOS POR CID
+# ===============================================================
+
+def diagnosticos_por_cid(prontuarios):
+    """
+    Total de prontuários por (CID, médico) em uma agregação; o CID
+    digitado é normalizado ("j45.0" e "J450" contam juntos) e a
+    descrição vem do catálogo.
+    """
+    linhas = list(
+        prontuarios
+        .exclude(cid__isnull=True)
+        .exclude(cid="")
+        .order_by()
+        .annotate(codigo=CodigoCID("cid"))
+        .values("codigo", "medico__first_name", "medico__last_name", "medico__username")
+        .annotate(total=Count("id"))
+        .order_by("-total", "codigo")
+    )
+
+    descricoes = dict(
+        CID.objects
+        .filter(codigo__in={linha["codigo"] for linha in linhas})
+        .values_list("codigo", "descricao")
+    )
+
+    return [
+        {
+            "cid": formatar_cid(linha["codigo"]),
+            "descricao": descricoes.get(linha["codigo"], ""),
+            "medico": (
+                f"{linha['medico__first_name'] or ''} {linha['medico__last_name'] or ''}".strip()
+                or linha["medico__username"]
+                or "—"
+            ),
+            "total": linha["total"],
+        }
+        for linha in linhas
+    ]
@@ -0,0 +1,167 @@
+# ===============================================================
+# EVENTOS — PUB/SUB DE NOTIFICAÇÕES PARA O STREAM SSE
+# ===============================================================
+#
+# Cada conexão SSE assina uma fila asyncio do seu usuário. Quando uma
+# Notificacao é criada, o ID é publicado após o commit:
+#
+#   - "postgres": pg_notify no canal CANAL; uma única thread por processo
+#     faz LISTEN e repassa às filas locais (funciona com vários workers);
+#   - "local": entrega direta às filas do próprio processo (dev/testes).
+#
+# A conexão do LISTEN vem do backend do Django, então usa o mesmo driver
+# que ele (psycopg 3 quando instalado, senão psycopg2); `receber` trata
+# as duas APIs de notificação.
+
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Notificacao
+
+logger = logging.getLogger(__name__)
+
+CANAL = "agendamento_notificacoes"
+
+
+def backend():
+    return getattr(settings, "NOTIFICACOES_PUBSUB", "local")
+
+
+# ===============================================================
+# BROKER — FILAS POR USUÁRIO NO PROCESSO
+# ===============================================================
+
+class Broker:
+    """Filas asyncio por usuário; `entregar` pode ser chamado de qualquer thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assinantes = defaultdict(set)
+
+    def assinar(self, usuario_id, loop, fila):
+        with self._lock:
+            self._assinantes[usuario_id].add((loop, fila))
+
+    def cancelar(self, usuario_id, loop, fila):
+        with self._lock:
+            assinantes = self._assinantes.get(usuario_id)
+            if assinantes:
+                assinantes.discard((loop, fila))
+                if not assinantes:
+                    del self._assinantes[usuario_id]
+
+    def entregar(self, usuario_id, notificacao_id):
+        with self._lock:
+            assinantes = list(self._assinantes.get(usuario_id, ()))
+
+        for loop, fila in assinantes:
+            try:
+                loop.call_soon_threadsafe(fila.put_nowait, notificacao_id)
+            except RuntimeError:
+                # loop já encerrado — a conexão será descartada no finally do stream
+                pass
+
+
+broker = Broker()
+
+
+# ===============================================================
+# OUVINTE POSTGRESQL — LISTEN EM UMA THREAD POR PROCESSO
+# ===============================================================
+
+class OuvintePostgres(threading.Thread):
+    daemon = True
+
+    def __init__(self, alias="default"):
+        super().__init__(name="ouvinte-notificacoes")
+        self.alias = alias
+
+    def conectar(self):
+        wrapper = connections[self.alias]
+        conexao = wrapper.get_new_connection(wrapper.get_connection_params())
+        conexao.autocommit = True
+        with conexao.cursor() as cursor:
+            cursor.execute(f"LISTEN {CANAL}")
+        return conexao
+
+    def run(self):
+        while True:
+            try:
+                conexao = self.conectar()
+                self.escutar(conexao)
+            except Exception:
+                logger.exception("Ouvinte de notificações caiu; reconectando.")
+                time.sleep(5)
+
+    def escutar(self, conexao, espera=30):
+        while True:
+            for payload in self.receber(conexao, espera):
+                self.despachar(payload)
+
+    def receber(self, conexao, espera):
+        """Payloads à medida que chegam, por até `espera` segundos, no driver que o Django usa."""
+        if is_psycopg3:
+            for aviso in conexao.notifies(timeout=espera):
+                yield aviso.payload
+            return
+
+        # psycopg2: espera o socket e esvazia a lista de avisos
+        if select.select([conexao], [], [], espera) == ([], [], []):
+            return
+
+        conexao.poll()
+        while conexao.notifies:
+            yield conexao.notifies.pop(0).payload
+
+    def despachar(self, payload):
+        try:
+            dados = json.loads(payload)
+            broker.entregar(dados["usuario"], dados["id"])
+        except (ValueError, KeyError):
+            logger.warning("Payload inválido no canal %s: %r", CANAL, payload)
+
+
+_ouvinte = None
+_ouvinte_lock = threading.Lock()
+
+
+def garantir_ouvinte():
+    """Inicia (uma vez por processo) a thread de LISTEN, se o backend for postgres."""
+    global _ouvinte
+
+    if backend() != "postgres" or _ouvinte is not None:
+        return
+
+    with _ouvinte_lock:
+        if _ouvinte is None:
+            _ouvinte = OuvintePostgres()
+            _ouvinte.start()
+
+
+# ===============================================================
+# PUBLICAÇÃO
+# ===============================================================
+
+def publicar(usuario_id, notificacao_id):
+    if backend() == "postgres" and connection.vendor == "postgresql":
+        payload = json.dumps({"usuario": usuario_id, "id": notificacao_id})
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CANAL, payload])
+    else:
+        broker.entregar(usuario_id, notificacao_id)
+
+
+@receiver(post_save, sender=Notificacao)
+def publicar_notificacao(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publicar(instance.usuario_id, instance.pk))
@@ -0,0 +1,299 @@
+# ===============================================================
+# EXPORTAÇÃO EM LOTE
+# ===============================================================
+#
+# Prontuários → ZIP de PDFs, escrito em fluxo: cada PDF entra no arquivo
+# assim que fica pronto e os bytes já produzidos são entregues (resposta
+# HTTP ou arquivo em disco) sem acumular o ZIP em memória.
+#
+# O HTML de cada prontuário é montado no processo principal (que tem o
+# banco); só a conversão HTML → PDF, a parte cara, vai para um pool de
+# processos, com no máximo `janela` documentos em andamento.
+#
+# Consultas por convênio → CSV para o faturamento: as linhas saem de
+# values_list().iterator() (cursor no servidor, sem instanciar modelos)
+# e o CSV é gerado em blocos, então a memória não cresce com o volume.
+
+import csv
+import io
+import multiprocessing
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import django
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .disponibilidade import inicio_do_dia
+from .models import STATUS_CHOICES, Consulta, Prontuario
+from .pdf import html_para_pdf, html_prontuario
+
+
+# ===============================================================
+# FILTROS
+# ===============================================================
+
+def ler_filtros(dados):
+    """
+    Converte paciente/medico/convenio (IDs) e inicio/fim (AAAA-MM-DD) de um
+    dict (request.GET ou opções do comando). ValueError se inválido.
+    """
+    filtros = {}
+
+    for campo in ("paciente", "medico", "convenio"):
+        valor = dados.get(campo)
+        if valor not in (None, ""):
+            filtros[campo] = int(valor)
+
+    for campo in ("inicio", "fim"):
+        valor = dados.get(campo)
+        if valor not in (None, ""):
+            filtros[campo] = datetime.strptime(str(valor), "%Y-%m-%d").date()
+
+    if "inicio" in filtros and "fim" in filtros and filtros["fim"] < filtros["inicio"]:
+        raise ValueError("A data final é anterior à inicial.")
+
+    return filtros
+
+
+def ler_filtros_consultas(dados):
+    """ler_filtros() mais o status da consulta."""
+    filtros = ler_filtros(dados)
+
+    status = dados.get("status")
+    if status not in (None, ""):
+        if status not in dict(STATUS_CHOICES):
+            raise ValueError(f"Status desconhecido: {status}.")
+        filtros["status"] = status
+
+    return filtros
+
+
+def filtrar_prontuarios(paciente=None, medico=None, convenio=None, inicio=None, fim=None):
+    """Prontuários do filtro, com o que o PDF exibe já carregado, em ordem de criação."""
+    qs = Prontuario.objects.select_related(
+        "paciente__convenio", "medico__perfil_medico"
+    )
+
+    if paciente:
+        qs = qs.filter(paciente_id=paciente)
+    if medico:
+        qs = qs.filter(medico__perfil_medico__id=medico)
+    if convenio:
+        qs = qs.filter(paciente__convenio_id=convenio)
+    if inicio:
+        qs = qs.filter(criado_em__gte=inicio_do_dia(inicio))
+    if fim:
+        qs = qs.filter(criado_em__lt=inicio_do_dia(fim + timedelta(days=1)))
+
+    return qs.order_by("criado_em", "id")
+
+
+# ===============================================================
+# POOL DE PROCESSOS
+# ===============================================================
+
+def processos_padrao():
+    return getattr(settings, "EXPORTACAO_PROCESSOS", 2)
+
+
+def converter_em_lote(documentos, funcao=None, processos=None, janela=None):
+    """
+    Aplica `funcao` ao conteúdo de cada (nome, conteudo) em um pool de
+    processos, devolvendo (nome, resultado) na mesma ordem. Uma falha vira
+    (nome + ".erro.txt", mensagem) para não interromper o lote.
+    Com processos <= 1 roda no próprio processo.
+    """
+    funcao = funcao or html_para_pdf
+    processos = processos_padrao() if processos is None else processos
+
+    if processos <= 1:
+        for nome, conteudo in documentos:
+            try:
+                yield nome, funcao(conteudo)
+            except Exception as erro:
+                yield f"{nome}.erro.txt", str(erro).encode()
+        return
+
+    # spawn: os filhos não herdam as conexões abertas com o banco
+    pool = ProcessPoolExecutor(
+        processos,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=django.setup,
+    )
+    janela = janela or processos * 2
+    pendentes = deque()
+
+    def proximo():
+        nome, futuro = pendentes.popleft()
+        try:
+            return nome, futuro.result()
+        except Exception as erro:
+            return f"{nome}.erro.txt", str(erro).encode()
+
+    try:
+        for nome, conteudo in documentos:
+            pendentes.append((nome, pool.submit(funcao, conteudo)))
+            if len(pendentes) >= janela:
+                yield proximo()
+
+        while pendentes:
+            yield proximo()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ===============================================================
+# ZIP EM FLUXO
+# ===============================================================
+
+class _SaidaEmPartes:
+    """Destino sem seek para o ZipFile; os bytes escritos são retirados a cada arquivo."""
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, dados):
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def retirar(self):
+        dados = b"".join(self.partes)
+        self.partes.clear()
+        return dados
+
+
+def zip_em_fluxo(arquivos):
+    """Gera os bytes de um ZIP com os (nome, conteudo) recebidos, arquivo a arquivo."""
+    saida = _SaidaEmPartes()
+
+    # PDFs já são comprimidos: ZIP_STORED evita gastar CPU à toa
+    with zipfile.ZipFile(saida, "w", compression=zipfile.ZIP_STORED) as arquivo_zip:
+        for nome, conteudo in arquivos:
+            arquivo_zip.writestr(nome, conteudo)
+            yield saida.retirar()
+
+    yield saida.retirar()
+
+
+# ===============================================================
+# PRONTUÁRIOS → ZIP
+# ===============================================================
+
+def nome_no_zip(prontuario):
+    return (
+        f"{prontuario.criado_em:%Y-%m-%d}_prontuario_{prontuario.pk}_"
+        f"{slugify(prontuario.paciente.nome) or 'paciente'}.pdf"
+    )
+
+
+def exportar_prontuarios_zip(prontuarios, processos=None):
+    """Bytes do ZIP com o PDF de cada prontuário, produzidos sob demanda."""
+    documentos = (
+        (nome_no_zip(prontuario), html_prontuario(prontuario))
+        for prontuario in prontuarios.iterator(chunk_size=100)
+    )
+    return zip_em_fluxo(converter_em_lote(documentos, processos=processos))
+
+
+# ===============================================================
+# CONSULTAS POR CONVÊNIO → CSV (FATURAMENTO)
+# ===============================================================
+
+CABECALHO_FATURAMENTO = (
+    "Competência", "Convênio", "Código do convênio", "Consulta", "Data", "Hora",
+    "Paciente", "CPF", "Médico", "CRM", "Especialidade", "Status", "Duração (min)",
+)
+
+CAMPOS_FATURAMENTO = (
+    "id", "data_hora", "duracao_minutos", "status",
+    "convenio__nome", "convenio__codigo",
+    "paciente__nome", "paciente__cpf",
+    "medico__user__first_name", "medico__user__last_name",
+    "medico__crm", "medico__especialidade__nome",
+)
+
+LINHAS_POR_LOTE = 2000
+
+
+def filtrar_consultas_faturamento(paciente=None, medico=None, convenio=None, status=None, inicio=None, fim=None):
+    """
+    Tuplas (CAMPOS_FATURAMENTO) das consultas com convênio, agrupadas por
+    convênio e em ordem cronológica — cada mês fica contíguo.
+    """
+    qs = Consulta.objects.filter(usa_convenio=True)
+
+    if paciente:
+        qs = qs.filter(paciente_id=paciente)
+    if medico:
+        qs = qs.filter(medico_id=medico)
+    if convenio:
+        qs = qs.filter(convenio_id=convenio)
+    if status:
+        qs = qs.filter(status=status)
+    if inicio:
+        qs = qs.filter(data_hora__gte=inicio_do_dia(inicio))
+    if fim:
+        qs = qs.filter(data_hora__lt=inicio_do_dia(fim + timedelta(days=1)))
+
+    return (
+        qs
+        # mesma ordem do índice consulta_fat_conv_data_idx: sem ordenação em memória
+        .order_by("convenio_id", "data_hora", "id")
+        .values_list(*CAMPOS_FATURAMENTO)
+    )
+
+
+def linha_faturamento(valores, rotulos_status=dict(STATUS_CHOICES)):
+    dados = dict(zip(CAMPOS_FATURAMENTO, valores))
+    data_hora = timezone.localtime(dados["data_hora"])
+    medico = f"{dados['medico__user__first_name']} {dados['medico__user__last_name']}".strip()
+
+    return (
+        f"{data_hora:%Y-%m}",
+        dados["convenio__nome"] or "Sem convênio",
+        dados["convenio__codigo"] or "",
+        dados["id"],
+        f"{data_hora:%d/%m/%Y}",
+        f"{data_hora:%H:%M}",
+        dados["paciente__nome"],
+        dados["paciente__cpf"] or "",
+        medico,
+        dados["medico__crm"],
+        dados["medico__especialidade__nome"] or "",
+        rotulos_status.get(dados["status"], dados["status"]),
+        dados["duracao_minutos"],
+    )
+
+
+def csv_em_fluxo(linhas, cabecalho, por_bloco=500):
+    """
+    Gera o CSV em blocos de texto. Usa ";" e BOM UTF-8 para abrir direto
+    no Excel em português.
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=";")
+
+    buffer.write("\ufeff")
+    escritor.writerow(cabecalho)
+
+    for numero, linha in enumerate(linhas, 1):
+        escritor.writerow(linha)
+        if numero % por_bloco == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def exportar_faturamento_csv(valores):
+    """Texto do CSV de faturamento, produzido sob demanda a partir de filtrar_consultas_faturamento()."""
+    linhas = (linha_faturamento(v) for v in valores.iterator(chunk_size=LINHAS_POR_LOTE))
+    return csv_em_fluxo(linhas, CABECALHO_FATURAMENTO)
@@ -7,8 +7,11 @@ from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from datetime import datetime, timedelta
+from django.urls import reverse_lazy
+from datetime import datetime
 from .models import Consulta, Paciente, Medico, Prontuario, Exame, Especialidade, Convenio
+from .disponibilidade import horario_livre
+from .referencias import convenios_ativos
 
 import re
 
@@ -51,6 +54,40 @@ def validar_nome(nome):
     return nome
 
 
+# ===============================================================
+# WIDGET — SELECT COM AUTOCOMPLETE
+# ===============================================================
+
+class SelecaoAutocomplete(forms.Select):
+    """
+    <select> que renderiza só a opção escolhida; as demais são buscadas
+    em `tipo` (/autocomplete/<tipo>/) pelo static/js/autocomplete.js.
+    A validação continua usando o queryset completo do campo.
+    """
+
+    def __init__(self, tipo, attrs=None):
+        attrs = {'class': 'form-select', **(attrs or {})}
+        attrs['data-autocomplete'] = reverse_lazy('autocomplete', args=[tipo])
+        super().__init__(attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        escolhas = self.choices
+        escolhidos = [v for v in value if v not in ('', None)]
+        opcoes = [('', '---------')]
+
+        if escolhidos and hasattr(escolhas, 'queryset'):
+            try:
+                opcoes += [escolhas.choice(obj) for obj in escolhas.queryset.filter(pk__in=escolhidos)]
+            except (ValueError, ValidationError):
+                pass
+
+        self.choices = opcoes
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = escolhas
+
+
 # ===============================================================
 # USUÁRIO — CRIAÇÃO DE CONTA
 # ===============================================================
@@ -185,9 +222,9 @@ class MedicoForm(forms.ModelForm):
         model = Medico
         fields = ['user', 'crm', 'especialidade', 'hora_inicio', 'hora_fim']
         widgets = {
-            'user': forms.Select(attrs={'class': 'form-control'}),
+            'user': SelecaoAutocomplete('usuarios'),
             'crm': forms.TextInput(attrs={'class': 'form-control'}),
-            'especialidade': forms.Select(attrs={'class': 'form-control'}),
+            'especialidade': SelecaoAutocomplete('especialidades'),
             'hora_inicio': forms.TimeInput(attrs={'type': 'time', 'class': 'form-control'}),
             'hora_fim': forms.TimeInput(attrs={'type': 'time', 'class': 'form-control'}),
         }
@@ -224,7 +261,7 @@ class ConsultaForm(forms.ModelForm):
         model = Consulta
         fields = ['medico', 'observacoes', 'duracao_minutos', 'status', 'confirmada']
         widgets = {
-            'medico': forms.Select(attrs={'class': 'form-select'}),
+            'medico': SelecaoAutocomplete('medicos'),
             'observacoes': forms.Textarea(attrs={'class': 'form-control'}),
             'status': forms.HiddenInput(),
             'confirmada': forms.HiddenInput(),
@@ -258,16 +295,7 @@ class ConsultaForm(forms.ModelForm):
         if data_hora < timezone.now():
             raise ValidationError("Não é possível agendar uma consulta no passado.")
 
-        fim = data_hora + timedelta(minutes=duracao)
-
-        conflito = Consulta.objects.filter(
-            medico=medico,
-            data_hora__lt=fim,
-            data_hora__gte=data_hora - timedelta(minutes=duracao),
-            status__in=['agendada', 'confirmada']
-        ).exclude(pk=self.instance.pk).exists()
-
-        if conflito:
+        if not horario_livre(medico, data_hora, duracao, excluir_pk=self.instance.pk):
             raise ValidationError("Este horário já está reservado.")
 
         cleaned['data_hora'] = data_hora
@@ -323,13 +351,19 @@ class UserPacienteProfileForm(UserChangeForm):
         self.user = kwargs.get("instance")
         super().__init__(*args, **kwargs)
 
+        # opções do cache de referências; o queryset só é usado para validar
+        self.fields['convenio'].choices = [
+            ("", self.fields['convenio'].empty_label),
+            *((convenio.pk, str(convenio)) for convenio in convenios_ativos()),
+        ]
+
         paciente = getattr(self.user, "perfil_paciente", None)
 
         if paciente:
             self.fields['cpf'].initial = paciente.cpf
             self.fields['telefone'].initial = paciente.telefone
             self.fields['endereco'].initial = paciente.endereco
-            self.fields['convenio'].initial = paciente.convenio
+            self.fields['convenio'].initial = paciente.convenio_id
             self.fields['rg'].initial = paciente.rg
             self.fields['data_nascimento'].initial = paciente.data_nascimento
 
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from agendamento.exportacao import exportar_faturamento_csv, filtrar_consultas_faturamento, ler_filtros_consultas
+
+
+class Command(BaseCommand):
+    help = "Exporta em CSV as consultas com convênio, agrupadas por convênio e mês, para o faturamento."
+
+    def add_arguments(self, parser):
+        parser.add_argument("saida", help="Caminho do arquivo CSV a criar ('-' para a saída padrão).")
+        parser.add_argument("--convenio", type=int, help="ID do convênio.")
+        parser.add_argument("--medico", type=int, help="ID do médico.")
+        parser.add_argument("--status", help="Status da consulta (agendada, confirmada, cancelada, realizada).")
+        parser.add_argument("--inicio", help="Consultas a partir de AAAA-MM-DD.")
+        parser.add_argument("--fim", help="Consultas até AAAA-MM-DD (inclusive).")
+
+    def handle(self, *args, **options):
+        try:
+            filtros = ler_filtros_consultas(options)
+        except ValueError as erro:
+            raise CommandError(f"Filtro inválido: {erro}")
+
+        partes = exportar_faturamento_csv(filtrar_consultas_faturamento(**filtros))
+
+        if options["saida"] == "-":
+            for parte in partes:
+                self.stdout.write(parte, ending="")
+            return
+
+        with open(options["saida"], "w", encoding="utf-8", newline="") as destino:
+            for parte in partes:
+                destino.write(parte)
+
+        self.stdout.write(self.style.SUCCESS(f"Faturamento exportado para {options['saida']}."))
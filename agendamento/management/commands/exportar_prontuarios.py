@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from agendamento.exportacao import exportar_prontuarios_zip, filtrar_prontuarios, ler_filtros
+
+
+class Command(BaseCommand):
+    help = "Exporta os PDFs dos prontuários filtrados para um único arquivo ZIP."
+
+    def add_arguments(self, parser):
+        parser.add_argument("saida", help="Caminho do arquivo ZIP a criar.")
+        parser.add_argument("--paciente", type=int, help="ID do paciente.")
+        parser.add_argument("--medico", type=int, help="ID do médico responsável.")
+        parser.add_argument("--convenio", type=int, help="ID do convênio do paciente.")
+        parser.add_argument("--inicio", help="Criados a partir de AAAA-MM-DD.")
+        parser.add_argument("--fim", help="Criados até AAAA-MM-DD (inclusive).")
+        parser.add_argument("--processos", type=int, help="Processos de conversão (padrão: EXPORTACAO_PROCESSOS).")
+
+    def handle(self, *args, **options):
+        try:
+            filtros = ler_filtros(options)
+        except ValueError as erro:
+            raise CommandError(f"Filtro inválido: {erro}")
+
+        prontuarios = filtrar_prontuarios(**filtros)
+        total = prontuarios.count()
+
+        with open(options["saida"], "wb") as destino:
+            for parte in exportar_prontuarios_zip(prontuarios, processos=options["processos"]):
+                destino.write(parte)
+
+        self.stdout.write(self.style.SUCCESS(f"{total} prontuário(s) exportado(s) para {options['saida']}."))
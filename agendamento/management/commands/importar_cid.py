@@ -0,0 +1,75 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from agendamento.models import CID, normalizar_cid
+
+# nomes de coluna aceitos (o CSV do DATASUS usa SUBCAT/CAT e DESCRICAO)
+COLUNAS_CODIGO = ("subcat", "cat", "codigo", "código", "cid")
+COLUNAS_DESCRICAO = ("descricao", "descrição", "descr")
+
+LOTE = 2000
+
+
+def coluna(cabecalho, opcoes):
+    normalizado = {nome.strip().lower(): nome for nome in cabecalho if nome}
+    return next((normalizado[nome] for nome in opcoes if nome in normalizado), None)
+
+
+class Command(BaseCommand):
+    help = "Importa (ou atualiza) o catálogo CID-10 a partir de um CSV local."
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="CSV com colunas de código e descrição.")
+        parser.add_argument("--encoding", default="utf-8", help="Codificação do arquivo (DATASUS: latin-1).")
+        parser.add_argument("--delimitador", help="Separador (padrão: detectado pelo cabeçalho).")
+        parser.add_argument(
+            "--substituir", action="store_true",
+            help="Remove do catálogo os códigos que não estão no arquivo.",
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+
+        try:
+            with open(options["arquivo"], encoding=options["encoding"], newline="") as arquivo:
+                primeira = arquivo.readline()
+                delimitador = options["delimitador"] or (";" if primeira.count(";") > primeira.count(",") else ",")
+                arquivo.seek(0)
+
+                leitor = csv.DictReader(arquivo, delimiter=delimitador)
+                campo_codigo = coluna(leitor.fieldnames or [], COLUNAS_CODIGO)
+                campo_descricao = coluna(leitor.fieldnames or [], COLUNAS_DESCRICAO)
+
+                if not campo_codigo or not campo_descricao:
+                    raise CommandError(f"Colunas de código/descrição não encontradas em: {leitor.fieldnames}")
+
+                # dict: a última linha de um código repetido prevalece
+                catalogo = {}
+                for linha in leitor:
+                    codigo = normalizar_cid(linha.get(campo_codigo))
+                    descricao = (linha.get(campo_descricao) or "").strip()
+                    if codigo and descricao:
+                        catalogo[codigo] = descricao[:255]
+        except (OSError, UnicodeDecodeError) as erro:
+            raise CommandError(f"Não foi possível ler o arquivo: {erro}")
+
+        with transaction.atomic():
+            CID.objects.bulk_create(
+                (CID(codigo=codigo, descricao=descricao) for codigo, descricao in catalogo.items()),
+                batch_size=LOTE,
+                update_conflicts=True,
+                unique_fields=["codigo"],
+                update_fields=["descricao"],
+            )
+
+            removidos = 0
+            if options["substituir"]:
+                removidos, _ = CID.objects.exclude(codigo__in=list(catalogo)).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(catalogo)} código(s) importado(s), {removidos} removido(s) "
+            f"em {time.monotonic() - inicio:.1f}s."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from agendamento.pdf import limpar_cache
+
+
+class Command(BaseCommand):
+    help = "Remove PDFs de prontuário do cache por idade do último acesso e tamanho total."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-mb", type=int, help="Tamanho máximo do cache (padrão: PDF_CACHE_MAX_MB).")
+        parser.add_argument("--max-dias", type=int, help="Dias sem acesso antes da remoção (padrão: PDF_CACHE_MAX_DIAS).")
+
+    def handle(self, *args, **options):
+        max_bytes = options["max_mb"] * 1024 * 1024 if options["max_mb"] is not None else None
+        total = limpar_cache(max_bytes=max_bytes, max_dias=options["max_dias"])
+        self.stdout.write(self.style.SUCCESS(f"{total} PDF(s) removido(s) do cache."))
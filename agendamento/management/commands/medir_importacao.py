@@ -0,0 +1,195 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# o que um worker carrega até atender a primeira requisição; a saída é o
+# tempo gasto (s) e o pico de memória residente em KB (VmHWM do Linux —
+# ru_maxrss herdaria o pico do processo que fez o fork)
+CODIGO = (
+    "import time; inicio = time.perf_counter(); "
+    "import django; django.setup(); import {modulos}; "
+    "print(time.perf_counter() - inicio, "
+    "next(l.split()[1] for l in open('/proc/self/status') if l.startswith('VmHWM')))"
+)
+
+MODULOS_VIEWS = (
+    "inicio", "usuarios", "pacientes", "medicos", "especialidades",
+    "consultas", "agenda", "autocomplete", "notificacoes", "prontuarios",
+)
+
+# módulos de views carregados além do URLconf; "todas" equivale ao antigo
+# views.py único, importado inteiro com as URLs
+CENARIOS = {
+    "urls": (),
+    "notificacoes": ("notificacoes",),
+    "agenda": ("agenda",),
+    "consultas": ("consultas",),
+    "prontuarios": ("prontuarios",),
+    "todas": MODULOS_VIEWS,
+}
+
+# não devem ser carregados na inicialização (só na primeira geração de PDF)
+MODULOS_PESADOS = ("xhtml2pdf", "reportlab", "html5lib", "PIL")
+
+LINHA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+# ===============================================================
+# MEDIÇÃO
+# ===============================================================
+
+def executar(modulos, importtime=False):
+    """Importa `modulos` em um interpretador novo: (stderr, segundos, RSS em KB)."""
+    ambiente = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+    comando = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c",
+               CODIGO.format(modulos=", ".join(modulos))]
+
+    processo = subprocess.run(comando, cwd=settings.BASE_DIR, env=ambiente, capture_output=True, text=True)
+
+    if processo.returncode:
+        raise CommandError(f"A importação falhou:\n{processo.stderr[-2000:]}")
+
+    segundos, rss = processo.stdout.split()[-2:]
+    return processo.stderr, float(segundos), int(rss)
+
+
+def medir(modulos):
+    """[(modulo, self_us, cumulativo_us, nivel)] de um interpretador novo com -X importtime."""
+    saida, _, _ = executar(modulos, importtime=True)
+
+    linhas = []
+    for texto in saida.splitlines():
+        casamento = LINHA.match(texto)
+        if casamento:
+            proprio, cumulativo, recuo, modulo = casamento.groups()
+            linhas.append((modulo, int(proprio), int(cumulativo), (len(recuo) - 1) // 2))
+
+    return linhas
+
+
+def comparar_cenarios(repeticoes):
+    """
+    {cenário: (mediana de segundos, mediana de RSS em KB)} para cada um de
+    CENARIOS, alternando os cenários a cada rodada para diluir o ruído.
+    """
+    modulos = {
+        nome: [settings.ROOT_URLCONF, *(f"agendamento.views.{v}" for v in views)]
+        for nome, views in CENARIOS.items()
+    }
+    medidas = {nome: [] for nome in CENARIOS}
+
+    for _ in range(repeticoes):
+        for nome in CENARIOS:
+            medidas[nome].append(executar(modulos[nome])[1:])
+
+    return {
+        nome: (
+            statistics.median(segundos for segundos, _ in valores),
+            statistics.median(rss for _, rss in valores),
+        )
+        for nome, valores in medidas.items()
+    }
+
+
+def resumir(linhas):
+    total = sum(cumulativo for _, _, cumulativo, nivel in linhas if nivel == 0)
+
+    por_pacote = defaultdict(int)
+    for modulo, proprio, _, _ in linhas:
+        por_pacote[modulo.split(".")[0]] += proprio
+
+    return {
+        "total": total,
+        "por_pacote": por_pacote,
+        "app": {modulo: (proprio, cumulativo) for modulo, proprio, cumulativo, _ in linhas
+                if modulo.split(".")[0] == "agendamento"},
+        "pesados": sorted({modulo.split(".")[0] for modulo, *_ in linhas} & set(MODULOS_PESADOS)),
+    }
+
+
+# ===============================================================
+# COMANDO
+# ===============================================================
+
+class Command(BaseCommand):
+    help = (
+        "Mede com `python -X importtime` o custo de importação de um worker "
+        "(django.setup() + URLs) e o peso de cada módulo do agendamento."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modulo", action="append", dest="modulos",
+            help="Módulo importado após django.setup() (padrão: o ROOT_URLCONF). Pode repetir.",
+        )
+        parser.add_argument("--repeticoes", type=int, default=3, help="Execuções; usa a mediana (padrão: 3).")
+        parser.add_argument("--top", type=int, default=10, help="Pacotes mais caros exibidos (padrão: 10).")
+        parser.add_argument("--limite-ms", type=float, help="Falha se o tempo total passar deste valor.")
+        parser.add_argument(
+            "--cenarios", action="store_true",
+            help="Compara tempo de inicialização e memória: só URLs, um domínio de views, todas as views.",
+        )
+        parser.add_argument(
+            "--estrito", action="store_true",
+            help=f"Falha se algum destes for carregado: {', '.join(MODULOS_PESADOS)}.",
+        )
+
+    def handle(self, *args, **options):
+        repeticoes = max(options["repeticoes"], 1)
+
+        if options["cenarios"]:
+            self.mostrar_cenarios(comparar_cenarios(repeticoes), repeticoes)
+            return
+
+        modulos = options["modulos"] or [settings.ROOT_URLCONF]
+        resumos = [resumir(medir(modulos)) for _ in range(repeticoes)]
+
+        # a mediana do total escolhe a execução exibida
+        resumos.sort(key=lambda r: r["total"])
+        resumo = resumos[len(resumos) // 2]
+        total_ms = statistics.median(r["total"] for r in resumos) / 1000
+
+        self.stdout.write(f"Importação de {', '.join(modulos)}: {total_ms:.1f} ms (mediana de {len(resumos)})")
+
+        self.stdout.write("\nMódulos do agendamento (próprio / acumulado, ms):")
+        for modulo, (proprio, cumulativo) in sorted(resumo["app"].items(), key=lambda item: -item[1][1]):
+            self.stdout.write(f"  {proprio / 1000:8.1f} {cumulativo / 1000:8.1f}  {modulo}")
+
+        self.stdout.write("\nPacotes mais caros (tempo próprio somado, ms):")
+        mais_caros = sorted(resumo["por_pacote"].items(), key=lambda item: -item[1])[:options["top"]]
+        for pacote, proprio in mais_caros:
+            self.stdout.write(f"  {proprio / 1000:8.1f}  {pacote}")
+
+        falhas = []
+
+        if resumo["pesados"]:
+            self.stdout.write(self.style.WARNING(f"\nCarregados na inicialização: {', '.join(resumo['pesados'])}"))
+            if options["estrito"]:
+                falhas.append(f"módulos pesados carregados: {', '.join(resumo['pesados'])}")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"\nNenhum de {', '.join(MODULOS_PESADOS)} foi carregado."))
+
+        if options["limite_ms"] is not None and total_ms > options["limite_ms"]:
+            falhas.append(f"{total_ms:.1f} ms acima do limite de {options['limite_ms']:.1f} ms")
+
+        if falhas:
+            raise CommandError("; ".join(falhas))
+
+    def mostrar_cenarios(self, resultado, repeticoes):
+        self.stdout.write(f"django.setup() + importações em processo novo (mediana de {repeticoes}):")
+        self.stdout.write(f"  {'cenário':<14}{'tempo (ms)':>12}{'RSS (MB)':>11}")
+
+        for nome, (segundos, rss) in resultado.items():
+            self.stdout.write(f"  {nome:<14}{segundos * 1000:>12.0f}{rss / 1024:>11.1f}")
+
+        urls, todas = resultado["urls"], resultado["todas"]
+        self.stdout.write(
+            f"\nTodas as views em relação a só URLs: {(todas[0] - urls[0]) * 1000:+.0f} ms, "
+            f"{(todas[1] - urls[1]) / 1024:+.1f} MB."
+        )
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from agendamento.pdf import limpar_cache, processar_tarefa, reivindicar_tarefa
+
+
+class Command(BaseCommand):
+    help = "Worker da fila de PDFs de prontuário: gera os arquivos pendentes em MEDIA_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--uma-vez", action="store_true", help="Esvazia a fila e termina.")
+        parser.add_argument("--intervalo", type=float, default=2.0, help="Segundos entre consultas à fila vazia.")
+
+    def handle(self, *args, **options):
+        processadas = 0
+
+        while True:
+            tarefa = reivindicar_tarefa()
+
+            if tarefa is None:
+                if options["uma_vez"]:
+                    break
+                # fila vazia: descarta conexões velhas/quebradas antes de dormir
+                close_old_connections()
+                time.sleep(options["intervalo"])
+                continue
+
+            if processar_tarefa(tarefa):
+                processadas += 1
+                self.stdout.write(f"OK     prontuário #{tarefa.prontuario_id} ({tarefa.arquivo.name})")
+                limpar_cache()
+            else:
+                self.stdout.write(self.style.ERROR(
+                    f"FALHA  prontuário #{tarefa.prontuario_id} "
+                    f"(tentativa {tarefa.tentativas}): {tarefa.erro}"
+                ))
+
+        self.stdout.write(self.style.SUCCESS(f"{processadas} PDF(s) gerado(s)."))
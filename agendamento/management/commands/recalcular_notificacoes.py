@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from agendamento.notificacoes import recalcular_contadores
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o contador de notificações não lidas a partir da tabela Notificacao."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuario", type=int, action="append", help="Recalcula só este usuário (pode repetir).")
+
+    def handle(self, *args, **options):
+        total = recalcular_contadores(options["usuario"])
+        self.stdout.write(self.style.SUCCESS(f"{total} contador(es) com notificações não lidas recalculado(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from agendamento.resumo_agenda import reconstruir_resumos
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o resumo diário da agenda (ResumoAgendaDia) a partir da tabela Consulta."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--medico", type=int, action="append", help="Reconstrói só este médico (pode repetir).")
+
+    def handle(self, *args, **options):
+        total = reconstruir_resumos(options["medico"])
+        self.stdout.write(self.style.SUCCESS(f"{total} dia(s) de agenda resumido(s)."))
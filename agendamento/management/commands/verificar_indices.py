@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from agendamento.disponibilidade import inicio_do_dia, ocupacoes
+from agendamento.models import Consulta
+
+
+# ===============================================================
+# CONSULTAS CRÍTICAS — (nome, queryset, índices esperados)
+# ===============================================================
+
+def consultas_criticas(medico_id, paciente_id, dia):
+    inicio = inicio_do_dia(dia)
+    fim = inicio_do_dia(dia + timedelta(days=1))
+
+    return [
+        (
+            "horarios_disponiveis / ConsultaForm.clean",
+            ocupacoes([medico_id], inicio, fim),
+            ("consulta_med_ativa_idx",),
+        ),
+        (
+            "pagina_inicial (médico, por status)",
+            Consulta.objects.filter(medico_id=medico_id, status="agendada").order_by("data_hora")[:10],
+            ("consulta_med_status_idx",),
+        ),
+        (
+            "listar_consultas (médico)",
+            Consulta.objects.filter(medico_id=medico_id).order_by("-data_hora")[:20],
+            ("consulta_medico_data_idx",),
+        ),
+        (
+            "listar_consultas (geral, por cursor)",
+            Consulta.objects.order_by("-data_hora", "-id")[:26],
+            ("consulta_data_id_idx",),
+        ),
+        (
+            "historico_paciente",
+            Consulta.objects.filter(paciente_id=paciente_id).order_by("-data_hora"),
+            ("consulta_pac_data_idx",),
+        ),
+        (
+            "exportar_faturamento",
+            Consulta.objects.filter(usa_convenio=True).order_by("convenio_id", "data_hora", "id")[:2000],
+            ("consulta_fat_conv_data_idx",),
+        ),
+    ]
+
+
+# ===============================================================
+# COMANDO
+# ===============================================================
+
+class Command(BaseCommand):
+    help = "Executa EXPLAIN nas consultas críticas de Consulta e verifica os índices usados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--medico", type=int, help="ID do médico (padrão: o de uma consulta qualquer).")
+        parser.add_argument("--paciente", type=int, help="ID do paciente (padrão: o de uma consulta qualquer).")
+        parser.add_argument("--data", help="Dia consultado, AAAA-MM-DD (padrão: hoje).")
+        parser.add_argument("--estrito", action="store_true", help="Falha se algum índice esperado não for usado.")
+        parser.add_argument("--plano", action="store_true", help="Mostra o plano completo de cada consulta.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Este comando requer PostgreSQL.")
+
+        amostra = Consulta.objects.order_by().values_list("medico_id", "paciente_id").first()
+        if amostra is None and not (options["medico"] and options["paciente"]):
+            raise CommandError("Nenhuma consulta cadastrada; informe --medico e --paciente.")
+
+        medico_id = options["medico"] or amostra[0]
+        paciente_id = options["paciente"] or amostra[1]
+        dia = (
+            datetime.strptime(options["data"], "%Y-%m-%d").date()
+            if options["data"] else timezone.localdate()
+        )
+
+        falhas = []
+
+        for nome, qs, esperados in consultas_criticas(medico_id, paciente_id, dia):
+            plano = qs.explain()
+            usado = next((idx for idx in esperados if idx in plano), None)
+
+            if usado:
+                self.stdout.write(self.style.SUCCESS(f"OK     {nome}: {usado}"))
+            else:
+                falhas.append(nome)
+                self.stdout.write(self.style.ERROR(f"FALHA  {nome}: esperado {', '.join(esperados)}"))
+
+            if options["plano"] or not usado:
+                self.stdout.write(plano)
+
+        if falhas and options["estrito"]:
+            raise CommandError(f"{len(falhas)} consulta(s) sem o índice esperado.")
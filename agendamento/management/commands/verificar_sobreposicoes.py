@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from agendamento.disponibilidade import consultas_sobrepostas
+from agendamento.models import Consulta
+
+
+class Command(BaseCommand):
+    help = (
+        "Lista consultas agendadas/confirmadas do mesmo médico com horários sobrepostos "
+        "(violam a constraint consulta_sem_sobreposicao). Com --cancelar, cancela as excedentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cancelar", action="store_true",
+            help="Cancela a consulta que começa depois (ou a mais nova) de cada sobreposição.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            excedentes = consultas_sobrepostas()
+
+            for pk, mantida in excedentes:
+                self.stdout.write(f"Consulta #{pk} sobrepõe a consulta #{mantida}")
+
+            if not excedentes:
+                self.stdout.write(self.style.SUCCESS("Nenhuma sobreposição encontrada."))
+                return
+
+            if not options["cancelar"]:
+                raise CommandError(
+                    f"{len(excedentes)} consulta(s) sobreposta(s). Rode com --cancelar para cancelá-las."
+                )
+
+            # uma a uma: save() mantém o resumo da agenda
+            for pk, mantida in excedentes:
+                consulta = Consulta.objects.get(pk=pk)
+                consulta.status = "cancelada"
+                consulta.observacoes = (
+                    f"{consulta.observacoes}\n" if consulta.observacoes else ""
+                ) + f"Cancelada automaticamente: horário sobreposto à consulta #{mantida}."
+                consulta.save(update_fields=["status", "observacoes", "atualizado_em"])
+
+        self.stdout.write(self.style.SUCCESS(f"{len(excedentes)} consulta(s) cancelada(s)."))
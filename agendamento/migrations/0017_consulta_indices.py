@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0016_prontuario_conduta_prontuario_evolucao_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(fields=['medico', 'data_hora'], name='consulta_medico_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(fields=['medico', 'status', 'data_hora'], name='consulta_med_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(condition=models.Q(('status__in', ['agendada', 'confirmada'])), fields=['medico', 'data_hora'], include=('duracao_minutos',), name='consulta_med_ativa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(fields=['paciente', 'data_hora'], name='consulta_pac_data_idx'),
+        ),
+    ]
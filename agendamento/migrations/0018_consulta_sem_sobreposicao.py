@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:31
+
+from datetime import timedelta
+
+import agendamento.models
+import django.contrib.postgres.constraints
+from django.conf import settings
+from django.db import migrations, models
+
+
+CRIAR_FUNCAO = """
+CREATE OR REPLACE FUNCTION consulta_periodo(inicio timestamptz, minutos integer)
+RETURNS tstzrange
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT tstzrange(inicio, inicio + minutos * interval '1 minute') $$;
+"""
+
+REMOVER_FUNCAO = "DROP FUNCTION IF EXISTS consulta_periodo(timestamptz, integer);"
+
+STATUS_ATIVOS = ("agendada", "confirmada")
+
+
+def cancelar_sobrepostas(apps, schema_editor):
+    """
+    Antes da constraint: cancela as consultas ativas que colidem com outra
+    do mesmo médico (fica a que começa antes, ou a mais antiga) e anota o
+    motivo em observações. `manage.py verificar_sobreposicoes` lista os
+    casos sem alterar nada — rode antes do deploy para revisá-los.
+    """
+    Consulta = apps.get_model("agendamento", "Consulta")
+
+    linhas = (
+        Consulta.objects
+        .filter(status__in=STATUS_ATIVOS)
+        .order_by("medico_id", "data_hora", "id")
+        .values_list("id", "medico_id", "data_hora", "duracao_minutos")
+    )
+
+    medico_atual = mantida = fim_mantida = None
+    excedentes = []
+    for pk, medico_id, data_hora, duracao in linhas.iterator():
+        if not duracao:
+            continue  # intervalo vazio: a constraint não o considera
+        fim = data_hora + timedelta(minutes=duracao)
+        if medico_id == medico_atual and data_hora < fim_mantida:
+            excedentes.append((pk, mantida))
+            continue
+        medico_atual, mantida, fim_mantida = medico_id, pk, fim
+
+    for pk, mantida in excedentes:
+        consulta = Consulta.objects.get(pk=pk)
+        consulta.status = "cancelada"
+        consulta.observacoes = (
+            f"{consulta.observacoes}\n" if consulta.observacoes else ""
+        ) + f"Cancelada automaticamente: horário sobreposto à consulta #{mantida}."
+        consulta.save(update_fields=["status", "observacoes"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0017_consulta_indices'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(CRIAR_FUNCAO, REMOVER_FUNCAO),
+        migrations.RunPython(cancelar_sobrepostas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='consulta',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ['agendada', 'confirmada'])), expressions=[(agendamento.models.MedicoRange('medico'), '&&'), (agendamento.models.PeriodoConsulta(), '&&')], name='consulta_sem_sobreposicao', violation_error_message='Este horário já está reservado.'),
+        ),
+    ]
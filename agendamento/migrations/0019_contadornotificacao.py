@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def preencher_contadores(apps, schema_editor):
+    Notificacao = apps.get_model('agendamento', 'Notificacao')
+    ContadorNotificacao = apps.get_model('agendamento', 'ContadorNotificacao')
+
+    totais = (
+        Notificacao.objects
+        .filter(lida=False)
+        .order_by()
+        .values_list('usuario_id')
+        .annotate(total=Count('id'))
+    )
+
+    ContadorNotificacao.objects.bulk_create(
+        [ContadorNotificacao(usuario_id=usuario_id, nao_lidas=total) for usuario_id, total in totais],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0018_consulta_sem_sobreposicao'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorNotificacao',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='contador_notificacoes', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('nao_lidas', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
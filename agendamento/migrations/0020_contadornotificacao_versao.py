@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0019_contadornotificacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contadornotificacao',
+            name='atualizado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='contadornotificacao',
+            name='versao',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0020_contadornotificacao_versao'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(fields=['data_hora', 'id'], name='consulta_data_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paciente',
+            index=models.Index(fields=['nome', 'id'], name='paciente_nome_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prontuario',
+            index=models.Index(fields=['criado_em', 'id'], name='prontuario_criado_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prontuario',
+            index=models.Index(fields=['paciente', 'criado_em'], name='prontuario_pac_criado_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def preencher_resumos(apps, schema_editor):
+    Consulta = apps.get_model('agendamento', 'Consulta')
+    ResumoAgendaDia = apps.get_model('agendamento', 'ResumoAgendaDia')
+
+    totais = (
+        Consulta.objects
+        .order_by()
+        .annotate(data=TruncDate('data_hora'))
+        .values('medico_id', 'data')
+        .annotate(
+            minutos_ocupados=Coalesce(
+                Sum('duracao_minutos', filter=Q(status__in=['agendada', 'confirmada'])), 0
+            ),
+            agendadas=Count('id', filter=Q(status='agendada')),
+            confirmadas=Count('id', filter=Q(status='confirmada')),
+            canceladas=Count('id', filter=Q(status='cancelada')),
+            realizadas=Count('id', filter=Q(status='realizada')),
+        )
+    )
+
+    ResumoAgendaDia.objects.bulk_create(
+        (ResumoAgendaDia(**linha) for linha in totais),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0021_indices_paginacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoAgendaDia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('minutos_ocupados', models.IntegerField(default=0)),
+                ('agendadas', models.IntegerField(default=0)),
+                ('confirmadas', models.IntegerField(default=0)),
+                ('canceladas', models.IntegerField(default=0)),
+                ('realizadas', models.IntegerField(default=0)),
+                ('medico', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumos_agenda', to='agendamento.medico')),
+            ],
+            options={
+                'ordering': ['data'],
+                'constraints': [models.UniqueConstraint(fields=('medico', 'data'), name='resumo_agenda_medico_data')],
+            },
+        ),
+        migrations.RunPython(preencher_resumos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0022_resumoagendadia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarefaPDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('pronto', 'Pronto'), ('erro', 'Erro')], default='pendente', max_length=20)),
+                ('arquivo', models.FileField(blank=True, upload_to='prontuarios/pdf/')),
+                ('erro', models.TextField(blank=True)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True)),
+                ('concluido_em', models.DateTimeField(blank=True, null=True)),
+                ('prontuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tarefas_pdf', to='agendamento.prontuario')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status__in', ['pendente', 'processando'])), fields=['criado_em'], name='tarefa_pdf_fila_idx')],
+                'constraints': [models.UniqueConstraint(fields=('prontuario', 'chave'), name='tarefa_pdf_prontuario_chave')],
+            },
+        ),
+    ]
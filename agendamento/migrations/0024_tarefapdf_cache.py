@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0023_tarefapdf'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarefapdf',
+            name='acessado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tarefapdf',
+            name='tamanho',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0024_tarefapdf_cache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(condition=models.Q(('usa_convenio', True)), fields=['convenio', 'data_hora', 'id'], name='consulta_fat_conv_data_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:53
+
+import agendamento.models
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import DatabaseError, migrations, models, transaction
+
+
+def criar_indice_trigramas(apps, schema_editor):
+    """
+    Índice GIN de trigramas em nome_busca, se a extensão pg_trgm existir
+    no servidor e puder ser criada; sem ela a busca usa só o full-text.
+    """
+    conexao = schema_editor.connection
+    if conexao.vendor != 'postgresql':
+        return
+
+    with conexao.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+
+    try:
+        with transaction.atomic(using=conexao.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            schema_editor.execute(
+                'CREATE INDEX IF NOT EXISTS paciente_busca_trgm_idx '
+                'ON agendamento_paciente USING gin (nome_busca gin_trgm_ops)'
+            )
+    except DatabaseError:
+        # sem permissão para CREATE EXTENSION
+        pass
+
+
+def remover_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS paciente_busca_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0025_indice_faturamento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paciente',
+            name='cpf_digitos',
+            field=models.GeneratedField(db_persist=True, expression=agendamento.models.SoDigitos('cpf'), output_field=models.CharField(max_length=14)),
+        ),
+        migrations.AddField(
+            model_name='paciente',
+            name='nome_busca',
+            field=models.GeneratedField(db_persist=True, expression=agendamento.models.SemAcentos('nome'), output_field=models.CharField(max_length=150)),
+        ),
+        migrations.AddIndex(
+            model_name='paciente',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('nome_busca', config='simple'), name='paciente_busca_fts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paciente',
+            index=models.Index(fields=['cpf_digitos'], name='paciente_cpf_digitos_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(criar_indice_trigramas, remover_indice_trigramas),
+    ]
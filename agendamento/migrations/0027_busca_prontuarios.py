@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:57
+
+import agendamento.models
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0026_busca_pacientes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prontuario',
+            name='busca',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('diagnostico', config='portuguese', weight='A'), '||', django.contrib.postgres.search.SearchVector(agendamento.models.SemAcentos('diagnostico'), config='portuguese', weight='A'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector('queixa', config='portuguese', weight='A'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector(agendamento.models.SemAcentos('queixa'), config='portuguese', weight='A'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector('conduta', config='portuguese', weight='B'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector(agendamento.models.SemAcentos('conduta'), config='portuguese', weight='B'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector('medicacao', config='portuguese', weight='B'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector(agendamento.models.SemAcentos('medicacao'), config='portuguese', weight='B'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector('descricao', config='portuguese', weight='C'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector(agendamento.models.SemAcentos('descricao'), config='portuguese', weight='C'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector('exame_fisico', config='portuguese', weight='C'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector(agendamento.models.SemAcentos('exame_fisico'), config='portuguese', weight='C'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector('evolucao', config='portuguese', weight='C'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector(agendamento.models.SemAcentos('evolucao'), config='portuguese', weight='C'), django.contrib.postgres.search.SearchConfig('portuguese')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='prontuario',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busca'], name='prontuario_busca_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:58
+
+import agendamento.models
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import DatabaseError, migrations, models, transaction
+
+
+def criar_indice_trigramas(apps, schema_editor):
+    """Índice de trigramas em descricao_busca, se pg_trgm existir (ver 0026)."""
+    conexao = schema_editor.connection
+    if conexao.vendor != 'postgresql':
+        return
+
+    with conexao.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+
+    try:
+        with transaction.atomic(using=conexao.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            schema_editor.execute(
+                'CREATE INDEX IF NOT EXISTS cid_busca_trgm_idx '
+                'ON agendamento_cid USING gin (descricao_busca gin_trgm_ops)'
+            )
+    except DatabaseError:
+        pass
+
+
+def remover_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS cid_busca_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento', '0027_busca_prontuarios'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CID',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(max_length=10, unique=True)),
+                ('descricao', models.CharField(max_length=255)),
+                ('descricao_busca', models.GeneratedField(db_persist=True, expression=agendamento.models.SemAcentos('descricao'), output_field=models.CharField(max_length=255))),
+            ],
+            options={
+                'verbose_name': 'CID',
+                'verbose_name_plural': 'CIDs',
+                'ordering': ['codigo'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='prontuario',
+            index=models.Index(fields=['medico', 'criado_em'], name='prontuario_med_criado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cid',
+            index=models.Index(fields=['codigo'], name='cid_codigo_prefixo_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='cid',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('descricao_busca', config='simple'), name='cid_busca_fts_idx'),
+        ),
+        migrations.RunPython(criar_indice_trigramas, remover_indice_trigramas),
+    ]
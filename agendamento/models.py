@@ -2,8 +2,12 @@
 # IMPORTAÇÕES
 # ===============================================================
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import BigIntegerRangeField, DateTimeRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.utils import timezone
 
 
@@ -41,6 +45,27 @@ class Convenio(models.Model):
 # PACIENTE
 # ===============================================================
 
+ACENTOS = "áàâãäéèêëíìîïóòôõöúùûüçñÁÀÂÃÄÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑ"
+SEM_ACENTOS = "aaaaaeeeeiiiiooooouuuucnaaaaaeeeeiiiiooooouuuucn"
+
+
+class SemAcentos(models.Func):
+    """
+    lower(translate(texto, acentos, sem acentos)) — IMMUTABLE e sem a
+    extensão unaccent, então pode ir em coluna gerada e índice. As
+    maiúsculas acentuadas estão no mapa porque lower() em collation "C"
+    só converte ASCII.
+    """
+    template = "LOWER(TRANSLATE(%(expressions)s, '" + ACENTOS + "', '" + SEM_ACENTOS + "'))"
+    output_field = models.CharField()
+
+
+class SoDigitos(models.Func):
+    """regexp_replace(texto, '[^0-9]', '', 'g') — ex. CPF sem pontuação."""
+    template = "REGEXP_REPLACE(%(expressions)s, '[^0-9]', '', 'g')"
+    output_field = models.CharField()
+
+
 class Paciente(models.Model):
     usuario = models.OneToOneField(
         User,
@@ -73,8 +98,29 @@ class Paciente(models.Model):
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    # colunas de busca, calculadas pelo banco (ver agendamento/busca.py)
+    nome_busca = models.GeneratedField(
+        expression=SemAcentos("nome"),
+        output_field=models.CharField(max_length=150),
+        db_persist=True,
+    )
+    cpf_digitos = models.GeneratedField(
+        expression=SoDigitos("cpf"),
+        output_field=models.CharField(max_length=14),
+        db_persist=True,
+    )
+
     class Meta:
         ordering = ["nome"]
+        indexes = [
+            # listagem paginada por cursor (nome, id)
+            models.Index(fields=["nome", "id"], name="paciente_nome_id_idx"),
+            # busca por palavras/prefixos do nome (o índice de trigramas é criado
+            # na migração 0026, só quando a extensão pg_trgm está disponível)
+            GinIndex(SearchVector("nome_busca", config="simple"), name="paciente_busca_fts_idx"),
+            # busca por prefixo do CPF
+            models.Index(fields=["cpf_digitos"], opclasses=["varchar_pattern_ops"], name="paciente_cpf_digitos_idx"),
+        ]
 
     def __str__(self):
         return self.nome
@@ -119,6 +165,31 @@ STATUS_CHOICES = (
 )
 
 
+CONSTRAINT_SOBREPOSICAO = "consulta_sem_sobreposicao"
+
+
+class MedicoRange(models.Func):
+    """int8range(medico_id, medico_id, '[]') — igualdade via GiST sem btree_gist."""
+    function = "INT8RANGE"
+    template = "%(function)s(%(expressions)s, %(expressions)s, '[]')"
+    output_field = BigIntegerRangeField()
+
+
+class PeriodoConsulta(models.Func):
+    """
+    tstzrange(data_hora, data_hora + duracao_minutos) — intervalo ocupado.
+
+    Usa a função IMMUTABLE criada na migração 0018: somar minutos a um
+    timestamptz não depende do fuso, mas o operador nativo é só STABLE
+    e não pode aparecer em constraints.
+    """
+    function = "consulta_periodo"
+    output_field = DateTimeRangeField()
+
+    def __init__(self, **extra):
+        super().__init__(models.F("data_hora"), models.F("duracao_minutos"), **extra)
+
+
 class Consulta(models.Model):
     paciente = models.ForeignKey(
         Paciente,
@@ -163,15 +234,175 @@ class Consulta(models.Model):
 
     class Meta:
         ordering = ["-data_hora"]
+        indexes = [
+            # agenda do médico (listagens e dashboard ordenados por data)
+            models.Index(fields=["medico", "data_hora"], name="consulta_medico_data_idx"),
+            # dashboard do médico filtrado por status
+            models.Index(fields=["medico", "status", "data_hora"], name="consulta_med_status_idx"),
+            # disponibilidade: só consultas ativas, com a duração para index-only scan
+            models.Index(
+                fields=["medico", "data_hora"],
+                include=["duracao_minutos"],
+                condition=models.Q(status__in=["agendada", "confirmada"]),
+                name="consulta_med_ativa_idx",
+            ),
+            # histórico do paciente e páginas de prontuário
+            models.Index(fields=["paciente", "data_hora"], name="consulta_pac_data_idx"),
+            # listagem geral paginada por cursor (data_hora, id)
+            models.Index(fields=["data_hora", "id"], name="consulta_data_id_idx"),
+            # exportação de faturamento: consultas com convênio, agrupadas por convênio
+            models.Index(
+                fields=["convenio", "data_hora", "id"],
+                condition=models.Q(usa_convenio=True),
+                name="consulta_fat_conv_data_idx",
+            ),
+        ]
+        constraints = [
+            # impede, no banco, duas consultas ativas sobrepostas do mesmo médico
+            ExclusionConstraint(
+                name=CONSTRAINT_SOBREPOSICAO,
+                expressions=[
+                    (MedicoRange("medico"), RangeOperators.OVERLAPS),
+                    (PeriodoConsulta(), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(status__in=["agendada", "confirmada"]),
+                violation_error_message="Este horário já está reservado.",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.paciente} — {self.medico} — {self.data_hora.strftime('%d/%m/%Y %H:%M')}"
 
+    # em transação: o resumo da agenda (resumo_agenda.py) lê o estado
+    # anterior com SELECT ... FOR UPDATE no pre_save/pre_delete
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+
+# ===============================================================
+# RESUMO DIÁRIO DA AGENDA
+# ===============================================================
+
+class ResumoAgendaDia(models.Model):
+    """Ocupação de um médico em um dia, mantida incrementalmente a partir de Consulta."""
+    medico = models.ForeignKey(
+        Medico,
+        on_delete=models.CASCADE,
+        related_name="resumos_agenda"
+    )
+    data = models.DateField()
+
+    # soma da duração das consultas agendadas/confirmadas
+    minutos_ocupados = models.IntegerField(default=0)
+
+    agendadas = models.IntegerField(default=0)
+    confirmadas = models.IntegerField(default=0)
+    canceladas = models.IntegerField(default=0)
+    realizadas = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["data"]
+        constraints = [
+            models.UniqueConstraint(fields=["medico", "data"], name="resumo_agenda_medico_data"),
+        ]
+
+    def __str__(self):
+        return f"{self.medico} — {self.data:%d/%m/%Y}: {self.minutos_ocupados} min"
+
+
+# ===============================================================
+# CID-10
+# ===============================================================
+
+class CID(models.Model):
+    """Catálogo CID-10, carregado com `manage.py importar_cid`."""
+    # sem ponto e em maiúsculas ("J450"); `codigo_formatado` exibe "J45.0"
+    codigo = models.CharField(max_length=10, unique=True)
+    descricao = models.CharField(max_length=255)
+
+    descricao_busca = models.GeneratedField(
+        expression=SemAcentos("descricao"),
+        output_field=models.CharField(max_length=255),
+        db_persist=True,
+    )
+
+    class Meta:
+        ordering = ["codigo"]
+        verbose_name = "CID"
+        verbose_name_plural = "CIDs"
+        indexes = [
+            # busca por prefixo do código
+            models.Index(fields=["codigo"], opclasses=["varchar_pattern_ops"], name="cid_codigo_prefixo_idx"),
+            # busca por palavras da descrição (trigramas: migração 0028, se houver pg_trgm)
+            GinIndex(SearchVector("descricao_busca", config="simple"), name="cid_busca_fts_idx"),
+        ]
+
+    @property
+    def codigo_formatado(self):
+        return formatar_cid(self.codigo)
+
+    def __str__(self):
+        return f"{self.codigo_formatado} — {self.descricao}"
+
+
+class CodigoCID(models.Func):
+    """Versão SQL de normalizar_cid: upper(regexp_replace(texto, '[^A-Za-z0-9]', '', 'g'))."""
+    template = "UPPER(REGEXP_REPLACE(%(expressions)s, '[^A-Za-z0-9]', '', 'g'))"
+    output_field = models.CharField()
+
+
+def normalizar_cid(valor):
+    """"j45.0 " → "J450"."""
+    return "".join(c for c in (valor or "").upper() if c.isalnum())
+
+
+def formatar_cid(codigo):
+    """"J450" → "J45.0"; categorias de três caracteres ficam como estão."""
+    codigo = normalizar_cid(codigo)
+    return f"{codigo[:3]}.{codigo[3:]}" if len(codigo) > 3 else codigo
+
 
 # ===============================================================
 # PRONTUÁRIO
 # ===============================================================
 
+# Pesos da busca textual: A = mais relevante.
+CAMPOS_CLINICOS = {
+    "A": ("diagnostico", "queixa"),
+    "B": ("conduta", "medicacao"),
+    "C": ("descricao", "exame_fisico", "evolucao"),
+}
+
+
+def vetor_clinico():
+    """
+    tsvector "portuguese" dos campos clínicos, cada um com seu peso. Cada
+    texto entra também sem acentos, para "diagnostico" achar "diagnóstico".
+    """
+    partes = [
+        SearchVector(expressao, config="portuguese", weight=peso)
+        for peso, campos in CAMPOS_CLINICOS.items()
+        for campo in campos
+        for expressao in (campo, SemAcentos(campo))
+    ]
+
+    vetor = partes[0]
+    for parte in partes[1:]:
+        vetor = vetor + parte
+    return vetor
+
+
+class ProntuarioManager(models.Manager):
+    # o tsvector só interessa ao banco; não trafega em toda leitura de prontuário
+    def get_queryset(self):
+        return super().get_queryset().defer("busca")
+
+
 class Prontuario(models.Model):
     paciente = models.ForeignKey(
         Paciente,
@@ -207,10 +438,81 @@ class Prontuario(models.Model):
     criado_em = models.DateTimeField(default=timezone.now)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    # recalculado pelo banco a cada INSERT/UPDATE (ver agendamento/busca.py)
+    busca = models.GeneratedField(
+        expression=vetor_clinico(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = ProntuarioManager()
+
+    class Meta:
+        indexes = [
+            # listagem paginada por cursor (criado_em, id)
+            models.Index(fields=["criado_em", "id"], name="prontuario_criado_id_idx"),
+            models.Index(fields=["paciente", "criado_em"], name="prontuario_pac_criado_idx"),
+            # relatório de diagnósticos por médico e período
+            models.Index(fields=["medico", "criado_em"], name="prontuario_med_criado_idx"),
+            # busca no texto clínico
+            GinIndex(fields=["busca"], name="prontuario_busca_idx"),
+        ]
+
     def __str__(self):
         return f"Prontuário #{self.pk} - {self.paciente.nome}"
 
 
+# ===============================================================
+# PRONTUÁRIO — FILA DE GERAÇÃO DE PDF
+# ===============================================================
+
+STATUS_TAREFA_PDF = (
+    ("pendente", "Pendente"),
+    ("processando", "Processando"),
+    ("pronto", "Pronto"),
+    ("erro", "Erro"),
+)
+
+
+class TarefaPDF(models.Model):
+    """PDF de um prontuário: item da fila enquanto é gerado, cache depois de pronto."""
+    prontuario = models.ForeignKey(
+        Prontuario,
+        on_delete=models.CASCADE,
+        related_name="tarefas_pdf"
+    )
+    # SHA-256 dos dados que entram no PDF (também usado como ETag)
+    chave = models.CharField(max_length=64)
+
+    status = models.CharField(max_length=20, choices=STATUS_TAREFA_PDF, default="pendente")
+    arquivo = models.FileField(upload_to="prontuarios/pdf/", blank=True)
+    tamanho = models.PositiveIntegerField(null=True, blank=True)
+    erro = models.TextField(blank=True)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+
+    criado_em = models.DateTimeField(auto_now_add=True)
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+    # último download — base da remoção por idade/tamanho
+    acessado_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["prontuario", "chave"], name="tarefa_pdf_prontuario_chave"),
+        ]
+        indexes = [
+            # o worker só olha a fila (pendentes / em processamento)
+            models.Index(
+                fields=["criado_em"],
+                condition=models.Q(status__in=["pendente", "processando"]),
+                name="tarefa_pdf_fila_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"PDF do prontuário #{self.prontuario_id} — {self.get_status_display()}"
+
+
 # ===============================================================
 # EXAME
 # ===============================================================
@@ -259,3 +561,21 @@ class Notificacao(models.Model):
 
     def __str__(self):
         return f"{self.titulo} - {self.usuario}"
+
+
+class ContadorNotificacao(models.Model):
+    """Total de notificações não lidas do usuário, mantido incrementalmente."""
+    usuario = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="contador_notificacoes"
+    )
+    nao_lidas = models.IntegerField(default=0)
+
+    # muda a cada notificação criada, lida ou excluída (ETag / Last-Modified)
+    versao = models.PositiveBigIntegerField(default=0)
+    atualizado_em = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.usuario} — {self.nao_lidas} não lidas"
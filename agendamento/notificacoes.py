@@ -0,0 +1,202 @@
+# ===============================================================
+# NOTIFICAÇÕES — CONTADOR DE NÃO LIDAS
+# ===============================================================
+#
+# ContadorNotificacao guarda o total de não lidas por usuário. Ele é
+# ajustado com UPDATE ... SET nao_lidas = nao_lidas + delta, atômico no
+# banco, a cada notificação criada, marcada como lida ou excluída — a
+# leitura vira uma busca pela chave primária em vez de um COUNT(*).
+# A mesma linha carrega a versão usada como ETag pelos endpoints JSON.
+#
+# O contador exibido no menu de toda página vem de nao_lidas_em_cache(),
+# guardado no cache por NOTIFICACOES_CACHE_SEGUNDOS e descartado a cada
+# ajuste. Com cache local (LocMemCache) outro processo pode exibir o valor
+# antigo até expirar; o stream SSE corrige o badge logo ao conectar.
+#
+# Alterações em `lida` devem passar por `marcar_como_lidas`; um
+# `.update(lida=True)` direto deixaria o contador defasado (corrigível
+# com `manage.py recalcular_notificacoes`).
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import ContadorNotificacao, Notificacao
+
+
+# ===============================================================
+# LEITURA
+# ===============================================================
+
+def nao_lidas(usuario_id):
+    total = (
+        ContadorNotificacao.objects
+        .filter(usuario_id=usuario_id)
+        .values_list("nao_lidas", flat=True)
+        .first()
+    )
+    return max(total or 0, 0)
+
+
+def chave_nao_lidas(usuario_id):
+    return f"notificacoes:nao_lidas:{usuario_id}"
+
+
+def nao_lidas_em_cache(usuario_id):
+    """nao_lidas() servido do cache por NOTIFICACOES_CACHE_SEGUNDOS (0 desliga)."""
+    segundos = getattr(settings, "NOTIFICACOES_CACHE_SEGUNDOS", 0)
+
+    if not segundos:
+        return nao_lidas(usuario_id)
+
+    return cache.get_or_set(chave_nao_lidas(usuario_id), lambda: nao_lidas(usuario_id), segundos)
+
+
+def descartar_cache(*usuario_ids):
+    chaves = [chave_nao_lidas(uid) for uid in usuario_ids]
+    cache.delete_many(chaves)
+    # de novo após o commit: uma leitura concorrente pode ter guardado o valor antigo
+    transaction.on_commit(lambda: cache.delete_many(chaves))
+
+
+async def anao_lidas(usuario_id):
+    total = await (
+        ContadorNotificacao.objects
+        .filter(usuario_id=usuario_id)
+        .values_list("nao_lidas", flat=True)
+        .afirst()
+    )
+    return max(total or 0, 0)
+
+
+# ===============================================================
+# GET CONDICIONAL — ETAG / LAST-MODIFIED
+# ===============================================================
+
+def estado_notificacoes(request):
+    """(nao_lidas, versao, atualizado_em) do usuário — uma consulta por request."""
+    if not hasattr(request, "_estado_notificacoes"):
+        linha = (
+            ContadorNotificacao.objects
+            .filter(usuario_id=request.user.pk)
+            .values_list("nao_lidas", "versao", "atualizado_em")
+            .first()
+        )
+        request._estado_notificacoes = linha or (0, 0, None)
+
+    return request._estado_notificacoes
+
+
+def etag_notificacoes(request, *args, **kwargs):
+    _, versao, _ = estado_notificacoes(request)
+    return f"{request.user.pk}-{versao}-{request.GET.urlencode()}"
+
+
+def ultima_alteracao_notificacoes(request, *args, **kwargs):
+    return estado_notificacoes(request)[2]
+
+
+# ===============================================================
+# ESCRITA
+# ===============================================================
+
+def ajustar_contador(usuario_id, delta, criar=False):
+    """Soma `delta` às não lidas e avança a versão das notificações do usuário."""
+    alteracao = {
+        "nao_lidas": F("nao_lidas") + delta,
+        "versao": F("versao") + 1,
+        "atualizado_em": timezone.now(),
+    }
+
+    atualizados = ContadorNotificacao.objects.filter(usuario_id=usuario_id).update(**alteracao)
+
+    if not atualizados and criar:
+        # primeira notificação do usuário: cria a linha (sem corrida) e ajusta
+        ContadorNotificacao.objects.bulk_create(
+            [ContadorNotificacao(usuario_id=usuario_id)],
+            ignore_conflicts=True,
+        )
+        ContadorNotificacao.objects.filter(usuario_id=usuario_id).update(**alteracao)
+
+    descartar_cache(usuario_id)
+
+
+def marcar_como_lidas(usuario, ids=None):
+    """Marca as não lidas do usuário (ou só `ids`) como lidas. Retorna quantas mudaram."""
+    qs = Notificacao.objects.filter(usuario=usuario, lida=False)
+
+    if ids is not None:
+        qs = qs.filter(pk__in=ids)
+
+    with transaction.atomic():
+        alteradas = qs.update(lida=True)
+        if alteradas:
+            ajustar_contador(usuario.pk, -alteradas)
+
+    return alteradas
+
+
+def recalcular_contadores(usuario_ids=None):
+    """Reconstrói os contadores a partir das notificações. Retorna quantos foram gravados."""
+    notificacoes = Notificacao.objects.filter(lida=False)
+    contadores = ContadorNotificacao.objects.all()
+
+    if usuario_ids is not None:
+        notificacoes = notificacoes.filter(usuario_id__in=usuario_ids)
+        contadores = contadores.filter(usuario_id__in=usuario_ids)
+
+    agora = timezone.now()
+
+    with transaction.atomic():
+        # trava as linhas: a versão gravada abaixo parte da atual
+        versoes = dict(contadores.select_for_update().values_list("usuario_id", "versao"))
+        totais = dict(
+            notificacoes
+            .order_by()
+            .values_list("usuario_id")
+            .annotate(total=Count("id"))
+        )
+
+        # a versão avança também aqui, senão o ETag antigo seguiria valendo (304 com o total errado)
+        contadores.exclude(usuario_id__in=totais).update(
+            nao_lidas=0,
+            versao=F("versao") + 1,
+            atualizado_em=agora,
+        )
+        ContadorNotificacao.objects.bulk_create(
+            [
+                ContadorNotificacao(
+                    usuario_id=uid,
+                    nao_lidas=total,
+                    versao=versoes.get(uid, 0) + 1,
+                    atualizado_em=agora,
+                )
+                for uid, total in totais.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["usuario"],
+            update_fields=["nao_lidas", "versao", "atualizado_em"],
+            batch_size=1000,
+        )
+        descartar_cache(*versoes, *totais)
+
+    return len(totais)
+
+
+# ===============================================================
+# SINAIS
+# ===============================================================
+
+@receiver(post_save, sender=Notificacao)
+def contar_notificacao_criada(sender, instance, created, **kwargs):
+    if created:
+        ajustar_contador(instance.usuario_id, 0 if instance.lida else 1, criar=True)
+
+
+@receiver(post_delete, sender=Notificacao)
+def descontar_notificacao_excluida(sender, instance, **kwargs):
+    ajustar_contador(instance.usuario_id, 0 if instance.lida else -1)
@@ -0,0 +1,181 @@
+# ===============================================================
+# PAGINAÇÃO POR CURSOR (KEYSET)
+# ===============================================================
+#
+# Em vez de OFFSET, cada página guarda os valores da ordenação do seu
+# primeiro e último item (cursor). A próxima página filtra
+# "(campo1, campo2, ...) depois do cursor" e usa LIMIT, então o custo é
+# o mesmo na primeira ou na milésima página — basta um índice que siga
+# a ordenação.
+
+import base64
+import json
+
+from django.db.models import Q
+
+POR_PAGINA_OPCOES = (10, 25, 50, 100)
+POR_PAGINA_PADRAO = 25
+
+
+# ===============================================================
+# CURSOR — CODIFICAÇÃO
+# ===============================================================
+
+def codificar_cursor(valores):
+    texto = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in valores])
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor, campos):
+    """Converte o cursor de volta para os tipos dos campos; None se inválido."""
+    try:
+        preenchido = cursor + "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(preenchido.encode()))
+        if not isinstance(valores, list) or len(valores) != len(campos):
+            return None
+        return [campo.to_python(valor) for campo, valor in zip(campos, valores)]
+    except Exception:
+        return None
+
+
+def filtro_apos(ordenacao, valores):
+    """
+    Q para "depois de `valores`" na `ordenacao`, ex. ("-data_hora", "-id"):
+    data_hora <= x AND (data_hora < x OR (data_hora = x AND id < y)).
+    O limite redundante na primeira chave deixa o banco usar o índice
+    como intervalo.
+    """
+    filtro = Q()
+    iguais = Q()
+
+    for item, valor in zip(ordenacao, valores):
+        nome = item.lstrip("-")
+        lookup = "lt" if item.startswith("-") else "gt"
+        filtro |= iguais & Q(**{f"{nome}__{lookup}": valor})
+        iguais &= Q(**{nome: valor})
+
+    primeiro = ordenacao[0]
+    lookup = "lte" if primeiro.startswith("-") else "gte"
+    return Q(**{f"{primeiro.lstrip('-')}__{lookup}": valores[0]}) & filtro
+
+
+def inverter(ordenacao):
+    return [item[1:] if item.startswith("-") else f"-{item}" for item in ordenacao]
+
+
+# ===============================================================
+# PÁGINA
+# ===============================================================
+
+class PaginaKeyset:
+    """Itens de uma página e os links para a anterior/próxima."""
+
+    def __init__(self, request, itens, por_pagina, cursor_anterior, cursor_proximo):
+        self.request = request
+        self.itens = itens
+        self.por_pagina = por_pagina
+        self.cursor_anterior = cursor_anterior
+        self.cursor_proximo = cursor_proximo
+
+    def __iter__(self):
+        return iter(self.itens)
+
+    def __len__(self):
+        return len(self.itens)
+
+    def __bool__(self):
+        return bool(self.itens)
+
+    @property
+    def opcoes_por_pagina(self):
+        """[(tamanho, url, ativo)] — trocar o tamanho volta para a primeira página."""
+        return [
+            (tamanho, self._url(por_pagina=tamanho), tamanho == self.por_pagina)
+            for tamanho in POR_PAGINA_OPCOES
+        ]
+
+    @property
+    def tem_outras_paginas(self):
+        return bool(self.cursor_anterior or self.cursor_proximo)
+
+    def _url(self, **params):
+        query = self.request.GET.copy()
+        for chave in ("depois", "antes"):
+            query.pop(chave, None)
+        for chave, valor in params.items():
+            query[chave] = valor
+        return f"?{query.urlencode()}"
+
+    @property
+    def url_anterior(self):
+        return self._url(antes=self.cursor_anterior) if self.cursor_anterior else None
+
+    @property
+    def url_proxima(self):
+        return self._url(depois=self.cursor_proximo) if self.cursor_proximo else None
+
+
+def ler_por_pagina(request, padrao=POR_PAGINA_PADRAO):
+    try:
+        valor = int(request.GET.get("por_pagina", padrao))
+    except ValueError:
+        return padrao
+    return valor if valor in POR_PAGINA_OPCOES else padrao
+
+
+def campo_de_ordenacao(queryset, nome):
+    """(atributo no objeto, campo) de uma chave de ordenação — campo do modelo ou anotação."""
+    anotacao = queryset.query.annotations.get(nome)
+    if anotacao is not None:
+        return nome, anotacao.output_field
+
+    campo = queryset.model._meta.get_field(nome)
+    return campo.attname, campo
+
+
+def paginar_keyset(request, queryset, ordenacao):
+    """
+    Página do queryset ordenado por `ordenacao` (a última chave deve ser
+    única, ex. "id"; anotações também servem). Lê ?depois= / ?antes= e
+    ?por_pagina= da requisição. Uma única consulta por página, sem COUNT.
+    """
+    por_pagina = ler_por_pagina(request)
+    chaves = [campo_de_ordenacao(queryset, item.lstrip("-")) for item in ordenacao]
+    campos = [campo for _, campo in chaves]
+
+    def chave(obj):
+        return codificar_cursor([getattr(obj, atributo) for atributo, _ in chaves])
+
+    depois = request.GET.get("depois")
+    antes = request.GET.get("antes")
+
+    valores_antes = decodificar_cursor(antes, campos) if antes else None
+    valores_depois = decodificar_cursor(depois, campos) if depois and not valores_antes else None
+
+    if valores_antes:
+        # voltando: percorre na ordem inversa e desfaz a inversão no final
+        itens = list(
+            queryset
+            .filter(filtro_apos(inverter(ordenacao), valores_antes))
+            .order_by(*inverter(ordenacao))[:por_pagina + 1]
+        )
+        tem_anterior = len(itens) > por_pagina
+        itens = itens[:por_pagina][::-1]
+        tem_proximo = True
+    else:
+        qs = queryset.order_by(*ordenacao)
+        if valores_depois:
+            qs = qs.filter(filtro_apos(ordenacao, valores_depois))
+
+        itens = list(qs[:por_pagina + 1])
+        tem_proximo = len(itens) > por_pagina
+        itens = itens[:por_pagina]
+        tem_anterior = bool(valores_depois)
+
+    return PaginaKeyset(
+        request,
+        itens,
+        por_pagina,
+        chave(itens[0]) if itens and tem_anterior else None,
+        chave(itens[-1]) if itens and tem_proximo else None,
+    )
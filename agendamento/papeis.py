@@ -0,0 +1,96 @@
+# ===============================================================
+# PAPÉIS DO USUÁRIO
+# ===============================================================
+#
+# Quase toda view pergunta "é médico?", "é usuário padrão?" mais de uma
+# vez por requisição (no ramo da view e de novo em context_user_flags).
+# Antes cada pergunta ia ao banco: um EXISTS em auth_user_groups e, para
+# quem não é médico, um SELECT em Medico a cada hasattr() — a relação
+# reversa inexistente não fica em cache.
+#
+# Agora:
+#   - BackendComPerfis carrega o usuário da sessão já com perfil_medico e
+#     perfil_paciente (select_related), então as duas relações saem do
+#     mesmo SELECT que o AuthenticationMiddleware já fazia;
+#   - papeis(user) lê os grupos uma vez e guarda o resultado no próprio
+#     objeto do usuário, que vive só durante a requisição.
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import ObjectDoesNotExist
+
+GRUPO_USUARIO_PADRAO = "Usuário Padrão"
+
+_ATRIBUTO = "_papeis"
+
+
+# ===============================================================
+# BACKEND DE AUTENTICAÇÃO
+# ===============================================================
+
+class BackendComPerfis(ModelBackend):
+    """ModelBackend que traz os perfis de médico e paciente junto com o usuário."""
+
+    def get_user(self, user_id):
+        User = get_user_model()
+        try:
+            user = (
+                User._default_manager
+                .select_related("perfil_medico", "perfil_paciente")
+                .get(pk=user_id)
+            )
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+# ===============================================================
+# PAPÉIS
+# ===============================================================
+
+def _tem_perfil(user, relacao):
+    try:
+        return getattr(user, relacao) is not None
+    except ObjectDoesNotExist:
+        return False
+
+
+def papeis(user):
+    """
+    {"grupos", "medico", "paciente"} do usuário, calculado na primeira
+    chamada e reaproveitado até o fim da requisição.
+    """
+    snapshot = getattr(user, _ATRIBUTO, None)
+    if snapshot is not None:
+        return snapshot
+
+    if not user.is_authenticated:
+        snapshot = {"grupos": frozenset(), "medico": False, "paciente": False}
+    else:
+        snapshot = {
+            "grupos": frozenset(user.groups.values_list("name", flat=True)),
+            "medico": _tem_perfil(user, "perfil_medico"),
+            "paciente": _tem_perfil(user, "perfil_paciente"),
+        }
+
+    setattr(user, _ATRIBUTO, snapshot)
+    return snapshot
+
+
+# ===============================================================
+# PERMISSÕES
+# ===============================================================
+
+def is_medico(user):
+    """Retorna True se o usuário é médico."""
+    return papeis(user)["medico"]
+
+
+def is_secretaria(user):
+    """Superusuário ou staff é tratado como secretaria/admin."""
+    return user.is_authenticated and (user.is_superuser or user.is_staff)
+
+
+def is_usuario_padrao(user):
+    """Usuário pertence ao grupo Usuário Padrão."""
+    return GRUPO_USUARIO_PADRAO in papeis(user)["grupos"]
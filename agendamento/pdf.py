@@ -0,0 +1,274 @@
+# ===============================================================
+# PDF DO PRONTUÁRIO — FILA DE GERAÇÃO
+# ===============================================================
+#
+# A view não roda mais o xhtml2pdf: ela registra uma TarefaPDF e responde
+# na hora. O comando `manage.py processar_pdfs` (um ou mais processos)
+# consome a fila com SELECT ... FOR UPDATE SKIP LOCKED, grava o arquivo em
+# MEDIA_ROOT e marca a tarefa como pronta; a partir daí a view serve o
+# arquivo direto do disco.
+#
+# O cache é endereçado pelo conteúdo: a chave é um SHA-256 de tudo o que
+# aparece no PDF (prontuário, paciente e convênio, exames, consultas e
+# nome/CRM dos médicos). Enquanto nada disso muda, o mesmo arquivo é
+# servido, com a chave como ETag; arquivos sem acesso há
+# PDF_CACHE_MAX_DIAS ou além de PDF_CACHE_MAX_MB são removidos.
+#
+# PDF_GERACAO = "sincrono" gera dentro da requisição (desenvolvimento).
+#
+# O xhtml2pdf (que traz reportlab, html5lib e PIL) fica em conversao_pdf.py,
+# importado só na primeira conversão: views e workers que nunca geram PDF
+# não pagam essa importação (`manage.py medir_importacao` acompanha o custo).
+
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Consulta, Exame, Paciente, TarefaPDF
+
+MAX_TENTATIVAS = 3
+
+# mude ao alterar prontuario_pdf.html para invalidar os arquivos antigos
+VERSAO_LAYOUT = 1
+
+# intervalo mínimo entre duas gravações de `acessado_em` da mesma tarefa
+INTERVALO_ACESSO = timedelta(hours=1)
+
+# tarefa "processando" há mais tempo que isso é considerada abandonada
+TEMPO_LIMITE = timedelta(minutes=10)
+
+
+def modo():
+    return getattr(settings, "PDF_GERACAO", "fila")
+
+
+# ===============================================================
+# RENDERIZAÇÃO
+# ===============================================================
+
+def contexto_prontuario(prontuario):
+    paciente = prontuario.paciente
+
+    return {
+        "prontuario": prontuario,
+        "paciente": paciente,
+        "exames": Exame.objects.filter(prontuario=prontuario).order_by("-criado_em"),
+        "consultas": (
+            Consulta.objects
+            .filter(paciente=paciente)
+            .select_related("medico__user")
+            .order_by("-data_hora")
+        ),
+    }
+
+
+def html_prontuario(prontuario):
+    return render_to_string("agendamento/prontuarios/prontuario_pdf.html", contexto_prontuario(prontuario))
+
+
+def html_para_pdf(html):
+    """Converte o HTML em PDF. Não acessa o banco — pode rodar em outro processo."""
+    from .conversao_pdf import converter
+
+    return converter(html)
+
+
+def renderizar_pdf(prontuario):
+    """Bytes do PDF do prontuário."""
+    return html_para_pdf(html_prontuario(prontuario))
+
+
+def impressao_digital(prontuario):
+    """SHA-256 dos dados que entram no PDF — muda sempre que o documento mudaria."""
+    paciente = prontuario.paciente
+
+    exames = (
+        Exame.objects
+        .filter(prontuario=prontuario)
+        .order_by("id")
+        .values_list("id", "atualizado_em")
+    )
+    # nomes e CRM dos médicos e o nome do convênio aparecem no PDF, mas não
+    # mudam atualizado_em
+    consultas = (
+        Consulta.objects
+        .filter(paciente=paciente)
+        .order_by("id")
+        .values_list(
+            "id", "atualizado_em", "data_hora", "status",
+            "medico__user__first_name", "medico__user__last_name",
+        )
+    )
+    responsavel = (
+        User.objects
+        .filter(pk=prontuario.medico_id)
+        .values_list("first_name", "last_name", "perfil_medico__crm")
+        .first()
+    )
+
+    convenio = (
+        Paciente.objects
+        .filter(pk=paciente.pk)
+        .values_list("convenio_id", "convenio__nome")
+        .first()
+    )
+
+    partes = [
+        f"v{VERSAO_LAYOUT}",
+        f"prontuario:{prontuario.pk}:{prontuario.atualizado_em.isoformat()}",
+        f"paciente:{paciente.pk}:{paciente.atualizado_em.isoformat()}",
+        f"convenio:{convenio}",
+        f"medico:{prontuario.medico_id}:{responsavel}",
+        *(f"exame:{pk}:{alterado.isoformat()}" for pk, alterado in exames),
+        *(
+            f"consulta:{pk}:{alterado.isoformat()}:{data_hora.isoformat()}:{status}:{nome}:{sobrenome}"
+            for pk, alterado, data_hora, status, nome, sobrenome in consultas
+        ),
+    ]
+
+    return hashlib.sha256("\n".join(partes).encode()).hexdigest()
+
+
+# ===============================================================
+# FILA
+# ===============================================================
+
+def tarefa_atual(prontuario):
+    """Tarefa da versão atual do prontuário, ou None. Só leitura (polling de status)."""
+    return TarefaPDF.objects.filter(prontuario=prontuario, chave=impressao_digital(prontuario)).first()
+
+
+def tarefa_do_prontuario(prontuario):
+    """
+    Tarefa da versão atual do prontuário, enfileirada se ainda não existe.
+    Uma tarefa em erro volta para a fila — é o "Tentar novamente" do usuário.
+    """
+    tarefa, _ = TarefaPDF.objects.get_or_create(
+        prontuario=prontuario,
+        chave=impressao_digital(prontuario),
+    )
+
+    if tarefa.status == "erro":
+        TarefaPDF.objects.filter(pk=tarefa.pk, status="erro").update(status="pendente", tentativas=0, erro="")
+        tarefa.refresh_from_db()
+
+    return tarefa
+
+
+def reivindicar_tarefa():
+    """
+    Marca como "processando" e retorna a tarefa mais antiga da fila, ou None.
+    Tarefas abandonadas (o worker caiu no meio) voltam à fila até
+    MAX_TENTATIVAS; depois disso ficam em erro.
+    """
+    abandonada = timezone.now() - TEMPO_LIMITE
+    abandonadas = TarefaPDF.objects.filter(status="processando", iniciado_em__lt=abandonada)
+
+    abandonadas.filter(tentativas__gte=MAX_TENTATIVAS).update(
+        status="erro",
+        erro="Geração interrompida (tempo limite) em todas as tentativas.",
+    )
+
+    with transaction.atomic():
+        tarefa = (
+            TarefaPDF.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(status="pendente")
+                | Q(status="processando", iniciado_em__lt=abandonada, tentativas__lt=MAX_TENTATIVAS)
+            )
+            .order_by("criado_em")
+            .first()
+        )
+
+        if tarefa is None:
+            return None
+
+        TarefaPDF.objects.filter(pk=tarefa.pk).update(
+            status="processando",
+            iniciado_em=timezone.now(),
+            tentativas=F("tentativas") + 1,
+        )
+
+    tarefa.refresh_from_db()
+    return tarefa
+
+
+def processar_tarefa(tarefa, tentar_de_novo=True):
+    """Gera e grava o PDF; em caso de falha devolve à fila até MAX_TENTATIVAS."""
+    try:
+        conteudo = renderizar_pdf(tarefa.prontuario)
+    except Exception as erro:
+        tarefa.erro = str(erro)
+        tarefa.status = (
+            "pendente" if tentar_de_novo and tarefa.tentativas < MAX_TENTATIVAS else "erro"
+        )
+        tarefa.save(update_fields=["erro", "status"])
+        return False
+
+    tarefa.arquivo.save(f"{tarefa.chave}.pdf", ContentFile(conteudo), save=False)
+    tarefa.tamanho = len(conteudo)
+    tarefa.status = "pronto"
+    tarefa.erro = ""
+    tarefa.concluido_em = tarefa.acessado_em = timezone.now()
+    tarefa.save(update_fields=["arquivo", "tamanho", "status", "erro", "concluido_em", "acessado_em"])
+    return True
+
+
+# ===============================================================
+# CACHE — ACESSO E REMOÇÃO
+# ===============================================================
+
+def registrar_acesso(tarefa):
+    """Atualiza `acessado_em`, no máximo uma vez por INTERVALO_ACESSO."""
+    agora = timezone.now()
+
+    if tarefa.acessado_em is None or agora - tarefa.acessado_em > INTERVALO_ACESSO:
+        TarefaPDF.objects.filter(pk=tarefa.pk).update(acessado_em=agora)
+        tarefa.acessado_em = agora
+
+
+def remover_tarefas(tarefas):
+    for tarefa in tarefas:
+        if tarefa.arquivo:
+            tarefa.arquivo.delete(save=False)
+        tarefa.delete()
+
+
+def limpar_cache(max_bytes=None, max_dias=None):
+    """
+    Remove PDFs prontos sem acesso há mais de `max_dias` e, se o total
+    ainda passar de `max_bytes`, os menos acessados recentemente.
+    Retorna quantos arquivos foram removidos.
+    """
+    if max_bytes is None:
+        max_bytes = getattr(settings, "PDF_CACHE_MAX_MB", 500) * 1024 * 1024
+    if max_dias is None:
+        max_dias = getattr(settings, "PDF_CACHE_MAX_DIAS", 30)
+
+    prontos = TarefaPDF.objects.filter(status="pronto")
+
+    antigos = list(prontos.filter(acessado_em__lt=timezone.now() - timedelta(days=max_dias)))
+    remover_tarefas(antigos)
+    removidos = len(antigos)
+
+    total = prontos.aggregate(total=Sum("tamanho"))["total"] or 0
+    if total <= max_bytes:
+        return removidos
+
+    excesso = []
+    for tarefa in prontos.order_by(F("acessado_em").asc(nulls_first=True), "id").iterator():
+        if total <= max_bytes:
+            break
+        excesso.append(tarefa)
+        total -= tarefa.tamanho or 0
+
+    remover_tarefas(excesso)
+    return removidos + len(excesso)
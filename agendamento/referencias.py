@@ -0,0 +1,185 @@
+# ===============================================================
+# DADOS DE REFERÊNCIA — ESPECIALIDADES, CONVÊNIOS E MÉDICOS
+# ===============================================================
+#
+# Tabelas que mudam poucas vezes por ano, mas aparecem em quase todo
+# formulário de consulta e nos endpoints AJAX de agendamento.
+#
+# Dois níveis de cache, amarrados a uma versão guardada no cache do Django:
+#   - compartilhado: a lista de cada fonte fica em "referencias:<fonte>:<versão>"
+#     (com Redis/Memcached, um worker carrega e os demais aproveitam);
+#   - em processo: o último resultado de cada fonte e a versão em que foi
+#     lido — enquanto a versão não muda, nem o cache compartilhado é lido
+#     além da própria versão.
+#
+# Salvar ou excluir Especialidade, Convenio ou Medico (ou mudar o nome de
+# um usuário médico) troca a versão; as entradas antigas expiram sozinhas.
+# REFERENCIAS_CACHE_SEGUNDOS = 0 desliga o cache.
+#
+# A versão também vence após REFERENCIAS_VERSAO_SEGUNDOS. Sem CACHES
+# configurado o cache do Django é um LocMemCache por processo: a troca feita
+# por um worker não chega aos outros, que só recarregam quando a própria
+# versão vence — esse prazo é o atraso máximo com que veem uma alteração
+# (horários de médicos inclusive). Com Redis/Memcached a troca vale na hora.
+
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Convenio, Especialidade, Medico
+
+CHAVE_VERSAO = "referencias:versao"
+
+
+# ===============================================================
+# FONTES
+# ===============================================================
+
+def _especialidades():
+    return list(Especialidade.objects.order_by("nome", "id"))
+
+
+def _convenios():
+    return list(Convenio.objects.order_by("nome", "id"))
+
+
+def _medicos():
+    # sem os demais campos de User: a lista vai para o cache compartilhado
+    return list(
+        Medico.objects
+        .select_related("user", "especialidade")
+        .only(
+            "id", "crm", "hora_inicio", "hora_fim", "especialidade__nome",
+            "user__username", "user__first_name", "user__last_name",
+        )
+        .order_by("user__first_name", "id")
+    )
+
+
+FONTES = {
+    "especialidades": _especialidades,
+    "convenios": _convenios,
+    "medicos": _medicos,
+}
+
+_em_processo = {}
+
+
+# ===============================================================
+# LEITURA
+# ===============================================================
+
+def segundos_em_cache():
+    return getattr(settings, "REFERENCIAS_CACHE_SEGUNDOS", 3600)
+
+
+def segundos_da_versao():
+    return getattr(settings, "REFERENCIAS_VERSAO_SEGUNDOS", 60)
+
+
+def versao():
+    """Versão atual (o time_ns de quando foi criada); renovada ao passar de segundos_da_versao()."""
+    prazo = segundos_da_versao()
+    atual = cache.get(CHAVE_VERSAO)
+
+    if atual is not None and time.time_ns() - atual > prazo * 1_000_000_000:
+        cache.delete(CHAVE_VERSAO)
+        atual = None
+
+    if atual is None:
+        cache.add(CHAVE_VERSAO, time.time_ns(), prazo)
+        atual = cache.get(CHAVE_VERSAO)
+
+    return atual
+
+
+def obter(nome):
+    """Lista da fonte `nome`, do processo, do cache compartilhado ou do banco."""
+    if not segundos_em_cache():
+        return FONTES[nome]()
+
+    atual = versao()
+    guardado = _em_processo.get(nome)
+    if guardado is not None and guardado[0] == atual:
+        return guardado[1]
+
+    chave = f"referencias:{nome}:{atual}"
+    dados = cache.get(chave)
+    if dados is None:
+        dados = FONTES[nome]()
+        cache.set(chave, dados, segundos_em_cache())
+
+    _em_processo[nome] = (atual, dados)
+    return dados
+
+
+def especialidades():
+    return obter("especialidades")
+
+
+def convenios():
+    """Todos os convênios, inclusive os inativos (filtros de relatórios)."""
+    return obter("convenios")
+
+
+def convenios_ativos():
+    return [convenio for convenio in convenios() if convenio.ativo]
+
+
+def medicos(especialidade_id=None):
+    """Médicos com user e especialidade carregados. ValueError se o ID não for numérico."""
+    todos = obter("medicos")
+
+    if especialidade_id in (None, ""):
+        return todos
+
+    especialidade_id = int(especialidade_id)
+    return [medico for medico in todos if medico.especialidade_id == especialidade_id]
+
+
+def medico(pk):
+    """Médico pelo ID, ou None. ValueError se o ID não for numérico."""
+    pk = int(pk)
+    return next((m for m in obter("medicos") if m.pk == pk), None)
+
+
+# ===============================================================
+# INVALIDAÇÃO
+# ===============================================================
+
+def invalidar():
+    """
+    Troca a versão: os processos que compartilham o cache recarregam na
+    próxima leitura; com cache local, os outros ao vencer a própria versão.
+    """
+    def trocar():
+        cache.set(CHAVE_VERSAO, time.time_ns(), segundos_da_versao())
+
+    trocar()
+    # de novo após o commit: outro processo pode ter lido os dados antigos nesse meio-tempo
+    transaction.on_commit(trocar)
+
+
+@receiver(post_save, sender=Especialidade)
+@receiver(post_delete, sender=Especialidade)
+@receiver(post_save, sender=Convenio)
+@receiver(post_delete, sender=Convenio)
+@receiver(post_save, sender=Medico)
+@receiver(post_delete, sender=Medico)
+def referencia_alterada(sender, **kwargs):
+    invalidar()
+
+
+@receiver(post_save, sender=User)
+def usuario_alterado(sender, instance, created, update_fields=None, **kwargs):
+    # o login só grava last_login; usuários novos ainda não são médicos
+    if created or update_fields == frozenset({"last_login"}):
+        return
+
+    if Medico.objects.filter(user_id=instance.pk).exists():
+        invalidar()
@@ -0,0 +1,232 @@
+# ===============================================================
+# RESUMO DIÁRIO DA AGENDA
+# ===============================================================
+#
+# ResumoAgendaDia guarda, por médico e dia, os minutos ocupados e o
+# total de consultas em cada status. Cada save/delete de Consulta
+# desfaz a contribuição antiga e soma a nova com UPDATE ... SET campo =
+# campo + delta, então "quão cheia está a agenda do Dr. X nesta semana"
+# vira uma busca pela chave (medico, data) em vez de varrer Consulta.
+#
+# O estado anterior é lido com SELECT ... FOR UPDATE (Consulta.save e
+# delete rodam em transação): duas edições simultâneas da mesma consulta
+# se enfileiram e a segunda desconta o que a primeira gravou.
+#
+# Leitores: o quadro de ocupação da semana na página inicial da secretaria
+# (ocupacao_da_semana) e os endpoints de disponibilidade, que só buscam
+# em Consulta os médicos com minutos ocupados no período
+# (disponibilidade.agendas_do_periodo com pelo_resumo=True).
+#
+# Alterações em massa via QuerySet.update() não disparam sinais; depois
+# delas rode `manage.py reconstruir_resumo_agenda`.
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .disponibilidade import STATUS_ATIVOS, expediente_medico, minutos_do_dia
+from .models import Consulta, ResumoAgendaDia
+
+CAMPO_POR_STATUS = {
+    "agendada": "agendadas",
+    "confirmada": "confirmadas",
+    "cancelada": "canceladas",
+    "realizada": "realizadas",
+}
+
+
+# ===============================================================
+# CONTRIBUIÇÃO DE UMA CONSULTA
+# ===============================================================
+
+def contribuicao(medico_id, data_hora, duracao, status):
+    """((medico_id, data), {campo: delta}) que a consulta soma ao resumo."""
+    campos = {}
+
+    if status in CAMPO_POR_STATUS:
+        campos[CAMPO_POR_STATUS[status]] = 1
+    if status in STATUS_ATIVOS:
+        campos["minutos_ocupados"] = duracao
+
+    return (medico_id, timezone.localdate(data_hora)), campos
+
+
+def ajustar_resumo(deltas):
+    """Aplica {(medico_id, data): {campo: delta}}; cria a linha só se algum delta é positivo."""
+    with transaction.atomic():
+        for (medico_id, data), campos in deltas.items():
+            campos = {campo: delta for campo, delta in campos.items() if delta}
+            if not campos:
+                continue
+
+            linha = ResumoAgendaDia.objects.filter(medico_id=medico_id, data=data)
+            alteracao = {campo: F(campo) + delta for campo, delta in campos.items()}
+
+            if not linha.update(**alteracao) and any(d > 0 for d in campos.values()):
+                ResumoAgendaDia.objects.bulk_create(
+                    [ResumoAgendaDia(medico_id=medico_id, data=data)],
+                    ignore_conflicts=True,
+                )
+                linha.update(**alteracao)
+
+
+# ===============================================================
+# SINAIS
+# ===============================================================
+
+def estado_no_banco(consulta):
+    """
+    (medico_id, data_hora, duracao, status) gravados — a instância pode estar
+    defasada. Trava a linha até o fim da transação do save/delete.
+    """
+    return (
+        Consulta.objects
+        .select_for_update()
+        .filter(pk=consulta.pk)
+        .values_list("medico_id", "data_hora", "duracao_minutos", "status")
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Consulta)
+def guardar_estado_anterior(sender, instance, raw=False, **kwargs):
+    instance._resumo_anterior = None
+
+    if not raw and not instance._state.adding and instance.pk is not None:
+        instance._resumo_anterior = estado_no_banco(instance)
+
+
+@receiver(post_save, sender=Consulta)
+def atualizar_resumo(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    anterior = getattr(instance, "_resumo_anterior", None)
+    if anterior:
+        chave, campos = contribuicao(*anterior)
+        for campo, delta in campos.items():
+            deltas[chave][campo] -= delta
+
+    chave, campos = contribuicao(
+        instance.medico_id, instance.data_hora, instance.duracao_minutos, instance.status
+    )
+    for campo, delta in campos.items():
+        deltas[chave][campo] += delta
+
+    ajustar_resumo(deltas)
+
+
+@receiver(pre_delete, sender=Consulta)
+def guardar_estado_excluido(sender, instance, **kwargs):
+    instance._resumo_anterior = estado_no_banco(instance)
+
+
+@receiver(post_delete, sender=Consulta)
+def descontar_resumo(sender, instance, **kwargs):
+    anterior = getattr(instance, "_resumo_anterior", None)
+    if not anterior:
+        return
+
+    chave, campos = contribuicao(*anterior)
+    ajustar_resumo({chave: {campo: -delta for campo, delta in campos.items()}})
+
+
+# ===============================================================
+# RECONSTRUÇÃO
+# ===============================================================
+
+def totais_por_dia(consultas):
+    """Agrega Consulta por (médico, dia local) com os mesmos campos do resumo."""
+    return (
+        consultas
+        .order_by()
+        .annotate(data=TruncDate("data_hora"))
+        .values("medico_id", "data")
+        .annotate(
+            minutos_ocupados=Coalesce(
+                Sum("duracao_minutos", filter=Q(status__in=STATUS_ATIVOS)), 0
+            ),
+            **{
+                campo: Count("id", filter=Q(status=status))
+                for status, campo in CAMPO_POR_STATUS.items()
+            },
+        )
+    )
+
+
+def reconstruir_resumos(medico_ids=None):
+    """Apaga e recalcula os resumos (de todos ou de `medico_ids`). Retorna quantos foram gravados."""
+    consultas = Consulta.objects.all()
+    resumos = ResumoAgendaDia.objects.all()
+
+    if medico_ids is not None:
+        consultas = consultas.filter(medico_id__in=medico_ids)
+        resumos = resumos.filter(medico_id__in=medico_ids)
+
+    with transaction.atomic():
+        resumos.delete()
+        criados = ResumoAgendaDia.objects.bulk_create(
+            (ResumoAgendaDia(**linha) for linha in totais_por_dia(consultas)),
+            batch_size=1000,
+        )
+
+    return len(criados)
+
+
+# ===============================================================
+# LEITURA
+# ===============================================================
+
+def ocupacao_do_periodo(medicos, data_inicio, data_fim):
+    """
+    Ocupação de cada médico entre data_inicio e data_fim (inclusive), lida
+    só do resumo: {medico_id: {"minutos_ocupados", "minutos_expediente",
+    "percentual", "consultas"}}.
+    """
+    dias = (data_fim - data_inicio).days + 1
+    ocupacao = {}
+
+    for medico in medicos:
+        hora_inicio, hora_fim = expediente_medico(medico)
+        expediente = max(minutos_do_dia(hora_fim) - minutos_do_dia(hora_inicio), 0) * dias
+        ocupacao[medico.pk] = {
+            "minutos_ocupados": 0,
+            "minutos_expediente": expediente,
+            "percentual": 0,
+            "consultas": 0,
+        }
+
+    totais = (
+        ResumoAgendaDia.objects
+        .filter(medico_id__in=list(ocupacao), data__gte=data_inicio, data__lte=data_fim)
+        .order_by()
+        .values("medico_id")
+        .annotate(
+            minutos=Sum("minutos_ocupados"),
+            consultas=Sum(F("agendadas") + F("confirmadas")),
+        )
+    )
+
+    for linha in totais:
+        item = ocupacao[linha["medico_id"]]
+        item["minutos_ocupados"] = linha["minutos"]
+        item["consultas"] = linha["consultas"]
+        if item["minutos_expediente"]:
+            item["percentual"] = round(100 * linha["minutos"] / item["minutos_expediente"])
+
+    return ocupacao
+
+
+def ocupacao_da_semana(medicos, dia=None):
+    """Ocupação de segunda a domingo da semana de `dia` (padrão: hoje)."""
+    dia = dia or timezone.localdate()
+    segunda = dia - timedelta(days=dia.weekday())
+    return ocupacao_do_periodo(medicos, segunda, segunda + timedelta(days=6))
@@ -1,3 +1,1668 @@
-from django.test import TestCase
+import asyncio
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date, datetime, time, timedelta
+from io import BytesIO, StringIO
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, Group, User
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from .autocomplete import LIMITE_RESULTADOS, limpar_indices, sugestoes
+from .busca import (
+    ORDEM_BUSCA, ORDEM_BUSCA_CID, ORDEM_BUSCA_PRONTUARIOS, buscar_cids, buscar_pacientes, buscar_prontuarios
+)
+from .disponibilidade import (
+    agenda_do_dia, agendas_do_periodo, conflito_de_horario, horario_livre, sobreposicoes
+)
+from .estatisticas import consultas_por_status, estatisticas_dashboard
+from .eventos import CANAL, OuvintePostgres, broker
+from .exportacao import (
+    CABECALHO_FATURAMENTO, converter_em_lote, filtrar_consultas_faturamento, filtrar_prontuarios,
+    ler_filtros, ler_filtros_consultas
+)
+from .forms import MedicoForm
+from .models import (
+    CID, CONSTRAINT_SOBREPOSICAO, ContadorNotificacao, Consulta, Convenio, Especialidade, Exame, Medico, Notificacao,
+    Paciente, Prontuario, ResumoAgendaDia, TarefaPDF,
+)
+from .notificacoes import marcar_como_lidas, nao_lidas, nao_lidas_em_cache, recalcular_contadores
+from .paginacao import decodificar_cursor
+from .papeis import is_medico, is_usuario_padrao, papeis
+from . import referencias
+from .pdf import MAX_TENTATIVAS, TEMPO_LIMITE, impressao_digital, limpar_cache, reivindicar_tarefa
+from .resumo_agenda import ocupacao_da_semana
+
+
+# ===============================================================
+# FUNÇÕES AUXILIARES
+# ===============================================================
+
+DIA = date.today() + timedelta(days=7)
+
+
+def criar_medico(username, especialidade=None, hora_inicio=time(8, 0), hora_fim=time(12, 0)):
+    user = User.objects.create_user(username=username, first_name=username.title())
+    return Medico.objects.create(
+        user=user,
+        crm=f"CRM-{username}",
+        especialidade=especialidade,
+        hora_inicio=hora_inicio,
+        hora_fim=hora_fim,
+    )
+
+
+def criar_consulta(medico, paciente, hora, duracao=30, status="agendada", dia=DIA):
+    return Consulta.objects.create(
+        medico=medico,
+        paciente=paciente,
+        data_hora=timezone.make_aware(datetime.combine(dia, hora)),
+        duracao_minutos=duracao,
+        status=status,
+    )
+
+
+# ===============================================================
+# DISPONIBILIDADE — MOTOR EM BITMAP
+# ===============================================================
+
+class DisponibilidadeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.especialidade = Especialidade.objects.create(nome="Clínica Geral")
+        cls.medico = criar_medico("ana", cls.especialidade)
+        cls.paciente = Paciente.objects.create(nome="Paciente Teste")
+
+    def test_grade_segue_expediente_do_medico(self):
+        agenda = agenda_do_dia(self.medico, DIA)
+
+        self.assertEqual(agenda.slots()[0], "08:00")
+        self.assertEqual(agenda.slots()[-1], "11:30")
+        self.assertEqual(agenda.total_slots, 8)
+        self.assertEqual(agenda.horarios(), agenda.slots())
+
+    def test_duracao_bloqueia_todos_os_slots_ocupados(self):
+        criar_consulta(self.medico, self.paciente, time(9, 0), duracao=60)
+        criar_consulta(self.medico, self.paciente, time(10, 15), duracao=15)
+        criar_consulta(self.medico, self.paciente, time(11, 0), status="cancelada")
+
+        agenda = agenda_do_dia(self.medico, DIA)
+
+        self.assertEqual(agenda.horarios(), ["08:00", "08:30", "10:30", "11:00", "11:30"])
+        self.assertEqual(agenda.primeiro_livre(), "08:00")
+
+    def test_horario_livre_detecta_sobreposicao(self):
+        consulta = criar_consulta(self.medico, self.paciente, time(9, 0), duracao=60)
+        inicio = timezone.make_aware(datetime.combine(DIA, time(9, 30)))
+
+        self.assertFalse(horario_livre(self.medico, inicio, 30))
+        self.assertTrue(horario_livre(self.medico, inicio + timedelta(minutes=30), 30))
+        self.assertTrue(horario_livre(self.medico, inicio, 30, excluir_pk=consulta.pk))
+
+    def test_periodo_em_uma_unica_consulta(self):
+        outro = criar_medico("bia", self.especialidade)
+        criar_consulta(outro, self.paciente, time(8, 0), dia=DIA + timedelta(days=1))
+
+        with self.assertNumQueries(1):
+            agendas = agendas_do_periodo([self.medico, outro], DIA, DIA + timedelta(days=6))
+
+        self.assertEqual(len(agendas[outro.pk]), 7)
+        self.assertEqual(agendas[outro.pk][DIA + timedelta(days=1)].primeiro_livre(), "08:30")
+
+    def test_view_horarios_disponiveis(self):
+        criar_consulta(self.medico, self.paciente, time(8, 0), duracao=60)
+
+        response = self.client.get(reverse("horarios_disponiveis"), {
+            "medico_id": self.medico.pk,
+            "data": DIA.isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("08:30", response.json()["horarios"])
+        self.assertIn("08:30", response.json()["grade"])
+
+
+# ===============================================================
+# MÉDICOS — COM DISPONIBILIDADE (AJAX)
+# ===============================================================
+
+class MedicosComDisponibilidadeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.especialidade = Especialidade.objects.create(nome="Cardiologia")
+        cls.paciente = Paciente.objects.create(nome="Paciente Teste")
+
+    def consultar(self):
+        return self.client.get(reverse("medicos_com_disponibilidade"), {
+            "data": DIA.isoformat(),
+            "especialidade": self.especialidade.pk,
+        })
+
+    def test_numero_de_queries_nao_cresce_com_medicos(self):
+        criar_medico("m0", self.especialidade)
+
+        with self.assertNumQueries(2):
+            self.consultar()
+
+        for i in range(1, 40):
+            medico = criar_medico(f"m{i}", self.especialidade)
+            criar_consulta(medico, self.paciente, time(8, 0))
+
+        with self.assertNumQueries(2):
+            response = self.consultar()
+
+        self.assertEqual(len(response.json()["medicos"]), 40)
+
+    def test_limite_diario_segue_expediente(self):
+        curto = criar_medico("curto", self.especialidade, time(8, 0), time(9, 0))
+        longo = criar_medico("longo", self.especialidade, time(8, 0), time(18, 0))
+
+        criar_consulta(curto, self.paciente, time(8, 0), duracao=60)
+        criar_consulta(longo, self.paciente, time(8, 0), duracao=60)
+
+        ids = [m["id"] for m in self.consultar().json()["medicos"]]
+
+        self.assertNotIn(curto.pk, ids)
+        self.assertIn(longo.pk, ids)
+
+
+# ===============================================================
+# CONSULTAS — CALENDÁRIO DE DISPONIBILIDADE (AJAX)
+# ===============================================================
+
+class CalendarioDisponibilidadeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.especialidade = Especialidade.objects.create(nome="Pediatria")
+        cls.paciente = Paciente.objects.create(nome="Paciente Teste")
+        cls.ana = criar_medico("ana", cls.especialidade, time(8, 0), time(9, 0))
+        cls.bia = criar_medico("bia", cls.especialidade, time(8, 0), time(9, 0))
+
+    def consultar(self, **params):
+        params.setdefault("inicio", DIA.isoformat())
+        params.setdefault("fim", (DIA + timedelta(days=2)).isoformat())
+        return self.client.get(reverse("calendario_disponibilidade"), params)
+
+    def test_calendario_de_um_medico(self):
+        criar_consulta(self.ana, self.paciente, time(8, 0), duracao=60)
+        criar_consulta(self.ana, self.paciente, time(8, 0), dia=DIA + timedelta(days=1))
+
+        dias = self.consultar(medico_id=self.ana.pk).json()["dias"]
+
+        self.assertEqual([d["livres"] for d in dias], [0, 1, 2])
+        self.assertEqual([d["primeiro"] for d in dias], [None, "08:30", "08:00"])
+
+    def test_calendario_da_especialidade_em_duas_queries(self):
+        criar_consulta(self.ana, self.paciente, time(8, 0), duracao=60)
+        criar_consulta(self.bia, self.paciente, time(8, 0))
+
+        with self.assertNumQueries(2):
+            dias = self.consultar(especialidade_id=self.especialidade.pk).json()["dias"]
+
+        self.assertEqual(dias[0], {"data": DIA.isoformat(), "livres": 1, "primeiro": "08:30"})
+
+    def test_mes_inteiro_e_parametros_invalidos(self):
+        dias = self.consultar(medico_id=self.ana.pk, mes="2030-02").json()["dias"]
+        self.assertEqual(len(dias), 28)
+
+        self.assertEqual(self.consultar().status_code, 400)
+        self.assertEqual(self.consultar(medico_id="x").status_code, 400)
+        self.assertEqual(self.consultar(medico_id=self.ana.pk, fim="2099-01-01").status_code, 400)
+
+
+# ===============================================================
+# ÍNDICES — PLANO DE EXECUÇÃO DAS CONSULTAS CRÍTICAS
+# ===============================================================
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN dos índices requer PostgreSQL")
+class IndicesConsultaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        medicos = [criar_medico(f"med{i}") for i in range(30)]
+        pacientes = Paciente.objects.bulk_create(
+            Paciente(nome=f"Paciente {i}") for i in range(300)
+        )
+
+        base = timezone.make_aware(datetime.combine(DIA, time(8, 0)))
+        status = ["realizada", "realizada", "cancelada", "agendada", "confirmada"]
+
+        Consulta.objects.bulk_create(
+            Consulta(
+                medico=medicos[i % len(medicos)],
+                paciente=pacientes[i % len(pacientes)],
+                data_hora=base - timedelta(days=i // 60, minutes=30 * (i % 16)),
+                status=status[i % len(status)],
+            )
+            for i in range(15000)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE agendamento_consulta")
+
+    def test_planner_usa_os_indices(self):
+        saida = StringIO()
+        call_command("verificar_indices", estrito=True, data=DIA.isoformat(), stdout=saida)
+
+        self.assertEqual(saida.getvalue().count("OK"), 6)
+
+
+# ===============================================================
+# CONSULTAS — SOBREPOSIÇÃO GARANTIDA PELO BANCO
+# ===============================================================
+
+@skipUnless(connection.vendor == "postgresql", "exclusion constraint requer PostgreSQL")
+class SobreposicaoConsultaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.medico = criar_medico("ana")
+        cls.paciente = Paciente.objects.create(nome="Paciente Teste")
+
+    def test_banco_rejeita_consultas_ativas_sobrepostas(self):
+        criar_consulta(self.medico, self.paciente, time(9, 0), duracao=60)
+
+        with self.assertRaises(IntegrityError) as ctx, transaction.atomic():
+            criar_consulta(self.medico, self.paciente, time(9, 30))
+
+        self.assertTrue(conflito_de_horario(ctx.exception))
+
+        # canceladas, adjacentes e de outro médico não conflitam
+        criar_consulta(self.medico, self.paciente, time(9, 30), status="cancelada")
+        criar_consulta(self.medico, self.paciente, time(10, 0))
+        criar_consulta(criar_medico("bia"), self.paciente, time(9, 0))
+
+    def test_view_traduz_violacao_para_json(self):
+        criar_consulta(self.medico, self.paciente, time(9, 0))
+        user = User.objects.create_user(username="paciente", password="x")
+        self.client.force_login(user)
+
+        # simula a corrida: a validação do formulário não vê a outra reserva
+        with patch("agendamento.forms.horario_livre", return_value=True):
+            response = self.client.post(
+                reverse("criar_consulta"),
+                {
+                    "medico": self.medico.pk,
+                    "data": DIA.isoformat(),
+                    "hora": "09:00",
+                    "duracao_minutos": 30,
+                    "status": "agendada",
+                    "confirmada": "True",
+                },
+                HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("hora", response.json()["errors"])
+        self.assertEqual(Consulta.objects.filter(medico=self.medico).count(), 1)
+
+    def test_confirmar_cancelada_com_horario_ocupado(self):
+        cancelada = criar_consulta(self.medico, self.paciente, time(9, 0), status="cancelada")
+        criar_consulta(self.medico, self.paciente, time(9, 0))
+        self.client.force_login(User.objects.create_user(username="admin", is_staff=True))
+
+        response = self.client.post(reverse("confirmar_consulta", args=[cancelada.pk]), follow=True)
+
+        self.assertRedirects(response, reverse("listar_consultas"))
+        self.assertContains(response, "já está reservado")
+        cancelada.refresh_from_db()
+        self.assertEqual(cancelada.status, "cancelada")
+
+    def test_sobreposicoes_mantem_a_que_comeca_antes(self):
+        inicio = timezone.make_aware(datetime.combine(DIA, time(8, 0)))
+
+        linhas = [
+            (pk, medico_id, inicio + timedelta(minutes=apos), duracao)
+            for pk, medico_id, apos, duracao in [
+                (1, 1, 0, 120),   # 08:00–10:00
+                (2, 1, 30, 30),   # dentro da primeira
+                (3, 1, 90, 0),    # vazia: não conflita
+                (4, 1, 120, 30),  # adjacente
+                (5, 2, 0, 30),    # outro médico
+                (6, 2, 15, 30),
+            ]
+        ]
+
+        self.assertEqual(sobreposicoes(linhas), [(2, 1), (6, 5)])
+
+    def test_comando_cancela_sobrepostas(self):
+        criar_consulta(self.medico, self.paciente, time(9, 0), duracao=60)
+
+        # dados anteriores à constraint (removida só dentro da transação do teste)
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(f"ALTER TABLE agendamento_consulta DROP CONSTRAINT {CONSTRAINT_SOBREPOSICAO}")
+        excedente = criar_consulta(self.medico, self.paciente, time(9, 30))
+
+        with self.assertRaises(CommandError):
+            call_command("verificar_sobreposicoes", stdout=StringIO())
+
+        saida = StringIO()
+        call_command("verificar_sobreposicoes", cancelar=True, stdout=saida)
+
+        excedente.refresh_from_db()
+        self.assertEqual(excedente.status, "cancelada")
+        self.assertIn("sobreposto", excedente.observacoes)
+        self.assertIn("1 consulta(s) cancelada(s)", saida.getvalue())
+
+
+# ===============================================================
+# NOTIFICAÇÕES — STREAM SSE
+# ===============================================================
+
+@override_settings(NOTIFICACOES_PUBSUB="local", NOTIFICACOES_SSE_HEARTBEAT=1)
+class NotificacoesStreamTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="ana")
+
+    def test_broker_local_entrega_apos_commit(self):
+        loop = asyncio.new_event_loop()
+        fila = asyncio.Queue()
+        broker.assinar(self.user.pk, loop, fila)
+
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                n = Notificacao.objects.create(usuario=self.user, titulo="Oi", mensagem="Teste")
+
+            loop.run_until_complete(asyncio.sleep(0))
+            self.assertEqual(fila.get_nowait(), n.pk)
+        finally:
+            broker.cancelar(self.user.pk, loop, fila)
+            loop.close()
+
+    async def test_stream_envia_contagem_e_novas(self):
+        await Notificacao.objects.acreate(usuario=self.user, titulo="Antiga", mensagem="x")
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse("notificacoes_stream"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        eventos = aiter(response.streaming_content)
+        self.assertEqual(await anext(eventos), b"retry: 5000\n\n")
+        self.assertIn(b'"count": 1', await anext(eventos))
+
+        proximo = asyncio.ensure_future(anext(eventos))
+        await asyncio.sleep(0)
+        n = await Notificacao.objects.acreate(usuario=self.user, titulo="Nova", mensagem="y")
+        broker.entregar(self.user.pk, n.pk)
+
+        evento = await proximo
+        self.assertTrue(evento.startswith(b"event: notificacao"))
+        self.assertIn(b'"count": 2', evento)
+        await eventos.aclose()
+
+
+class ParadaOuvinte(Exception):
+    pass
+
+
+@skipUnless(connection.vendor == "postgresql", "LISTEN/NOTIFY requer PostgreSQL")
+class OuvintePostgresTests(TestCase):
+
+    def test_escutar_entrega_notify_no_driver_em_uso(self):
+        ouvinte = OuvintePostgres()
+        # conexões próprias, em autocommit: o NOTIFY sai na hora, fora da transação do teste
+        escuta = ouvinte.conectar()
+        publicacao = ouvinte.conectar()
+        self.addCleanup(escuta.close)
+        self.addCleanup(publicacao.close)
+
+        with publicacao.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CANAL, '{"usuario": 7, "id": 42}'])
+
+        # a primeira entrega interrompe o laço infinito de escutar()
+        with patch.object(broker, "entregar", side_effect=ParadaOuvinte) as entregar:
+            with self.assertRaises(ParadaOuvinte):
+                ouvinte.escutar(escuta, espera=5)
+
+        entregar.assert_called_once_with(7, 42)
+
+
+# ===============================================================
+# NOTIFICAÇÕES — CONTADOR DE NÃO LIDAS
+# ===============================================================
+
+class ContadorNotificacaoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="ana")
+
+    def notificar(self, quantidade=1):
+        return [
+            Notificacao.objects.create(usuario=self.user, titulo=f"N{i}", mensagem="x")
+            for i in range(quantidade)
+        ]
+
+    def contagem(self):
+        return self.client.get(reverse("notificacoes_count")).json()["count"]
+
+    def test_contador_acompanha_criacao_leitura_e_exclusao(self):
+        self.client.force_login(self.user)
+        primeira, segunda, terceira = self.notificar(3)
+
+        with self.assertNumQueries(3):  # sessão, usuário, contador
+            self.assertEqual(self.contagem(), 3)
+
+        self.client.post(reverse("notificacoes_marcar_lida", args=[primeira.pk]))
+        self.client.post(reverse("notificacoes_marcar_lida", args=[primeira.pk]))
+        self.assertEqual(self.contagem(), 2)
+
+        segunda.delete()
+        self.assertEqual(self.contagem(), 1)
+
+        marcar_como_lidas(self.user)
+        self.assertEqual(nao_lidas(self.user.pk), 0)
+
+    def test_excluir_usuario_com_nao_lidas(self):
+        self.notificar(2)
+        self.user.delete()
+
+        self.assertFalse(ContadorNotificacao.objects.exists())
+
+    def test_listar_consultas_do_medico_zera_contador(self):
+        medico = criar_medico("doutor")
+        Notificacao.objects.create(usuario=medico.user, titulo="Nova", mensagem="x")
+
+        self.client.force_login(medico.user)
+        self.client.get(reverse("listar_consultas"))
+
+        self.assertEqual(nao_lidas(medico.user.pk), 0)
+
+    def test_comando_reconstroi_contador(self):
+        self.notificar(2)
+        ContadorNotificacao.objects.filter(usuario=self.user).update(nao_lidas=40)
+
+        call_command("recalcular_notificacoes", stdout=StringIO())
+
+        self.assertEqual(nao_lidas(self.user.pk), 2)
+
+    def test_recalcular_avanca_a_versao(self):
+        self.notificar(1)
+        outro = User.objects.create_user(username="sem_notificacoes")
+        ContadorNotificacao.objects.create(usuario=outro, nao_lidas=5, versao=7)
+        antes = ContadorNotificacao.objects.get(usuario=self.user)
+
+        recalcular_contadores()
+
+        depois = ContadorNotificacao.objects.get(usuario=self.user)
+        self.assertEqual((depois.nao_lidas, depois.versao), (1, antes.versao + 1))
+        self.assertGreater(depois.atualizado_em, antes.atualizado_em)
+
+        zerado = ContadorNotificacao.objects.get(usuario=outro)
+        self.assertEqual((zerado.nao_lidas, zerado.versao), (0, 8))
+        self.assertIsNotNone(zerado.atualizado_em)
+
+
+# ===============================================================
+# NOTIFICAÇÕES — GET CONDICIONAL (ETAG)
+# ===============================================================
+
+class NotificacoesEtagTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="ana")
+        Notificacao.objects.create(usuario=cls.user, titulo="N1", mensagem="x")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_sem_alteracao_responde_304_sem_ler_notificacoes(self):
+        for nome in ("notificacoes_list", "notificacoes_novas", "notificacoes_count"):
+            primeira = self.client.get(reverse(nome))
+            self.assertEqual(primeira.status_code, 200)
+
+            with self.assertNumQueries(3):  # sessão, usuário, versão
+                segunda = self.client.get(reverse(nome), HTTP_IF_NONE_MATCH=primeira["ETag"])
+
+            self.assertEqual(segunda.status_code, 304)
+
+    def test_etag_muda_com_nova_notificacao_e_leitura(self):
+        url = reverse("notificacoes_list")
+        etag = self.client.get(url)["ETag"]
+
+        n = Notificacao.objects.create(usuario=self.user, titulo="N2", mensagem="y")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        marcar_como_lidas(self.user, ids=[n.pk])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depende_dos_parametros(self):
+        url = reverse("notificacoes_list")
+        self.assertNotEqual(self.client.get(url)["ETag"], self.client.get(url, {"limit": 3})["ETag"])
+
+
+# ===============================================================
+# LISTAGENS — PAGINAÇÃO POR CURSOR
+# ===============================================================
+
+class PaginacaoKeysetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="admin", is_staff=True)
+        cls.medico = criar_medico("ana")
+
+        # nomes repetidos: o desempate fica por conta do id
+        cls.pacientes = Paciente.objects.bulk_create(
+            [Paciente(nome=f"Paciente {i % 7:02d}") for i in range(30)]
+        )
+        for i, paciente in enumerate(cls.pacientes[:25]):
+            # várias consultas no mesmo horário (médicos diferentes no mundo real)
+            criar_consulta(cls.medico, paciente, time(8, 0), status="cancelada",
+                           dia=DIA + timedelta(days=i // 3))
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def percorrer(self, nome, chave, **params):
+        vistos = []
+        response = self.client.get(reverse(nome), params)
+
+        while True:
+            pagina = response.context[chave]
+            vistos.extend(obj.pk for obj in pagina)
+            if not pagina.url_proxima:
+                return vistos, pagina
+            response = self.client.get(reverse(nome) + pagina.url_proxima)
+
+    def test_pacientes_percorre_todas_as_paginas_em_ordem(self):
+        vistos, ultima = self.percorrer("listar_pacientes", "pacientes", por_pagina=10)
+
+        esperado = list(Paciente.objects.order_by("nome", "id").values_list("pk", flat=True))
+        self.assertEqual(vistos, esperado)
+
+        # voltando a partir da última página
+        anterior = self.client.get(reverse("listar_pacientes") + ultima.url_anterior)
+        self.assertEqual([p.pk for p in anterior.context["pacientes"]], esperado[10:20])
+
+    def test_consultas_com_horarios_iguais(self):
+        vistos, _ = self.percorrer("listar_consultas", "consultas", por_pagina=10)
+
+        esperado = list(Consulta.objects.order_by("-data_hora", "-id").values_list("pk", flat=True))
+        self.assertEqual(vistos, esperado)
+        self.assertEqual(len(set(vistos)), 25)
+
+    def test_custo_da_pagina_nao_depende_da_posicao(self):
+        url = reverse("listar_prontuarios")
+        Prontuario.objects.bulk_create(
+            [Prontuario(paciente=p) for p in self.pacientes for _ in range(2)]
+        )
+
+        with CaptureQueriesContext(connection) as primeira:
+            pagina = self.client.get(url, {"por_pagina": 10}).context["prontuarios"]
+        with self.assertNumQueries(len(primeira)):
+            pagina = self.client.get(url + pagina.url_proxima).context["prontuarios"]
+
+        self.assertEqual(len(pagina), 10)
+        self.assertNotIn("COUNT(", " ".join(q["sql"] for q in primeira.captured_queries))
+
+    def test_parametros_invalidos_voltam_ao_padrao(self):
+        response = self.client.get(reverse("listar_pacientes"), {"por_pagina": "999", "depois": "lixo"})
+        pagina = response.context["pacientes"]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(pagina.por_pagina, 25)
+        self.assertEqual(len(pagina), 25)
+        self.assertIsNone(decodificar_cursor("lixo", [Paciente._meta.pk]))
+
+
+# ===============================================================
+# CONSULTAS — LISTAGEM SEM CONSULTAS POR LINHA
+# ===============================================================
+
+class ListarConsultasQueriesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="admin", is_staff=True)
+        cls.especialidade = Especialidade.objects.create(nome="Cardiologia")
+        cls.convenio = Convenio.objects.create(nome="Saúde Mais")
+        cls.medicos = [criar_medico(f"med{i}", cls.especialidade) for i in range(5)]
+
+        grupo, _ = Group.objects.get_or_create(name="Usuário Padrão")
+        cls.usuario_paciente = User.objects.create_user(username="paciente")
+        cls.usuario_paciente.groups.add(grupo)
+        cls.paciente = Paciente.objects.create(nome="Paciente Logado", usuario=cls.usuario_paciente)
+
+    def semear(self, total):
+        pacientes = Paciente.objects.bulk_create(
+            Paciente(nome=f"Paciente {i}") for i in range(min(total, 50))
+        )
+        base = timezone.make_aware(datetime.combine(DIA, time(8, 0)))
+
+        Consulta.objects.bulk_create(
+            Consulta(
+                medico=self.medicos[i % len(self.medicos)],
+                # metade das consultas é do paciente logado
+                paciente=self.paciente if i % 2 else pacientes[i % len(pacientes)],
+                convenio=self.convenio if i % 3 == 0 else None,
+                usa_convenio=i % 3 == 0,
+                data_hora=base - timedelta(hours=i),
+                status="realizada",
+            )
+            for i in range(total)
+        )
+
+    def queries_da_listagem(self, usuario):
+        self.client.force_login(usuario)
+        # mesmas condições nas duas medições (badge de notificações em cache)
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("listar_consultas"), {"por_pagina": 100})
+
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), list(response.context["consultas"])
+
+    def test_numero_de_queries_fixo_para_10_e_1000_consultas(self):
+        medico = self.medicos[0]
+        usuarios = (self.staff, self.usuario_paciente, medico.user)
+
+        self.semear(10)
+        poucas = {u.username: self.queries_da_listagem(u) for u in usuarios}
+
+        Consulta.objects.all().delete()
+        self.semear(1000)
+        muitas = {u.username: self.queries_da_listagem(u) for u in usuarios}
+
+        for username in poucas:
+            self.assertEqual(poucas[username][0], muitas[username][0], username)
+
+        self.assertEqual(len(poucas["admin"][1]), 10)
+        self.assertEqual(len(muitas["admin"][1]), 100)
+        self.assertEqual(len(muitas["paciente"][1]), 100)
+
+        # médico: só as próprias (1 em cada 5 consultas semeadas)
+        self.assertEqual(len(poucas[medico.user.username][1]), 2)
+        self.assertEqual(len(muitas[medico.user.username][1]), 100)
+        for consultas in (poucas[medico.user.username][1], muitas[medico.user.username][1]):
+            self.assertEqual({c.medico_id for c in consultas}, {medico.pk})
+
+
+# ===============================================================
+# DASHBOARD — ESTATÍSTICAS AGREGADAS
+# ===============================================================
+
+@override_settings(DASHBOARD_CACHE_SEGUNDOS=0)
+class EstatisticasDashboardTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="admin", is_staff=True)
+        cls.especialidade = Especialidade.objects.create(nome="Cardiologia")
+        cls.medico = criar_medico("ana", cls.especialidade)
+        outro = criar_medico("bia", cls.especialidade)
+
+        cls.p1 = Paciente.objects.create(nome="P1")
+        cls.p2 = Paciente.objects.create(nome="P2")
+        Paciente.objects.create(nome="Sem consultas")
+
+        criar_consulta(cls.medico, cls.p1, time(8, 0))
+        criar_consulta(cls.medico, cls.p1, time(9, 0), status="confirmada")
+        criar_consulta(cls.medico, cls.p2, time(10, 0), status="cancelada")
+        criar_consulta(outro, cls.p2, time(8, 0))
+
+        Prontuario.objects.create(paciente=cls.p1)
+        Prontuario.objects.create(paciente=cls.p2)
+
+    def test_secretaria_em_duas_consultas(self):
+        with self.assertNumQueries(2):
+            stats = estatisticas_dashboard("secretaria", self.staff)
+
+        self.assertEqual(stats["total_consultas"], 4)
+        self.assertEqual(stats["total_pendentes"], 2)
+        self.assertEqual(stats["total_pacientes"], 3)
+        self.assertEqual(stats["total_medicos"], 2)
+        self.assertEqual(stats["total_especialidades"], 1)
+        self.assertEqual(stats["total_prontuarios"], 2)
+        self.assertEqual(stats["total_exames"], 0)
+
+    def test_medico_sem_distinct_por_join(self):
+        usuario = self.medico.user
+        usuario.perfil_medico  # perfil já carregado, como na view
+
+        with self.assertNumQueries(2):
+            stats = estatisticas_dashboard("medico", usuario)
+
+        self.assertEqual(stats["total_consultas"], 3)
+        self.assertEqual(stats["total_pacientes_medico"], 2)
+        self.assertEqual(stats["total_prontuarios"], 2)
+
+    def test_listas_por_status_em_uma_consulta(self):
+        with self.assertNumQueries(1):
+            grupos = consultas_por_status(Consulta.objects.all(), limite=1)
+
+        self.assertEqual([len(grupos[s]) for s in ("agendada", "confirmada", "cancelada")], [1, 1, 1])
+        self.assertEqual(timezone.localtime(grupos["agendada"][0].data_hora).hour, 8)
+
+    @override_settings(DASHBOARD_CACHE_SEGUNDOS=30)
+    def test_cache_por_papel(self):
+        cache.clear()
+        estatisticas_dashboard("secretaria", self.staff)
+
+        with self.assertNumQueries(0):
+            stats = estatisticas_dashboard("secretaria", self.staff)
+        self.assertEqual(stats["total_consultas"], 4)
+
+        # o cache do médico é separado
+        with self.assertNumQueries(2):
+            estatisticas_dashboard("medico", self.medico.user)
+
+    def test_pagina_inicial(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("pagina_inicial"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_pacientes"], 3)
+        self.assertEqual(len(response.context["consultas_pendentes"]), 2)
+
+
+# ===============================================================
+# AGENDA — RESUMO DIÁRIO INCREMENTAL
+# ===============================================================
+
+class ResumoAgendaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="admin", is_staff=True)
+        cls.medico = criar_medico("ana")
+        cls.outro = criar_medico("bia")
+        cls.paciente = Paciente.objects.create(nome="Paciente Teste")
+
+    def resumos(self):
+        return {
+            (r.medico_id, r.data): (r.minutos_ocupados, r.agendadas, r.confirmadas, r.canceladas, r.realizadas)
+            for r in ResumoAgendaDia.objects.all()
+            if any((r.minutos_ocupados, r.agendadas, r.confirmadas, r.canceladas, r.realizadas))
+        }
+
+    def test_acompanha_criacao_status_remarcacao_e_exclusao(self):
+        c1 = criar_consulta(self.medico, self.paciente, time(8, 0), duracao=45)
+        c2 = criar_consulta(self.medico, self.paciente, time(10, 0))
+        self.assertEqual(self.resumos()[(self.medico.pk, DIA)], (75, 2, 0, 0, 0))
+
+        self.client.force_login(self.staff)
+        self.client.post(reverse("confirmar_consulta", args=[c1.pk]))
+        self.client.post(reverse("cancelar_consulta", args=[c2.pk]))
+        self.assertEqual(self.resumos()[(self.medico.pk, DIA)], (45, 0, 1, 1, 0))
+
+        # remarcada para outro médico e outro dia
+        c1.refresh_from_db()
+        c1.medico = self.outro
+        c1.data_hora += timedelta(days=1)
+        c1.save()
+        self.assertEqual(self.resumos()[(self.medico.pk, DIA)], (0, 0, 0, 1, 0))
+        self.assertEqual(self.resumos()[(self.outro.pk, DIA + timedelta(days=1))], (45, 0, 1, 0, 0))
+
+        c2.delete()
+        self.assertNotIn((self.medico.pk, DIA), self.resumos())
+
+    def test_comando_reconstroi_igual_ao_incremental(self):
+        for i, status in enumerate(["agendada", "confirmada", "cancelada", "realizada"]):
+            criar_consulta(self.medico, self.paciente, time(8 + i, 0), status=status, dia=DIA + timedelta(days=i % 2))
+        incremental = self.resumos()
+
+        Consulta.objects.filter(status="realizada").update(duracao_minutos=90)  # sem sinais
+        ResumoAgendaDia.objects.update(minutos_ocupados=999)
+
+        saida = StringIO()
+        call_command("reconstruir_resumo_agenda", stdout=saida)
+
+        self.assertEqual(self.resumos(), incremental)
+        self.assertIn("2 dia(s)", saida.getvalue())
+
+    def test_ocupacao_da_semana_so_le_o_resumo(self):
+        criar_consulta(self.medico, self.paciente, time(8, 0), duracao=60)
+        criar_consulta(self.medico, self.paciente, time(9, 0), duracao=60, status="cancelada")
+
+        with self.assertNumQueries(1):
+            ocupacao = ocupacao_da_semana([self.medico, self.outro], DIA)
+
+        self.assertEqual(ocupacao[self.medico.pk]["minutos_ocupados"], 60)
+        self.assertEqual(ocupacao[self.medico.pk]["consultas"], 1)
+        self.assertEqual(ocupacao[self.medico.pk]["minutos_expediente"], 4 * 60 * 7)
+        self.assertEqual(ocupacao[self.outro.pk]["percentual"], 0)
+
+    def test_estado_anterior_lido_com_trava(self):
+        consulta = criar_consulta(self.medico, self.paciente, time(8, 0))
+
+        with CaptureQueriesContext(connection) as consultas:
+            consulta.status = "confirmada"
+            consulta.save()
+
+        leitura = next(q["sql"] for q in consultas.captured_queries if q["sql"].startswith("SELECT"))
+        self.assertIn("FOR UPDATE", leitura)
+
+    def test_pagina_inicial_mostra_ocupacao_da_semana(self):
+        criar_consulta(self.medico, self.paciente, time(8, 0), duracao=60, dia=timezone.localdate())
+
+        self.client.force_login(self.staff)
+        ocupacao = {
+            item["medico"].pk: item
+            for item in self.client.get(reverse("pagina_inicial")).context["ocupacao_semana"]
+        }
+
+        self.assertEqual(ocupacao[self.medico.pk]["minutos_ocupados"], 60)
+        self.assertEqual(ocupacao[self.outro.pk]["consultas"], 0)
+
+    def test_disponibilidade_so_busca_consultas_de_quem_tem_agenda(self):
+        criar_consulta(self.medico, self.paciente, time(8, 0), duracao=60)
+
+        with CaptureQueriesContext(connection) as consultas:
+            agendas = agendas_do_periodo([self.medico, self.outro], DIA, DIA, pelo_resumo=True)
+
+        self.assertEqual(len(consultas), 1)
+        self.assertIn("resumoagendadia", consultas.captured_queries[0]["sql"])
+        self.assertEqual(agendas[self.medico.pk][DIA].primeiro_livre(), "09:00")
+        self.assertEqual(agendas[self.outro.pk][DIA].primeiro_livre(), "08:00")
+
+
+# ===============================================================
+# PRONTUÁRIO — FILA DE PDF
+# ===============================================================
+
+class PDFProntuarioTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="admin", is_staff=True)
+        cls.paciente = Paciente.objects.create(nome="Paciente PDF")
+        cls.prontuario = Prontuario.objects.create(paciente=cls.paciente, diagnostico="Gripe")
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media))
+        self.client.force_login(self.staff)
+
+    def test_view_enfileira_e_worker_gera(self):
+        url = reverse("prontuario_pdf", args=[self.prontuario.pk])
+
+        with patch("agendamento.conversao_pdf.pisa.CreatePDF") as create_pdf:
+            response = self.client.get(url)
+            create_pdf.assert_not_called()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertContains(response, "Gerando o PDF", status_code=202)
+
+        status = self.client.get(reverse("prontuario_pdf_status", args=[self.prontuario.pk])).json()
+        self.assertEqual(status["status"], "pendente")
+
+        with patch("agendamento.pdf.renderizar_pdf", return_value=b"%PDF-1.4 teste"):
+            call_command("processar_pdfs", uma_vez=True, stdout=StringIO())
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 teste")
+        self.assertEqual(TarefaPDF.objects.count(), 1)
+
+    def test_prontuario_alterado_gera_nova_versao(self):
+        url = reverse("prontuario_pdf", args=[self.prontuario.pk])
+        self.client.get(url)
+
+        self.prontuario.conduta = "Repouso"
+        self.prontuario.save()
+        self.client.get(url)
+
+        self.assertEqual(TarefaPDF.objects.filter(status="pendente").count(), 2)
+
+    def test_falha_volta_para_a_fila_ate_o_limite(self):
+        self.client.get(reverse("prontuario_pdf", args=[self.prontuario.pk]))
+
+        with patch("agendamento.pdf.renderizar_pdf", side_effect=RuntimeError("quebrou")):
+            call_command("processar_pdfs", uma_vez=True, stdout=StringIO())
+
+        tarefa = TarefaPDF.objects.get()
+        self.assertEqual((tarefa.status, tarefa.tentativas), ("erro", MAX_TENTATIVAS))
+
+        # o polling só lê: a página mostra o erro e a tarefa não volta à fila
+        status_url = reverse("prontuario_pdf_status", args=[self.prontuario.pk])
+        self.assertEqual(self.client.get(status_url).json()["status"], "erro")
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), ("erro", MAX_TENTATIVAS))
+
+        # "Tentar novamente" reabre a tarefa
+        self.client.get(reverse("prontuario_pdf", args=[self.prontuario.pk]))
+        self.assertEqual(self.client.get(status_url).json()["status"], "pendente")
+
+    def test_status_nao_cria_tarefa(self):
+        response = self.client.get(reverse("prontuario_pdf_status", args=[self.prontuario.pk]))
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], "ausente")
+        self.assertFalse(TarefaPDF.objects.exists())
+
+    def test_tarefa_abandonada_volta_a_fila_ate_o_limite(self):
+        iniciada = timezone.now() - TEMPO_LIMITE - timedelta(minutes=1)
+        tarefa = TarefaPDF.objects.create(
+            prontuario=self.prontuario, chave="a" * 64,
+            status="processando", iniciado_em=iniciada, tentativas=MAX_TENTATIVAS - 1,
+        )
+
+        self.assertEqual(reivindicar_tarefa().pk, tarefa.pk)
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.tentativas, MAX_TENTATIVAS)
+
+        # o worker caiu de novo: não é reivindicada outra vez
+        TarefaPDF.objects.filter(pk=tarefa.pk).update(iniciado_em=iniciada)
+        self.assertIsNone(reivindicar_tarefa())
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.status, "erro")
+
+    @override_settings(PDF_GERACAO="sincrono")
+    def test_modo_sincrono_gera_na_requisicao(self):
+        with patch("agendamento.pdf.renderizar_pdf", return_value=b"%PDF-1.4 teste") as renderizar:
+            response = self.client.get(reverse("prontuario_pdf", args=[self.prontuario.pk]))
+            self.client.get(reverse("prontuario_pdf", args=[self.prontuario.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(renderizar.call_count, 1)
+
+    def gerar(self):
+        with patch("agendamento.pdf.renderizar_pdf", return_value=b"%PDF-1.4 teste"):
+            call_command("processar_pdfs", uma_vez=True, stdout=StringIO())
+
+    def test_cache_serve_etag_e_304(self):
+        url = reverse("prontuario_pdf", args=[self.prontuario.pk])
+        self.client.get(url)
+        self.gerar()
+
+        response = self.client.get(url)
+        tarefa = TarefaPDF.objects.get()
+
+        self.assertEqual(response["ETag"], f'"{tarefa.chave}"')
+        self.assertEqual(response["Content-Length"], str(len(b"%PDF-1.4 teste")))
+        self.assertTrue(tarefa.arquivo.name.endswith(f"{tarefa.chave}.pdf"))
+
+        with patch("agendamento.pdf.renderizar_pdf") as renderizar:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            renderizar.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+
+    def test_impressao_digital_acompanha_exames_e_consultas(self):
+        inicial = impressao_digital(self.prontuario)
+        self.assertEqual(impressao_digital(self.prontuario), inicial)
+
+        exame = Exame.objects.create(prontuario=self.prontuario, nome="Hemograma", arquivo="exames/h.pdf")
+        com_exame = impressao_digital(self.prontuario)
+        self.assertNotEqual(com_exame, inicial)
+
+        consulta = criar_consulta(criar_medico("ana"), self.paciente, time(9, 0))
+        com_consulta = impressao_digital(self.prontuario)
+        self.assertNotEqual(com_consulta, com_exame)
+
+        consulta.status = "cancelada"
+        consulta.save()
+        self.assertNotEqual(impressao_digital(self.prontuario), com_consulta)
+
+        exame.delete()
+        consulta.delete()
+        self.assertEqual(impressao_digital(self.prontuario), inicial)
+
+    def test_impressao_digital_acompanha_nome_e_crm_dos_medicos(self):
+        responsavel = criar_medico("ana")
+        self.prontuario.medico = responsavel.user
+        self.prontuario.save()
+        criar_consulta(criar_medico("bia"), self.paciente, time(9, 0))
+        inicial = impressao_digital(self.prontuario)
+
+        responsavel.crm = "CRM-12345"
+        responsavel.save()
+        com_crm = impressao_digital(self.prontuario)
+        self.assertNotEqual(com_crm, inicial)
+
+        responsavel.user.last_name = "Souza"
+        responsavel.user.save()
+        com_sobrenome = impressao_digital(self.prontuario)
+        self.assertNotEqual(com_sobrenome, com_crm)
+
+        # médico de uma consulta listada
+        User.objects.filter(username="bia").update(first_name="Beatriz")
+        self.assertNotEqual(impressao_digital(self.prontuario), com_sobrenome)
+
+    def test_impressao_digital_acompanha_o_convenio_do_paciente(self):
+        convenio = Convenio.objects.create(nome="Saúde Mais")
+        inicial = impressao_digital(self.prontuario)
+
+        Paciente.objects.filter(pk=self.paciente.pk).update(convenio=convenio)
+        com_convenio = impressao_digital(self.prontuario)
+        self.assertNotEqual(com_convenio, inicial)
+
+        # renomear o convênio não muda atualizado_em do paciente
+        convenio.nome = "Saúde Total"
+        convenio.save()
+        self.assertNotEqual(impressao_digital(self.prontuario), com_convenio)
+
+    def test_limpeza_por_idade_e_tamanho(self):
+        agora = timezone.now()
+        tarefas = []
+
+        for i, dias in enumerate([40, 3, 2, 1]):
+            tarefa = TarefaPDF.objects.create(prontuario=self.prontuario, chave=f"{i:064d}", status="pronto")
+            tarefa.arquivo.save(f"{tarefa.chave}.pdf", ContentFile(b"x" * 100), save=False)
+            tarefa.tamanho = 100
+            tarefa.acessado_em = agora - timedelta(days=dias)
+            tarefa.save()
+            tarefas.append(tarefa)
+
+        # a de 40 dias sai por idade; a de 3 dias, por tamanho (limite de 250 bytes)
+        self.assertEqual(limpar_cache(max_bytes=250, max_dias=30), 2)
+
+        restantes = list(TarefaPDF.objects.order_by("acessado_em").values_list("pk", flat=True))
+        self.assertEqual(restantes, [tarefas[2].pk, tarefas[3].pk])
+        self.assertFalse(default_storage.exists(tarefas[0].arquivo.name))
+        self.assertTrue(default_storage.exists(tarefas[3].arquivo.name))
+
+
+# ===============================================================
+# PRONTUÁRIOS — EXPORTAÇÃO EM LOTE
+# ===============================================================
+
+def pdf_falso(html):
+    return f"%PDF {len(html)}".encode()
+
+
+@override_settings(EXPORTACAO_PROCESSOS=1)
+class ExportacaoProntuariosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="admin", is_staff=True)
+        cls.medico = criar_medico("ana")
+        cls.convenio = Convenio.objects.create(nome="Saúde Mais")
+
+        cls.p1 = Paciente.objects.create(nome="João da Silva", convenio=cls.convenio)
+        cls.p2 = Paciente.objects.create(nome="Maria")
+
+        cls.pr1 = Prontuario.objects.create(paciente=cls.p1, medico=cls.medico.user)
+        cls.pr2 = Prontuario.objects.create(paciente=cls.p2, criado_em=timezone.now() - timedelta(days=60))
+
+    def abrir_zip(self, response):
+        return zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+
+    def test_view_entrega_zip_em_fluxo(self):
+        self.client.force_login(self.staff)
+
+        with patch("agendamento.exportacao.html_para_pdf", side_effect=pdf_falso):
+            response = self.client.get(reverse("exportar_prontuarios"))
+            self.assertTrue(response.streaming)
+            arquivo = self.abrir_zip(response)
+
+        self.assertEqual(response["Content-Type"], "application/zip")
+        nomes = arquivo.namelist()
+        self.assertEqual(len(nomes), 2)
+        self.assertIn(f"prontuario_{self.pr1.pk}_joao-da-silva.pdf", nomes[1])
+        self.assertTrue(arquivo.read(nomes[0]).startswith(b"%PDF"))
+
+    def test_filtros(self):
+        def exportados(**filtros):
+            return [p.pk for p in filtrar_prontuarios(**ler_filtros(filtros))]
+
+        hoje = timezone.localdate()
+        self.assertEqual(exportados(medico=self.medico.pk), [self.pr1.pk])
+        self.assertEqual(exportados(convenio=self.convenio.pk), [self.pr1.pk])
+        self.assertEqual(exportados(inicio=(hoje - timedelta(days=7)).isoformat()), [self.pr1.pk])
+        self.assertEqual(exportados(fim=(hoje - timedelta(days=30)).isoformat()), [self.pr2.pk])
+        with self.assertRaises(ValueError):
+            ler_filtros({"inicio": "2025-02-01", "fim": "2025-01-01"})
+
+    def test_apenas_secretaria(self):
+        self.client.force_login(self.medico.user)
+        self.assertEqual(self.client.get(reverse("exportar_prontuarios")).status_code, 302)
+
+    def test_comando_grava_arquivo(self):
+        destino = tempfile.NamedTemporaryFile(suffix=".zip", delete=False)
+        destino.close()
+        self.addCleanup(os.remove, destino.name)
+
+        with patch("agendamento.exportacao.html_para_pdf", side_effect=pdf_falso):
+            call_command("exportar_prontuarios", destino.name, paciente=self.p2.pk, stdout=StringIO())
+
+        with zipfile.ZipFile(destino.name) as arquivo:
+            self.assertEqual(len(arquivo.namelist()), 1)
+
+    def test_pool_de_processos_preserva_ordem_e_isola_falhas(self):
+        documentos = [("a", "1"), ("b", "x"), ("c", "333")]
+        resultado = list(converter_em_lote(iter(documentos), funcao=int, processos=2, janela=2))
+
+        self.assertEqual([nome for nome, _ in resultado], ["a", "b.erro.txt", "c"])
+        self.assertEqual(resultado[2][1], 333)
+
+
+# ===============================================================
+# CONSULTAS — EXPORTAÇÃO PARA FATURAMENTO
+# ===============================================================
+
+class ExportacaoFaturamentoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="admin", is_staff=True)
+        cls.ana = criar_medico("ana")
+        cls.bia = criar_medico("bia")
+        cls.unimed = Convenio.objects.create(nome="Unimed", codigo="U1")
+        cls.amil = Convenio.objects.create(nome="Amil")
+        paciente = Paciente.objects.create(nome="João", cpf="123")
+
+        def consulta(medico, convenio, dia, status="realizada", usa_convenio=True):
+            return Consulta.objects.create(
+                medico=medico, paciente=paciente, status=status,
+                usa_convenio=usa_convenio, convenio=convenio,
+                data_hora=timezone.make_aware(datetime.combine(dia, time(9, 0))),
+            )
+
+        cls.c1 = consulta(cls.ana, cls.unimed, date(2025, 2, 3))
+        cls.c2 = consulta(cls.bia, cls.amil, date(2025, 1, 10), status="cancelada")
+        cls.c3 = consulta(cls.ana, cls.unimed, date(2025, 1, 20))
+        consulta(cls.ana, None, date(2025, 1, 5), usa_convenio=False)
+
+    def ids(self, **filtros):
+        return [linha[0] for linha in filtrar_consultas_faturamento(**ler_filtros_consultas(filtros))]
+
+    def test_agrupa_por_convenio_e_data(self):
+        self.assertEqual(self.ids(), [self.c3.pk, self.c1.pk, self.c2.pk])
+
+    def test_filtros(self):
+        self.assertEqual(self.ids(convenio=self.amil.pk), [self.c2.pk])
+        self.assertEqual(self.ids(medico=self.ana.pk, fim="2025-01-31"), [self.c3.pk])
+        self.assertEqual(self.ids(status="realizada"), [self.c3.pk, self.c1.pk])
+        with self.assertRaises(ValueError):
+            ler_filtros_consultas({"status": "perdida"})
+
+    def test_view_entrega_csv_em_fluxo(self):
+        self.client.force_login(self.staff)
+
+        response = self.client.get(reverse("exportar_faturamento"), {"convenio": self.unimed.pk})
+        self.assertTrue(response.streaming)
+        linhas = b"".join(response.streaming_content).decode("utf-8-sig").splitlines()
+
+        self.assertEqual(linhas[0].split(";"), list(CABECALHO_FATURAMENTO))
+        self.assertEqual(len(linhas), 3)
+        self.assertTrue(linhas[1].startswith(f"2025-01;Unimed;U1;{self.c3.pk};20/01/2025;09:00;João;123;Ana;"))
+
+    def test_view_apenas_secretaria(self):
+        self.client.force_login(self.ana.user)
+        self.assertEqual(self.client.get(reverse("exportar_faturamento")).status_code, 302)
+
+    def test_comando_sem_instanciar_modelos(self):
+        saida = StringIO()
+
+        with CaptureQueriesContext(connection) as consultas:
+            call_command("exportar_faturamento", "-", inicio="2025-01-01", stdout=saida)
+
+        self.assertEqual(len(saida.getvalue().splitlines()), 4)
+        self.assertEqual(len(consultas), 1)
+
+
+# ===============================================================
+# PACIENTES — BUSCA
+# ===============================================================
+
+class BuscaPacientesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="recepcao", is_staff=True)
+        cls.jose = Paciente.objects.create(nome="JOSÉ Ângelo da Conceição", cpf="123.456.789-00")
+        cls.joana = Paciente.objects.create(nome="Joana Conceição", cpf="98765432100")
+        Paciente.objects.bulk_create(Paciente(nome=f"Maria {i:02d}") for i in range(12))
+
+    def nomes(self, termo):
+        return [p.nome for p in buscar_pacientes(termo).order_by(*ORDEM_BUSCA)]
+
+    def test_sem_acentos_e_por_prefixo(self):
+        self.assertEqual(self.nomes("jose conc"), [self.jose.nome])
+        self.assertEqual(self.nomes("angelo"), [self.jose.nome])
+        self.assertEqual(
+            sorted(self.nomes("CONCEIÇÃO")), sorted([self.jose.nome, self.joana.nome])
+        )
+        self.assertEqual(self.nomes("  "), [])
+
+    def test_cpf_com_ou_sem_pontuacao(self):
+        self.assertEqual(self.nomes("123.456"), [self.jose.nome])
+        self.assertEqual(self.nomes("98765432100"), [self.joana.nome])
+
+    def test_json_paginado_por_relevancia(self):
+        self.client.force_login(self.staff)
+
+        primeira = self.client.get(reverse("buscar_pacientes"), {"q": "maria", "por_pagina": 10}).json()
+        segunda = self.client.get(reverse("buscar_pacientes") + primeira["proxima"]).json()
+
+        nomes = [r["nome"] for r in primeira["resultados"] + segunda["resultados"]]
+        self.assertEqual(nomes, [f"Maria {i:02d}" for i in range(12)])
+        self.assertIsNone(segunda["proxima"])
+
+    def test_json_apenas_secretaria(self):
+        medico = criar_medico("ana")
+        self.client.force_login(medico.user)
+        self.assertEqual(self.client.get(reverse("buscar_pacientes"), {"q": "jose"}).status_code, 302)
+
+    def test_listagem_filtra_pelo_termo(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("listar_pacientes"), {"q": "joana"})
+        self.assertEqual([p.pk for p in response.context["pacientes"]], [self.joana.pk])
+
+    @skipUnless(connection.vendor == "postgresql", "EXPLAIN dos índices requer PostgreSQL")
+    def test_busca_usa_os_indices(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        self.assertIn("paciente_busca_fts_idx", buscar_pacientes("jose").explain())
+        self.assertIn("paciente_cpf_digitos_idx", buscar_pacientes("123.456").explain())
+
+
+# ===============================================================
+# AUTOCOMPLETE
+# ===============================================================
+
+class AutocompleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="recepcao", is_staff=True)
+        cls.cardio = Especialidade.objects.create(nome="Cardiologia")
+        cls.derma = Especialidade.objects.create(nome="Dermatologia")
+        cls.ana = criar_medico("ana", especialidade=cls.cardio)
+        User.objects.bulk_create(User(username=f"usuario{i}") for i in range(50))
+
+    def setUp(self):
+        limpar_indices()
+
+    def buscar(self, tipo, termo):
+        return self.client.get(reverse("autocomplete", args=[tipo]), {"q": termo})
+
+    def test_prefixo_sem_acento_e_caixa(self):
+        self.client.force_login(self.staff)
+
+        self.assertEqual(
+            self.buscar("especialidades", "CARD").json()["resultados"],
+            [{"id": self.cardio.pk, "texto": "Cardiologia"}],
+        )
+        self.assertEqual(
+            [r["id"] for r in self.buscar("medicos", "ana card").json()["resultados"]],
+            [self.ana.pk],
+        )
+        self.assertEqual(len(self.buscar("usuarios", "usuario").json()["resultados"]), LIMITE_RESULTADOS)
+
+    def test_indice_em_memoria_reaproveitado_ate_o_ttl(self):
+        with self.assertNumQueries(1):
+            sugestoes("especialidades", "car")
+            sugestoes("especialidades", "der")
+
+        Especialidade.objects.create(nome="Cardiopediatria")
+        self.assertEqual(len(sugestoes("especialidades", "cardio")), 1)
+
+        with override_settings(AUTOCOMPLETE_TTL=0):
+            self.assertEqual(len(sugestoes("especialidades", "cardio")), 2)
+
+    def test_dados_pessoais_apenas_para_a_equipe(self):
+        self.client.force_login(self.ana.user)
+
+        self.assertEqual(self.buscar("usuarios", "usu").status_code, 403)
+        self.assertEqual(self.buscar("pacientes", "jo").status_code, 403)
+        self.assertEqual(self.buscar("medicos", "ana").status_code, 200)
+        self.assertEqual(self.buscar("convenios", "x").status_code, 404)
+
+    def test_formulario_renderiza_so_a_opcao_escolhida(self):
+        html = str(MedicoForm(instance=self.ana)["user"])
+
+        self.assertEqual(html.count("<option"), 2)
+        self.assertIn(f'value="{self.ana.user.pk}" selected', html)
+        self.assertIn('data-autocomplete="/autocomplete/usuarios/"', html)
+
+        form = MedicoForm(data={"user": self.staff.pk, "crm": "123", "especialidade": self.derma.pk})
+        self.assertTrue(form.is_valid(), form.errors)
+
+
+# ===============================================================
+# PRONTUÁRIOS — BUSCA NO TEXTO CLÍNICO
+# ===============================================================
+
+class BuscaProntuariosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.medico = criar_medico("ana")
+        cls.staff = User.objects.create_user(username="admin", is_staff=True)
+
+        cls.joao = Paciente.objects.create(nome="João")
+        cls.maria = Paciente.objects.create(nome="Maria")
+        criar_consulta(cls.medico, cls.joao, time(9, 0))
+
+        cls.diagnostico = Prontuario.objects.create(
+            paciente=cls.joao, diagnostico="Dor torácica atípica", evolucao="Estável."
+        )
+        cls.evolucao = Prontuario.objects.create(
+            paciente=cls.maria, queixa="Cefaleia", evolucao="Refere dores torácicas ao esforço."
+        )
+        cls.outro = Prontuario.objects.create(
+            paciente=cls.maria, queixa="Febre <script>alert(1)</script>"
+        )
+
+    def test_radicais_acentos_e_pesos(self):
+        encontrados = buscar_prontuarios("dor toracica").order_by(*ORDEM_BUSCA_PRONTUARIOS)
+
+        # "dores torácicas" casa com "dor toracica"; diagnóstico pesa mais que evolução
+        self.assertEqual([p.pk for p in encontrados], [self.diagnostico.pk, self.evolucao.pk])
+        self.assertEqual(
+            [p.pk for p in buscar_prontuarios("torácica -esforço")], [self.diagnostico.pk]
+        )
+
+    def test_listagem_respeita_o_papel_e_destaca(self):
+        self.client.force_login(self.medico.user)
+        response = self.client.get(reverse("listar_prontuarios"), {"q": "torácica"})
+
+        pagina = list(response.context["prontuarios"])
+        self.assertEqual([p.pk for p in pagina], [self.diagnostico.pk])
+        self.assertIn("<mark>torácica</mark>", pagina[0].trecho)
+
+    def test_trecho_escapa_o_texto(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("listar_prontuarios"), {"q": "febre"})
+
+        self.assertNotContains(response, "<script>alert")
+        self.assertContains(response, "<mark>Febre</mark>")
+
+    @skipUnless(connection.vendor == "postgresql", "EXPLAIN dos índices requer PostgreSQL")
+    def test_busca_usa_o_indice_gin(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        self.assertIn("prontuario_busca_idx", buscar_prontuarios("febre").explain())
+
+
+# ===============================================================
+# CID-10 — CATÁLOGO, BUSCA E RELATÓRIO
+# ===============================================================
+
+class CIDTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        CID.objects.bulk_create([
+            CID(codigo="J45", descricao="Asma"),
+            CID(codigo="J450", descricao="Asma predominantemente alérgica"),
+            CID(codigo="I10", descricao="Hipertensão essencial (primária)"),
+        ])
+
+    def setUp(self):
+        limpar_indices()
+
+    def importar(self, linhas, **opcoes):
+        arquivo = tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="latin-1", delete=False)
+        with arquivo:
+            arquivo.write("SUBCAT;CLASSIF;DESCRICAO;DESCRABREV\n")
+            arquivo.writelines(f"{codigo};;{descricao};\n" for codigo, descricao in linhas)
+        self.addCleanup(os.remove, arquivo.name)
+
+        call_command("importar_cid", arquivo.name, encoding="latin-1", stdout=StringIO(), **opcoes)
+
+    def test_importacao_em_lote_com_atualizacao(self):
+        linhas = [(f"Z{i:03d}", f"Código {i}") for i in range(5000)]
+        linhas.append(("J45.0", "Asma alérgica"))
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.importar(linhas)
+
+        self.assertLess(len(consultas), 10)
+        self.assertEqual(CID.objects.count(), 5003)
+        self.assertEqual(CID.objects.get(codigo="J450").descricao, "Asma alérgica")
+
+        self.importar([("I10", "Hipertensão essencial")], substituir=True)
+        self.assertEqual(list(CID.objects.values_list("codigo", flat=True)), ["I10"])
+
+    def test_busca_por_codigo_ou_descricao(self):
+        def codigos(termo):
+            return [c.codigo for c in buscar_cids(termo).order_by(*ORDEM_BUSCA_CID)]
+
+        self.assertEqual(codigos("j45"), ["J45", "J450"])
+        self.assertEqual(codigos("J45.0"), ["J450"])
+        self.assertEqual(codigos("hipertensao"), ["I10"])
+        self.assertEqual(codigos("asma alerg"), ["J450"])
+
+    def test_autocomplete_em_memoria(self):
+        self.assertEqual([s["texto"] for s in sugestoes("cids", "j450")], ["J45.0 — Asma predominantemente alérgica"])
+        self.assertEqual(len(sugestoes("cids", "asma")), 2)
+
+    def test_relatorio_por_cid_e_medico(self):
+        ana = criar_medico("ana")
+        bia = criar_medico("bia")
+        staff = User.objects.create_user(username="admin", is_staff=True)
+        paciente = Paciente.objects.create(nome="João")
+
+        for medico, cid in ((ana, "j45.0"), (ana, "J450"), (ana, "I10"), (bia, "J45.0"), (bia, "")):
+            Prontuario.objects.create(paciente=paciente, medico=medico.user, cid=cid)
+
+        self.client.force_login(staff)
+        linhas = self.client.get(reverse("relatorio_cid")).context["linhas"]
+        self.assertEqual(
+            [(l["cid"], l["medico"], l["total"]) for l in linhas],
+            [("J45.0", "Ana", 2), ("I10", "Ana", 1), ("J45.0", "Bia", 1)],
+        )
+        self.assertEqual(linhas[0]["descricao"], "Asma predominantemente alérgica")
+
+        # o médico só vê os próprios diagnósticos, mesmo filtrando por outro
+        self.client.force_login(bia.user)
+        linhas = self.client.get(reverse("relatorio_cid"), {"medico": ana.pk}).context["linhas"]
+        self.assertEqual([(l["cid"], l["total"]) for l in linhas], [("J45.0", 1)])
+
+
+# ===============================================================
+# PAPÉIS DO USUÁRIO
+# ===============================================================
+
+class PapeisTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.medico = criar_medico("dra.ana")
+        grupo, _ = Group.objects.get_or_create(name="Usuário Padrão")
+        cls.usuario = User.objects.create_user(username="comum")
+        cls.usuario.groups.add(grupo)
+
+    def test_papeis_consultam_o_banco_uma_vez(self):
+        usuario = User.objects.get(pk=self.usuario.pk)
+
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(3):
+                self.assertTrue(is_usuario_padrao(usuario))
+                self.assertFalse(is_medico(usuario))
+
+        # grupos + a relação perfil_medico/perfil_paciente, cada uma uma vez
+        self.assertLessEqual(len(ctx), 3)
+        self.assertEqual(papeis(usuario)["grupos"], frozenset({"Usuário Padrão"}))
+
+    def test_backend_traz_perfis_junto_com_o_usuario(self):
+        self.client.force_login(self.medico.user)
+        self.client.get(reverse("pagina_inicial"))
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("listar_consultas"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["is_medico_user"])
+
+        consultas_perfis = [
+            q["sql"] for q in ctx.captured_queries
+            if 'FROM "agendamento_medico"' in q["sql"] and '"agendamento_medico"."user_id" =' in q["sql"]
+        ]
+        consultas_grupos = [q["sql"] for q in ctx.captured_queries if '"auth_group"' in q["sql"]]
+        self.assertEqual(consultas_perfis, [])
+        self.assertEqual(len(consultas_grupos), 1)
+
+    def test_sessao_anterior_com_model_backend_continua_valida(self):
+        self.client.force_login(self.usuario, backend="django.contrib.auth.backends.ModelBackend")
+
+        response = self.client.get(reverse("pagina_inicial"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["user"], self.usuario)
+
+    def test_anonimo_nao_tem_papeis(self):
+        anonimo = AnonymousUser()
+        self.assertFalse(is_medico(anonimo))
+        self.assertFalse(is_usuario_padrao(anonimo))
+
+
+# ===============================================================
+# CONTEXT PROCESSOR — FLAGS E BADGE
+# ===============================================================
+
+@override_settings(NOTIFICACOES_CACHE_SEGUNDOS=60)
+class ContextProcessorUsuarioTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        grupo, _ = Group.objects.get_or_create(name="Usuário Padrão")
+        cls.user = User.objects.create_user(username="bia")
+        cls.user.groups.add(grupo)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_badge_vem_renderizado_com_as_flags(self):
+        for i in range(2):
+            Notificacao.objects.create(usuario=self.user, titulo=f"N{i}", mensagem="x")
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("pagina_inicial"))
+
+        self.assertTrue(response.context["is_usuario_padrao"])
+        self.assertFalse(response.context["is_medico_user"])
+        self.assertEqual(response.context["notificacoes_nao_lidas"], 2)
+        self.assertContains(response, '<span id="notif-count" class="notif-badge">2</span>', html=False)
+
+    def test_cache_de_nao_lidas_e_descartado_a_cada_ajuste(self):
+        notificacao = Notificacao.objects.create(usuario=self.user, titulo="N", mensagem="x")
+        self.assertEqual(nao_lidas_em_cache(self.user.pk), 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(nao_lidas_em_cache(self.user.pk), 1)
+        self.assertEqual(len(ctx), 0)
+
+        marcar_como_lidas(self.user, [notificacao.pk])
+        self.assertEqual(nao_lidas_em_cache(self.user.pk), 0)
+
+    def test_anonimo_recebe_valores_neutros(self):
+        response = self.client.get(reverse("login"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["is_medico_user"])
+        self.assertEqual(response.context["notificacoes_nao_lidas"], 0)
+
+
+# ===============================================================
+# INICIALIZAÇÃO — CUSTO DE IMPORTAÇÃO E VIEWS PREGUIÇOSAS
+# ===============================================================
+
+class ImportacaoTests(TestCase):
+
+    def test_urls_nao_carregam_o_xhtml2pdf(self):
+        saida = StringIO()
+        call_command("medir_importacao", estrito=True, repeticoes=1, stdout=saida)
+
+        self.assertIn("agendamento.views", saida.getvalue())
+        self.assertIn("Nenhum de xhtml2pdf", saida.getvalue())
+        # módulos de views, formulários e PDF só carregam na primeira requisição
+        for modulo in ("agendamento.views.consultas", "agendamento.forms", "agendamento.pdf"):
+            self.assertNotIn(modulo, saida.getvalue())
+
+    def test_vista_preguicosa_mantem_nome_e_assincronia(self):
+        self.assertEqual(resolve(reverse("listar_consultas")).func.__name__, "listar_consultas")
+        self.assertTrue(asyncio.iscoroutinefunction(resolve(reverse("notificacoes_stream")).func))
+        self.assertFalse(asyncio.iscoroutinefunction(resolve(reverse("notificacoes_count")).func))
+
+
+# ===============================================================
+# DADOS DE REFERÊNCIA — CACHE VERSIONADO
+# ===============================================================
+
+@override_settings(REFERENCIAS_CACHE_SEGUNDOS=3600)
+class ReferenciasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cardio = Especialidade.objects.create(nome="Cardiologia")
+        cls.medico = criar_medico("rui", cls.cardio)
+        Convenio.objects.create(nome="Inativo", ativo=False)
+        cls.convenio = Convenio.objects.create(nome="Saúde Mais")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_segunda_leitura_nao_consulta_o_banco(self):
+        referencias.especialidades(), referencias.convenios_ativos(), referencias.medicos()
+
+        with self.assertNumQueries(0):
+            self.assertEqual([e.nome for e in referencias.especialidades()], ["Cardiologia"])
+            self.assertEqual(referencias.convenios_ativos(), [self.convenio])
+            self.assertEqual(str(referencias.medico(self.medico.pk)), str(self.medico))
+
+    def test_alteracoes_invalidam(self):
+        self.assertEqual(len(referencias.especialidades()), 1)
+        Especialidade.objects.create(nome="Dermatologia")
+        self.assertEqual(len(referencias.especialidades()), 2)
+
+        self.medico.user.first_name = "Rui Alberto"
+        self.medico.user.save()
+        self.assertEqual(referencias.medico(self.medico.pk).user.first_name, "Rui Alberto")
+
+        pk = self.medico.pk
+        self.medico.delete()
+        self.assertIsNone(referencias.medico(pk))
+
+    def test_outro_processo_recarrega_quando_a_versao_vence(self):
+        # outro worker: cache local próprio (LocMemCache) e cópia em processo própria
+        outro_processo = {
+            "cache": LocMemCache("referencias-outro-processo", {}),
+            "_em_processo": {},
+        }
+
+        def no_outro_processo():
+            with patch.multiple(referencias, **outro_processo):
+                return referencias.medico(self.medico.pk).hora_inicio
+
+        original = no_outro_processo()
+
+        # a alteração invalida só o cache deste processo
+        self.medico.hora_inicio = time(13, 0)
+        self.medico.save()
+        self.assertEqual(referencias.medico(self.medico.pk).hora_inicio, time(13, 0))
+        self.assertEqual(no_outro_processo(), original)
+
+        vencida = referencias.time.time_ns() + (referencias.segundos_da_versao() + 1) * 1_000_000_000
+        with patch.object(referencias.time, "time_ns", return_value=vencida):
+            self.assertEqual(no_outro_processo(), time(13, 0))
+
+    def test_medicos_por_especialidade_usa_o_cache(self):
+        url = reverse("medicos_por_especialidade")
+        self.client.get(url, {"especialidade_id": self.cardio.pk})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"especialidade_id": self.cardio.pk})
+
+        self.assertEqual([m["id"] for m in response.json()["medicos"]], [self.medico.pk])
+        self.assertEqual(self.client.get(url, {"especialidade_id": "x"}).json()["medicos"], [])
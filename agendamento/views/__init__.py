@@ -0,0 +1,39 @@
+# ===============================================================
+# VIEWS
+# ===============================================================
+#
+# Uma view por domínio em cada módulo deste pacote (consultas, agenda,
+# notificacoes, prontuarios, pacientes, medicos, ...). As URLs apontam
+# para elas com `vista("modulo.funcao")`, que só importa o módulo na
+# primeira requisição: um worker que atende apenas o polling de
+# notificações ou os horários livres não carrega formulários nem a
+# geração de PDF. `manage.py medir_importacao --cenarios` compara os
+# custos de inicialização.
+#
+# Este __init__ não deve importar nenhum dos módulos de views.
+
+from importlib import import_module
+
+
+def vista(caminho, assincrona=False):
+    """
+    View que importa "modulo.funcao" (relativo a este pacote) na primeira
+    chamada. Views `async def` precisam de assincrona=True, para o Django
+    tratá-las como assíncronas antes de o módulo ser carregado.
+    """
+    nome_modulo, nome_funcao = caminho.rsplit(".", 1)
+    modulo = f"{__name__}.{nome_modulo}"
+
+    def carregar():
+        return getattr(import_module(modulo), nome_funcao)
+
+    if assincrona:
+        async def view(request, *args, **kwargs):
+            return await carregar()(request, *args, **kwargs)
+    else:
+        def view(request, *args, **kwargs):
+            return carregar()(request, *args, **kwargs)
+
+    view.__name__ = view.__qualname__ = nome_funcao
+    view.__module__ = modulo
+    return view
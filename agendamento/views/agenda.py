@@ -0,0 +1,165 @@
+# ===============================================================
+# VIEWS — AGENDA (AJAX)
+# ===============================================================
+#
+# Horários livres, calendário e médicos por especialidade. Não importa
+# formulários nem o PDF: serve os pedidos AJAX de agendamento.
+
+from datetime import datetime, timedelta
+
+from django.http import JsonResponse
+from django.utils import timezone
+
+from .. import referencias
+from ..disponibilidade import agenda_do_dia, agendas_do_periodo, calendario
+
+
+# ===============================================================
+# CONSULTAS — HORÁRIOS DISPONÍVEIS (AJAX)
+# ===============================================================
+
+def horarios_disponiveis(request):
+    medico_id = request.GET.get("medico_id")
+    data_str = request.GET.get("data")
+
+    if not medico_id or not data_str:
+        return JsonResponse({"horarios": []}, status=400)
+
+    try:
+        data_consulta = datetime.strptime(data_str, "%Y-%m-%d").date()
+    except ValueError:
+        return JsonResponse({"horarios": []}, status=400)
+
+    try:
+        medico = referencias.medico(medico_id)
+    except ValueError:
+        medico = None
+
+    if medico is None:
+        return JsonResponse({"horarios": []}, status=404)
+
+    agenda = agenda_do_dia(medico, data_consulta)
+
+    return JsonResponse({"horarios": agenda.horarios(), "grade": agenda.slots()})
+
+
+# ===============================================================
+# CONSULTAS — CALENDÁRIO DE DISPONIBILIDADE (AJAX)
+# ===============================================================
+
+CALENDARIO_MAX_DIAS = 92
+
+
+def calendario_disponibilidade(request):
+    """
+    Slots livres por dia de um médico (medico_id) ou de uma especialidade
+    (especialidade_id), para um mês (mes=AAAA-MM) ou intervalo (inicio/fim).
+    """
+    medico_id = request.GET.get("medico_id")
+    especialidade_id = request.GET.get("especialidade_id")
+    mes = request.GET.get("mes")
+
+    try:
+        if mes:
+            data_inicio = datetime.strptime(mes, "%Y-%m").date()
+            proximo = (data_inicio + timedelta(days=31)).replace(day=1)
+            data_fim = proximo - timedelta(days=1)
+        else:
+            hoje = timezone.localdate()
+            inicio_str = request.GET.get("inicio")
+            fim_str = request.GET.get("fim")
+            data_inicio = datetime.strptime(inicio_str, "%Y-%m-%d").date() if inicio_str else hoje
+            data_fim = (
+                datetime.strptime(fim_str, "%Y-%m-%d").date() if fim_str
+                else data_inicio + timedelta(days=30)
+            )
+    except ValueError:
+        return JsonResponse({"dias": []}, status=400)
+
+    if data_fim < data_inicio or (data_fim - data_inicio).days >= CALENDARIO_MAX_DIAS:
+        return JsonResponse({"dias": []}, status=400)
+
+    try:
+        if medico_id:
+            medicos = [m for m in [referencias.medico(medico_id)] if m is not None]
+        elif especialidade_id:
+            medicos = referencias.medicos(especialidade_id)
+        else:
+            return JsonResponse({"dias": []}, status=400)
+    except ValueError:
+        return JsonResponse({"dias": []}, status=400)
+
+    if not medicos:
+        return JsonResponse({"dias": []}, status=404)
+
+    return JsonResponse({
+        "inicio": data_inicio.isoformat(),
+        "fim": data_fim.isoformat(),
+        "dias": calendario(medicos, data_inicio, data_fim),
+    })
+
+
+# ===============================================================
+# MÉDICOS — LISTAR POR ESPECIALIDADE (AJAX)
+# ===============================================================
+
+def medicos_por_especialidade(request):
+    especialidade_id = request.GET.get("especialidade_id")
+
+    if not especialidade_id:
+        return JsonResponse({"medicos": []})
+
+    try:
+        medicos = referencias.medicos(especialidade_id)
+    except ValueError:
+        return JsonResponse({"medicos": []})
+
+    data = [
+        {
+            "id": m.id,
+            "nome": m.user.get_full_name() or m.user.username,
+            "especialidade": m.especialidade.nome
+        }
+        for m in medicos
+    ]
+
+    return JsonResponse({"medicos": data})
+
+
+# ===============================================================
+# MÉDICOS — COM DISPONIBILIDADE (AJAX)
+# ===============================================================
+
+def medicos_com_disponibilidade(request):
+    data_str = request.GET.get("data")
+    especialidade = request.GET.get("especialidade")
+
+    if not data_str:
+        return JsonResponse({"medicos": []})
+
+    try:
+        data_consulta = datetime.strptime(data_str, "%Y-%m-%d").date()
+    except ValueError:
+        return JsonResponse({"medicos": []})
+
+    try:
+        medicos = referencias.medicos(especialidade)
+    except ValueError:
+        return JsonResponse({"medicos": []})
+
+    # uma única consulta para a ocupação de todos os médicos no dia, que só
+    # procura em Consulta os que têm horários ocupados segundo o resumo
+    # diário; o limite diário é o número de slots do expediente de cada um
+    agendas = agendas_do_periodo(medicos, data_consulta, data_consulta, pelo_resumo=True)
+
+    medicos_disponiveis = [
+        {
+            "id": medico.id,
+            "nome": medico.user.get_full_name(),
+            "especialidade": medico.especialidade.nome
+        }
+        for medico in medicos
+        if agendas[medico.pk][data_consulta].total_livres > 0
+    ]
+
+    return JsonResponse({"medicos": medicos_disponiveis})
@@ -0,0 +1,28 @@
+# ===============================================================
+# VIEWS — AUTOCOMPLETE (AJAX)
+# ===============================================================
+#
+# Sugestões para os campos SelecaoAutocomplete.
+
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+
+from ..autocomplete import TIPOS as TIPOS_AUTOCOMPLETE, sugestoes
+from ..papeis import is_secretaria
+
+
+# ===============================================================
+# AUTOCOMPLETE (AJAX)
+# ===============================================================
+
+@login_required
+def autocomplete(request, tipo):
+    """Sugestões por prefixo para os campos SelecaoAutocomplete."""
+    if tipo not in TIPOS_AUTOCOMPLETE:
+        raise Http404
+
+    # pacientes e usuários expõem dados pessoais: só a equipe
+    if tipo in ("pacientes", "usuarios") and not is_secretaria(request.user):
+        return JsonResponse({"resultados": []}, status=403)
+
+    return JsonResponse({"resultados": sugestoes(tipo, request.GET.get("q", ""))})
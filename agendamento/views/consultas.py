@@ -0,0 +1,486 @@
+# ===============================================================
+# VIEWS — CONSULTAS
+# ===============================================================
+#
+# Listagem, agendamento, edição, cancelamento e exportação para faturamento.
+
+from datetime import datetime
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import referencias
+from ..disponibilidade import conflito_de_horario
+from ..exportacao import exportar_faturamento_csv, filtrar_consultas_faturamento, ler_filtros_consultas
+from ..forms import ConsultaForm
+from ..models import Consulta, Convenio, Notificacao, Paciente, STATUS_CHOICES
+from ..notificacoes import marcar_como_lidas
+from ..paginacao import paginar_keyset
+from ..papeis import is_medico, is_secretaria, is_usuario_padrao, papeis
+
+
+# ===============================================================
+# CONSULTAS — LISTAR
+# ===============================================================
+
+def consultas_para_listagem(consultas):
+    """Carrega junto (JOIN) tudo o que a tabela de consultas exibe, só com as colunas usadas."""
+    return consultas.select_related(
+        "paciente", "medico__user", "medico__especialidade", "convenio"
+    ).only(
+        "id", "data_hora", "duracao_minutos", "status", "usa_convenio",
+        "paciente__nome",
+        "medico__user__first_name", "medico__user__last_name",
+        "medico__especialidade__nome",
+        "convenio__nome",
+    )
+
+
+@login_required
+def listar_consultas(request):
+    user = request.user
+    context = {}
+
+    # Paciente — visualiza somente as suas consultas
+    if is_usuario_padrao(user):
+        paciente = getattr(user, 'perfil_paciente', None)
+
+        if paciente:
+            consultas = Consulta.objects.filter(paciente=paciente)
+        else:
+            consultas = Consulta.objects.none()
+
+    # Médico — visualiza apenas as consultas dele
+    elif is_medico(user):
+        consultas = Consulta.objects.filter(medico=user.perfil_medico)
+
+        # marca notificações como lidas ao abrir
+        marcar_como_lidas(user)
+
+    # Admin / Secretaria — visualiza tudo
+    else:
+        consultas = Consulta.objects.all()
+
+        # filtros da exportação de faturamento
+        context.update({
+            "medicos": referencias.medicos(),
+            "convenios": referencias.convenios(),
+            "status_choices": STATUS_CHOICES,
+        })
+
+    consultas = consultas_para_listagem(consultas)
+
+    consultas = paginar_keyset(request, consultas, ("-data_hora", "-id"))
+
+    # bloqueio de horários futuros (apenas as linhas da página)
+    agora = timezone.now()
+    for c in consultas:
+        c.horario_bloqueado = (
+            c.status == 'agendada' and
+            c.data_hora > agora
+        )
+
+    context.update({
+        'consultas': consultas,
+        'notificacoes': Notificacao.objects.filter(usuario=user).order_by('-criado_em')[:5],
+    })
+
+    return render(request, 'agendamento/consultas/listar_consultas.html', context)
+
+
+# ===============================================================
+# CONSULTAS — CRIAR
+# ===============================================================
+
+@login_required
+def criar_consulta(request):
+    is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
+    if request.method == 'POST':
+        form = ConsultaForm(request.POST, user=request.user)
+
+        data = request.POST.get('data')
+        hora = request.POST.get('hora')
+
+        # monta datetime
+        try:
+            data_hora = datetime.strptime(f"{data} {hora}", "%Y-%m-%d %H:%M") if data and hora else None
+        except:
+            data_hora = None
+
+        if form.is_valid() and data_hora:
+            try:
+                medico = form.cleaned_data['medico']
+
+                usa_convenio = request.POST.get('usa_convenio') == 'on'
+                convenio_id = request.POST.get('convenio')
+
+                convenio_obj = None
+                if convenio_id:
+                    try:
+                        convenio_obj = Convenio.objects.get(id=convenio_id)
+                    except Convenio.DoesNotExist:
+                        convenio_obj = None
+
+                # o conflito de horário é garantido pela exclusion constraint
+                # do banco; aqui só traduzimos a violação para a resposta
+                try:
+                    with transaction.atomic():
+                        paciente_vinculado = get_paciente_do_usuario(request.user)
+
+                        consulta = form.save(commit=False)
+                        consulta.paciente = paciente_vinculado
+                        consulta.usuario = request.user
+                        consulta.data_hora = timezone.make_aware(data_hora)
+                        consulta.status = 'agendada'
+                        consulta.confirmada = False
+                        consulta.usa_convenio = bool(usa_convenio)
+                        consulta.convenio = convenio_obj if usa_convenio else None
+                        consulta.save()
+
+                        # notifica o médico
+                        Notificacao.objects.create(
+                            usuario=medico.user,
+                            titulo="Nova consulta agendada",
+                            mensagem=(
+                                f"Paciente {consulta.paciente.nome} agendou uma consulta "
+                                f"para {consulta.data_hora.strftime('%d/%m/%Y')} às "
+                                f"{consulta.data_hora.strftime('%H:%M')}."
+                            ),
+                            link=reverse('pagina_inicial')
+                        )
+
+                except IntegrityError as erro:
+                    if not conflito_de_horario(erro):
+                        raise
+
+                    msg = "Este horário já está reservado. Escolha outro horário."
+
+                    if is_ajax:
+                        return JsonResponse({"ok": False, "errors": {"hora": [msg]}}, status=400)
+
+                    messages.error(request, msg)
+                    return redirect('criar_consulta')
+
+                if is_ajax:
+                    return JsonResponse({
+                        "ok": True,
+                        "consulta": {
+                            "id": consulta.id,
+                            "paciente": consulta.paciente.nome,
+                            "medico": str(consulta.medico),
+                            "data": consulta.data_hora.strftime("%d/%m/%Y"),
+                            "hora": consulta.data_hora.strftime("%H:%M"),
+                            "convenio": consulta.convenio.nome if consulta.usa_convenio and consulta.convenio else None
+                        }
+                    })
+
+                messages.success(request, "Consulta criada com sucesso!")
+                return redirect('listar_consultas')
+
+            except Exception as e:
+                if is_ajax:
+                    return JsonResponse({"ok": False, "errors": {"__all__": [str(e)]}}, status=500)
+
+                messages.error(request, f"Erro inesperado: {e}")
+
+        if is_ajax:
+            errors = form.errors.get_json_data()
+            simplified = {
+                field: [e['message'] for e in err]
+                for field, err in errors.items()
+            }
+            return JsonResponse({"ok": False, "errors": simplified}, status=400)
+
+        messages.error(request, "Erro ao salvar consulta. Verifique os campos.")
+
+    else:
+        form = ConsultaForm(user=request.user)
+
+    context = {
+        'form': form,
+        'titulo': 'Nova Consulta',
+        'especialidades': referencias.especialidades(),
+        'convenios': referencias.convenios_ativos(),
+    }
+
+    return render(request, 'agendamento/consultas/consulta_form.html', context)
+
+
+# ===============================================================
+# CONSULTAS — CONFIRMAR
+# ===============================================================
+
+@login_required
+def confirmar_consulta(request, pk):
+    if request.method != 'POST':
+        return redirect('listar_consultas')
+
+    consulta = get_object_or_404(Consulta, pk=pk)
+
+    # Permissão — Médico responsável, secretaria ou admin
+    if not (
+        (is_medico(request.user) and consulta.medico.user == request.user)
+        or request.user.is_staff
+        or request.user.is_superuser
+    ):
+        messages.error(request, "Você não tem permissão para confirmar esta consulta.")
+        return redirect('listar_consultas')
+
+    # uma consulta cancelada cujo horário já foi ocupado viola a exclusion
+    # constraint ao voltar a ficar ativa
+    try:
+        with transaction.atomic():
+            consulta.status = 'confirmada'
+            consulta.confirmada = True
+            consulta.save()
+
+            # Notifica o paciente
+            if consulta.paciente and consulta.paciente.usuario:
+                Notificacao.objects.create(
+                    usuario=consulta.paciente.usuario,
+                    titulo="Consulta Confirmada",
+                    mensagem=(
+                        f"Sua consulta com o médico {consulta.medico.user.get_full_name()} foi confirmada para "
+                        f"{timezone.localtime(consulta.data_hora).strftime('%d/%m/%Y %H:%M')}."
+                    ),
+                    link=reverse('pagina_inicial')
+                )
+
+    except IntegrityError as erro:
+        if not conflito_de_horario(erro):
+            raise
+
+        messages.error(request, "Este horário já está reservado por outra consulta. Remarque antes de confirmar.")
+        return redirect('listar_consultas')
+
+    messages.success(request, "Consulta confirmada com sucesso!")
+    return redirect('pagina_inicial')
+
+
+# ===============================================================
+# CONSULTAS — FUNÇÃO AUXILIAR (GARANTE UM PACIENTE)
+# ===============================================================
+
+def get_paciente_do_usuario(user):
+    if papeis(user)["paciente"]:
+        return user.perfil_paciente
+
+    paciente, _ = Paciente.objects.get_or_create(
+        usuario=user,
+        defaults={
+            'nome': user.get_full_name() or user.username,
+            'email': user.email
+        }
+    )
+    return paciente
+
+
+# ===============================================================
+# CONSULTAS — EDITAR
+# ===============================================================
+
+@login_required
+def editar_consulta(request, pk):
+    consulta = get_object_or_404(Consulta, pk=pk)
+    is_ajax = request.headers.get("x-requested-with") == "XMLHttpRequest"
+
+    # Permissão
+    if not (
+        is_secretaria(request.user)
+        or is_medico(request.user)
+        or consulta.paciente == getattr(request.user, 'perfil_paciente', None)
+    ):
+        if is_ajax:
+            return JsonResponse({"ok": False, "errors": {"__all__": ["Sem permissão"]}}, status=403)
+        messages.error(request, "Você não tem permissão.")
+        return redirect("listar_consultas")
+
+    # ==================================================================
+    # POST — SALVAR ALTERAÇÕES
+    # ==================================================================
+    if request.method == "POST":
+        form = ConsultaForm(request.POST, instance=consulta, user=request.user)
+
+        if form.is_valid():
+
+            data = form.cleaned_data["data"]
+            hora = form.cleaned_data["hora"]
+            duracao = form.cleaned_data.get("duracao_minutos") or consulta.duracao_minutos
+
+            data_hora = timezone.make_aware(
+                datetime.combine(data, hora),
+                timezone.get_current_timezone()
+            )
+
+            consulta.data_hora = data_hora
+            consulta.medico = form.cleaned_data["medico"]
+            consulta.observacoes = form.cleaned_data["observacoes"]
+            consulta.status = form.cleaned_data["status"]
+            consulta.confirmada = form.cleaned_data["confirmada"]
+            consulta.duracao_minutos = duracao
+
+            # convênio
+            usa_convenio = request.POST.get("usa_convenio") == "on"
+            consulta.usa_convenio = usa_convenio
+
+            convenio_id = request.POST.get("convenio")
+            consulta.convenio = Convenio.objects.filter(id=convenio_id).first() if usa_convenio else None
+
+            try:
+                with transaction.atomic():
+                    consulta.save()
+
+            except IntegrityError as erro:
+                if not conflito_de_horario(erro):
+                    raise
+
+                msg = "Este horário já está reservado. Escolha outro horário."
+
+                if is_ajax:
+                    return JsonResponse({"ok": False, "errors": {"hora": [msg]}}, status=400)
+
+                messages.error(request, msg)
+                return redirect("editar_consulta", pk=consulta.pk)
+
+            # AJAX RESPONSE (JS espera isso!)
+            if is_ajax:
+                return JsonResponse({
+                    "ok": True,
+                    "consulta": {
+                        "id": consulta.id,
+                        "medico": str(consulta.medico),
+                        "paciente": consulta.paciente.nome,
+                        "data": data_hora.strftime("%d/%m/%Y"),
+                        "hora": data_hora.strftime("%H:%M"),
+                        "convenio": consulta.convenio.nome if consulta.convenio else None
+                    }
+                })
+
+            messages.success(request, "Consulta atualizada com sucesso!")
+            return redirect("listar_consultas")
+
+        # FORM INVÁLIDO → ERRO AJAX
+        if is_ajax:
+            errors = form.errors.get_json_data()
+            simplified = {campo: [e["message"] for e in msgs] for campo, msgs in errors.items()}
+            return JsonResponse({"ok": False, "errors": simplified}, status=400)
+
+        messages.error(request, "Corrija os erros do formulário.")
+
+    # ==================================================================
+    # GET — EXIBIR FORMULÁRIO
+    # ==================================================================
+    inicial = {
+        "data": consulta.data_hora.date(),
+        "hora": consulta.data_hora.time().strftime("%H:%M"),
+        "duracao_minutos": consulta.duracao_minutos,
+    }
+
+    form = ConsultaForm(
+        instance=consulta,
+        initial=inicial,
+        user=request.user
+    )
+
+    context = {
+        "form": form,
+        "titulo": "Editar Consulta",
+        "consulta": consulta,
+        "especialidades": referencias.especialidades(),
+        "convenios": referencias.convenios_ativos(),
+    }
+
+    return render(request, "agendamento/consultas/consulta_form.html", context)
+
+
+# ===============================================================
+# CONSULTAS — EXCLUIR
+# ===============================================================
+
+@login_required
+def excluir_consulta(request, pk):
+    consulta = get_object_or_404(Consulta, pk=pk)
+
+    # Permissões: médico, secretaria, admin ou paciente dono
+    if not (
+        is_secretaria(request.user)
+        or is_medico(request.user)
+        or consulta.paciente == getattr(request.user, 'perfil_paciente', None)
+    ):
+        messages.error(request, 'Você não tem permissão para excluir esta consulta.')
+        return redirect('listar_consultas')
+
+    if request.method == 'POST':
+        consulta.delete()
+        messages.success(request, 'Consulta excluída com sucesso!')
+        return redirect('listar_consultas')
+
+    context = {'consulta': consulta, 'titulo': 'Excluir Consulta'}
+
+    return render(request, 'agendamento/consultas/consulta_confirm_delete.html', context)
+
+
+# ===============================================================
+# CONSULTAS — CANCELAR
+# ===============================================================
+
+@login_required
+def cancelar_consulta(request, pk):
+    consulta = get_object_or_404(Consulta, pk=pk)
+
+    # Permissões
+    if not (
+        is_secretaria(request.user)
+        or is_medico(request.user)
+        or consulta.paciente == getattr(request.user, 'perfil_paciente', None)
+    ):
+        messages.error(request, 'Você não tem permissão para cancelar esta consulta.')
+        return redirect('listar_consultas')
+
+    if request.method == 'POST':
+        consulta.status = 'cancelada'
+        consulta.save()
+
+        # Notifica o paciente
+        if consulta.paciente and consulta.paciente.usuario:
+            Notificacao.objects.create(
+                usuario=consulta.paciente.usuario,
+                titulo="Consulta Cancelada",
+                mensagem=(
+                    f"A consulta com {consulta.medico.user.get_full_name()} "
+                    f"em {consulta.data_hora.strftime('%d/%m/%Y %H:%M')} foi cancelada."
+                ),
+                link=reverse('pagina_inicial')
+            )
+
+        messages.success(request, 'Consulta cancelada com sucesso.')
+        return redirect('listar_consultas')
+
+
+# ===============================================================
+# CONSULTAS — EXPORTAÇÃO PARA FATURAMENTO (CSV)
+# ===============================================================
+
+@login_required
+@user_passes_test(is_secretaria)
+def exportar_faturamento(request):
+    try:
+        filtros = ler_filtros_consultas(request.GET)
+    except ValueError:
+        messages.error(request, "Filtro de exportação inválido.")
+        return redirect('listar_consultas')
+
+    response = StreamingHttpResponse(
+        exportar_faturamento_csv(filtrar_consultas_faturamento(**filtros)),
+        content_type="text/csv; charset=utf-8",
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="faturamento_{timezone.localdate():%Y%m%d}.csv"'
+    )
+    return response
@@ -0,0 +1,94 @@
+# ===============================================================
+# VIEWS — ESPECIALIDADES
+# ===============================================================
+#
+# CRUD de especialidades (equipe).
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.shortcuts import get_object_or_404, redirect, render
+
+from ..forms import EspecialidadeForm
+from ..models import Especialidade
+from ..papeis import is_secretaria
+
+
+# ===============================================================
+# ESPECIALIDADES — LISTAR
+# ===============================================================
+
+@login_required
+@user_passes_test(is_secretaria)
+def listar_especialidades(request):
+    especialidades = Especialidade.objects.all().order_by('nome')
+
+    context = {'especialidades': especialidades}
+
+    return render(request, 'agendamento/especialidades/listar_especialidades.html', context)
+
+
+# ===============================================================
+# ESPECIALIDADES — CRIAR
+# ===============================================================
+
+@login_required
+@user_passes_test(is_secretaria)
+def criar_especialidade(request):
+    form = EspecialidadeForm(request.POST or None)
+
+    if request.method == 'POST' and form.is_valid():
+        form.save()
+        messages.success(request, 'Especialidade cadastrada com sucesso!')
+        return redirect('listar_especialidades')
+
+    context = {
+        'form': form,
+        'titulo': 'Nova Especialidade'
+    }
+
+    return render(request, 'agendamento/especialidades/especialidade_form.html', context)
+
+
+# ===============================================================
+# ESPECIALIDADES — EDITAR
+# ===============================================================
+
+@login_required
+@user_passes_test(is_secretaria)
+def editar_especialidade(request, pk):
+    especialidade = get_object_or_404(Especialidade, pk=pk)
+    form = EspecialidadeForm(request.POST or None, instance=especialidade)
+
+    if request.method == 'POST' and form.is_valid():
+        form.save()
+        messages.success(request, 'Especialidade atualizada com sucesso!')
+        return redirect('listar_especialidades')
+
+    context = {
+        'form': form,
+        'titulo': 'Editar Especialidade'
+    }
+
+    return render(request, 'agendamento/especialidades/especialidade_form.html', context)
+
+
+# ===============================================================
+# ESPECIALIDADES — EXCLUIR
+# ===============================================================
+
+@login_required
+@user_passes_test(is_secretaria)
+def excluir_especialidade(request, pk):
+    especialidade = get_object_or_404(Especialidade, pk=pk)
+
+    if request.method == 'POST':
+        especialidade.delete()
+        messages.success(request, 'Especialidade excluída com sucesso!')
+        return redirect('listar_especialidades')
+
+    context = {
+        'especialidade': especialidade,
+        'titulo': 'Excluir Especialidade'
+    }
+
+    return render(request, 'agendamento/especialidades/especialidade_confirm_delete.html', context)
@@ -0,0 +1,97 @@
+# ===============================================================
+# VIEWS — PÁGINA INICIAL
+# ===============================================================
+#
+# Dashboard de cada papel (médico, paciente, secretaria).
+
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+
+from .. import referencias
+from ..estatisticas import consultas_por_status, estatisticas_dashboard
+from ..models import Consulta, Notificacao
+from ..papeis import is_medico, is_usuario_padrao
+from ..resumo_agenda import ocupacao_da_semana
+
+
+# ===============================================================
+# DASHBOARD — PÁGINA INICIAL
+# ===============================================================
+
+@login_required
+def pagina_inicial(request):
+
+    user = request.user
+    context = {}
+
+    # -----------------------------------------------------------
+    # MÉDICO — mostra apenas dados relacionados ao médico logado
+    # -----------------------------------------------------------
+    if is_medico(user):
+
+        consultas_qs = (Consulta.objects
+                        .filter(medico=user.perfil_medico)
+                        .select_related("paciente", "medico__user")
+                        .order_by("data_hora"))
+
+        por_status = consultas_por_status(consultas_qs)
+
+        context.update(estatisticas_dashboard("medico", user))
+        context.update({
+            'consultas': consultas_qs,
+            'consultas_pendentes': por_status['agendada'],
+            'consultas_confirmadas': por_status['confirmada'],
+            'consultas_canceladas': por_status['cancelada'],
+
+            'notificacoes': Notificacao.objects.filter(usuario=user).order_by('-criado_em')[:5],
+        })
+
+    # -----------------------------------------------------------
+    # PACIENTE — mostra somente conteúdo vinculado ao paciente
+    # -----------------------------------------------------------
+    elif is_usuario_padrao(user):
+
+        paciente = getattr(user, 'perfil_paciente', None)
+
+        if paciente:
+            consultas = Consulta.objects.filter(
+                paciente=paciente
+            ).select_related("paciente", "medico__user").order_by("data_hora")
+        else:
+            consultas = Consulta.objects.none()
+
+        context.update(estatisticas_dashboard("paciente", user))
+        context.update({
+            'consultas': consultas,
+
+            'notificacoes': Notificacao.objects.filter(usuario=user).order_by('-criado_em')[:5],
+        })
+
+    # -----------------------------------------------------------
+    # ADMIN / SECRETÁRIA — visualiza tudo
+    # -----------------------------------------------------------
+    else:
+
+        consultas_qs = Consulta.objects.select_related(
+            "paciente", "medico__user"
+        ).order_by("data_hora")
+
+        por_status = consultas_por_status(consultas_qs)
+
+        # "quão cheia está a agenda de cada médico nesta semana", lido do resumo diário
+        medicos = referencias.medicos()
+        ocupacao = ocupacao_da_semana(medicos)
+
+        context.update(estatisticas_dashboard("secretaria", user))
+        context.update({
+            'consultas': consultas_qs,
+            'ocupacao_semana': [{'medico': m, **ocupacao[m.pk]} for m in medicos],
+
+            'consultas_pendentes': por_status['agendada'],
+            'consultas_confirmadas': por_status['confirmada'],
+            'consultas_canceladas': por_status['cancelada'],
+
+            'notificacoes': Notificacao.objects.filter(usuario=user).order_by('-criado_em')[:5],
+        })
+
+    return render(request, 'agendamento/pagina_inicial.html', context)
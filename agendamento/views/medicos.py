@@ -0,0 +1,96 @@
+# ===============================================================
+# VIEWS — MÉDICOS
+# ===============================================================
+#
+# CRUD de médicos (equipe).
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.shortcuts import get_object_or_404, redirect, render
+
+from ..forms import MedicoForm
+from ..models import Medico
+from ..papeis import is_secretaria
+
+
+# ===============================================================
+# MÉDICOS — LISTAR
+# ===============================================================
+
+@login_required
+@user_passes_test(is_secretaria)
+def listar_medicos(request):
+    medicos = (
+        Medico.objects
+        .select_related('user', 'especialidade')
+        .all()
+        .order_by('user__first_name')
+    )
+
+    context = {'medicos': medicos}
+
+    return render(request, 'agendamento/medicos/listar_medicos.html', context)
+
+
+# ===============================================================
+# MÉDICOS — CRIAR
+# ===============================================================
+
+@login_required
+@user_passes_test(is_secretaria)
+def criar_medico(request):
+    form = MedicoForm(request.POST or None)
+
+    if request.method == 'POST' and form.is_valid():
+        form.save()
+        messages.success(request, 'Médico cadastrado com sucesso!')
+        return redirect('listar_medicos')
+
+    context = {
+        'form': form,
+        'titulo': 'Novo Médico'
+    }
+
+    return render(request, 'agendamento/medicos/medico_form.html', context)
+
+
+# ===============================================================
+# MÉDICOS — EDITAR
+# ===============================================================
+
+@login_required
+@user_passes_test(is_secretaria)
+def editar_medico(request, pk):
+    medico = get_object_or_404(Medico, pk=pk)
+    form = MedicoForm(request.POST or None, instance=medico)
+
+    if request.method == 'POST' and form.is_valid():
+        form.save()
+        messages.success(request, 'Médico atualizado com sucesso!')
+        return redirect('listar_medicos')
+
+    context = {
+        'form': form,
+        'titulo': 'Editar Médico'
+    }
+
+    return render(request, 'agendamento/medicos/medico_form.html', context)
+
+
+# ===============================================================
+# MÉDICOS — EXCLUIR
+# ===============================================================
+
+@login_required
+@user_passes_test(is_secretaria)
+def excluir_medico(request, pk):
+    medico = get_object_or_404(Medico, pk=pk)
+
+    if request.method == 'POST':
+        medico.delete()
+        messages.success(request, 'Médico excluído com sucesso!')
+        return redirect('listar_medicos')
+
+    context = {'medico': medico}
+
+    return render(request, 'agendamento/medicos/medico_confirm_delete.html', context)
@@ -0,0 +1,195 @@
+# ===============================================================
+# VIEWS — NOTIFICAÇÕES
+# ===============================================================
+#
+# Contador, listas, marcação como lida e stream SSE. Não importa
+# formulários nem o PDF: é o que o polling do menu carrega.
+
+import asyncio
+import json
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+
+from ..eventos import broker, garantir_ouvinte
+from ..models import Notificacao
+from ..notificacoes import (
+    anao_lidas, estado_notificacoes, etag_notificacoes, marcar_como_lidas,
+    nao_lidas, ultima_alteracao_notificacoes
+)
+
+
+# ===============================================================
+# NOTIFICAÇÕES — NOVAS (NÃO LIDAS)
+# ===============================================================
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_notificacoes, last_modified_func=ultima_alteracao_notificacoes)
+def notificacoes_novas(request):
+    # contador zerado → nada a buscar
+    if estado_notificacoes(request)[0] <= 0:
+        return JsonResponse({'novas': []})
+
+    novas = (
+        Notificacao.objects
+        .filter(usuario=request.user, lida=False)
+        .order_by('-criado_em')
+    )
+
+    data = [{
+        'id': n.id,
+        'titulo': n.titulo,
+        'mensagem': n.mensagem,
+        'link': n.link,
+        'criado_em': timezone.localtime(n.criado_em).strftime('%d/%m/%Y %H:%M'),
+    } for n in novas]
+
+    return JsonResponse({'novas': data})
+
+
+# ===============================================================
+# NOTIFICAÇÕES — CONTAGEM
+# ===============================================================
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_notificacoes, last_modified_func=ultima_alteracao_notificacoes)
+def notificacoes_count(request):
+    return JsonResponse({'count': max(estado_notificacoes(request)[0], 0)})
+
+
+# ===============================================================
+# NOTIFICAÇÕES — STREAM SSE (ASGI)
+# ===============================================================
+
+def evento_sse(evento, dados):
+    return f"event: {evento}\ndata: {json.dumps(dados)}\n\n"
+
+
+async def stream_notificacoes(usuario_id):
+    """Gerador SSE: contagem inicial, cada nova notificação e heartbeats."""
+    loop = asyncio.get_running_loop()
+    fila = asyncio.Queue()
+
+    # assina antes da contagem inicial para não perder eventos no intervalo
+    broker.assinar(usuario_id, loop, fila)
+    garantir_ouvinte()
+
+    try:
+        yield "retry: 5000\n\n"
+        yield evento_sse("count", {"count": await anao_lidas(usuario_id)})
+
+        while True:
+            try:
+                notificacao_id = await asyncio.wait_for(
+                    fila.get(), timeout=settings.NOTIFICACOES_SSE_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+
+            n = await Notificacao.objects.filter(pk=notificacao_id, usuario_id=usuario_id).afirst()
+            if n is None:
+                continue
+
+            yield evento_sse("notificacao", {
+                'id': n.id,
+                'titulo': n.titulo,
+                'mensagem': n.mensagem,
+                'link': n.link or '',
+                'lida': n.lida,
+                'criado_em': timezone.localtime(n.criado_em).strftime('%d/%m/%Y %H:%M'),
+                'count': await anao_lidas(usuario_id),
+            })
+
+    finally:
+        broker.cancelar(usuario_id, loop, fila)
+
+
+@login_required
+async def notificacoes_stream(request):
+    user = await request.auser()
+
+    response = StreamingHttpResponse(
+        stream_notificacoes(user.pk),
+        content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+
+    return response
+
+
+# ===============================================================
+# NOTIFICAÇÕES — DROPDOWN LIST
+# ===============================================================
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_notificacoes, last_modified_func=ultima_alteracao_notificacoes)
+def notificacoes_list(request):
+    limit = int(request.GET.get('limit', 8))
+
+    notificacoes = (
+        Notificacao.objects
+        .filter(usuario=request.user)
+        .order_by('-criado_em')[:limit]
+    )
+
+    data = [
+        {
+            'id': n.id,
+            'titulo': n.titulo,
+            'mensagem': n.mensagem,
+            'link': n.link or '',
+            'lida': n.lida,
+            'criado_em': timezone.localtime(n.criado_em).strftime('%d/%m/%Y %H:%M'),
+        }
+        for n in notificacoes
+    ]
+
+    return JsonResponse({'notificacoes': data})
+
+
+# ===============================================================
+# NOTIFICAÇÕES — LISTAR PÁGINA COMPLETA
+# ===============================================================
+
+@login_required
+def listar_notificacoes(request):
+    f = request.GET.get('f', 'all')
+
+    qs = Notificacao.objects.filter(usuario=request.user).order_by('-criado_em')
+
+    if f == 'unread':
+        qs = qs.filter(lida=False)
+    elif f == 'read':
+        qs = qs.filter(lida=True)
+
+    context = {'notificacoes': qs, 'nao_lidas': nao_lidas(request.user.pk)}
+
+    return render(request, 'agendamento/notificacoes/listar_notificacoes.html', context)
+
+
+# ===============================================================
+# NOTIFICAÇÕES — MARCAR COMO LIDA
+# ===============================================================
+
+@login_required
+@require_POST
+def notificacoes_marcar_lida(request, pk):
+    if not Notificacao.objects.filter(pk=pk, usuario=request.user).exists():
+        return JsonResponse(
+            {'ok': False, 'error': 'Notificação não encontrada'},
+            status=404
+        )
+
+    marcar_como_lidas(request.user, ids=[pk])
+
+    return JsonResponse({'ok': True})
@@ -0,0 +1,150 @@
+# ===============================================================
+# VIEWS — PACIENTES
+# ===============================================================
+#
+# CRUD, busca e histórico de pacientes.
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+
+from ..busca import ORDEM_BUSCA, buscar_pacientes
+from ..forms import PacienteForm
+from ..models import Consulta, Paciente
+from ..paginacao import paginar_keyset
+from ..papeis import is_secretaria
+
+
+# ===============================================================
+# PACIENTES — LISTAR
+# ===============================================================
+
+@login_required
+def listar_pacientes(request):
+    termo = request.GET.get('q', '').strip()
+
+    if termo:
+        pacientes = paginar_keyset(request, buscar_pacientes(termo), ORDEM_BUSCA)
+    else:
+        pacientes = paginar_keyset(request, Paciente.objects.all(), ("nome", "id"))
+
+    context = {'pacientes': pacientes, 'termo': termo}
+
+    return render(request, 'agendamento/pacientes/listar_pacientes.html', context)
+
+
+# ===============================================================
+# PACIENTES — BUSCA (JSON)
+# ===============================================================
+
+@login_required
+@user_passes_test(is_secretaria)
+def buscar_pacientes_json(request):
+    """Busca por nome ou CPF, ordenada por relevância e paginada por cursor."""
+    termo = request.GET.get('q', '').strip()
+    pacientes = paginar_keyset(
+        request,
+        buscar_pacientes(termo).select_related('convenio'),
+        ORDEM_BUSCA,
+    )
+
+    return JsonResponse({
+        'resultados': [
+            {
+                'id': p.pk,
+                'nome': p.nome,
+                'cpf': p.cpf or '',
+                'telefone': p.telefone,
+                'convenio': p.convenio.nome if p.convenio else None,
+                'relevancia': p.relevancia,
+            }
+            for p in pacientes
+        ],
+        'proxima': pacientes.url_proxima,
+        'anterior': pacientes.url_anterior,
+    })
+
+
+# ===============================================================
+# PACIENTES — CRIAR
+# ===============================================================
+
+@login_required
+def criar_paciente(request):
+    form = PacienteForm(request.POST or None)
+
+    if request.method == 'POST' and form.is_valid():
+        form.save()
+        messages.success(request, 'Paciente criado com sucesso!')
+        return redirect('listar_pacientes')
+
+    context = {
+        'form': form,
+        'titulo': 'Novo Paciente'
+    }
+
+    return render(request, 'agendamento/pacientes/paciente_form.html', context)
+
+
+# ===============================================================
+# PACIENTES — EDITAR
+# ===============================================================
+
+@login_required
+def editar_paciente(request, pk):
+    paciente = get_object_or_404(Paciente, pk=pk)
+    form = PacienteForm(request.POST or None, instance=paciente)
+
+    if request.method == 'POST' and form.is_valid():
+        form.save()
+        messages.success(request, 'Paciente atualizado com sucesso!')
+        return redirect('listar_pacientes')
+
+    context = {
+        'form': form,
+        'titulo': 'Editar Paciente'
+    }
+
+    return render(request, 'agendamento/pacientes/paciente_form.html', context)
+
+
+# ===============================================================
+# PACIENTES — EXCLUIR
+# ===============================================================
+
+@login_required
+def excluir_paciente(request, pk):
+    paciente = get_object_or_404(Paciente, pk=pk)
+
+    if request.method == 'POST':
+        paciente.delete()
+        messages.success(request, 'Paciente excluído com sucesso!')
+        return redirect('listar_pacientes')
+
+    context = {'paciente': paciente}
+
+    return render(request, 'agendamento/pacientes/paciente_confirm_delete.html', context)
+
+
+# ===============================================================
+# PACIENTES — HISTÓRICO
+# ===============================================================
+
+@login_required
+def historico_paciente(request, paciente_id):
+    paciente = get_object_or_404(Paciente, pk=paciente_id)
+
+    consultas = (
+        Consulta.objects
+        .filter(paciente=paciente)
+        .select_related('medico')
+        .order_by('-data_hora')
+    )
+
+    context = {
+        'paciente': paciente,
+        'consultas': consultas
+    }
+
+    return render(request, 'agendamento/pacientes/historico_paciente.html', context)
@@ -0,0 +1,535 @@
+# ===============================================================
+# VIEWS — PRONTUÁRIOS
+# ===============================================================
+#
+# Prontuários, exames, PDF, busca no texto clínico, CID-10 e exportação em lote.
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import FileResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import parse_etags
+from django.views.decorators.cache import cache_control
+
+from .. import referencias
+from ..busca import (
+    ORDEM_BUSCA_CID, ORDEM_BUSCA_PRONTUARIOS, buscar_cids, buscar_prontuarios, destacar_trechos
+)
+from ..estatisticas import diagnosticos_por_cid
+from ..exportacao import exportar_prontuarios_zip, filtrar_prontuarios, ler_filtros
+from ..forms import ExameForm
+from ..models import Consulta, Exame, Paciente, Prontuario
+from ..paginacao import paginar_keyset
+from ..papeis import is_medico, is_secretaria, is_usuario_padrao
+from ..pdf import (
+    modo as modo_pdf, processar_tarefa, registrar_acesso, tarefa_atual, tarefa_do_prontuario
+)
+
+
+# ===============================================================
+# PRONTUÁRIO — CRIAR
+# ===============================================================
+
+@login_required
+def criar_prontuario(request, paciente_id):
+    paciente = get_object_or_404(Paciente, pk=paciente_id)
+
+    if request.method == "POST":
+        descricao = request.POST.get("descricao")
+        queixa = request.POST.get("queixa")
+        diagnostico = request.POST.get("diagnostico")
+        cid = request.POST.get("cid")
+        medicacao = request.POST.get("medicacao")
+        anexo = request.FILES.get("anexo")
+
+        prontuario = Prontuario.objects.create(
+            paciente=paciente,
+            descricao=descricao,
+            queixa=queixa,
+            diagnostico=diagnostico,
+            cid=cid,
+            medicacao=medicacao,
+            anexo=anexo
+        )
+
+        messages.success(request, "Prontuário criado com sucesso!")
+        return redirect("prontuario_detalhe", prontuario.pk)
+
+    return render(request, "agendamento/prontuarios/prontuario_form.html", {
+        "paciente": paciente,
+        "titulo": "Novo Prontuário",
+        "prontuario": None,
+    })
+
+
+# ===============================================================
+# PRONTUÁRIO — GERAR PDF
+# ===============================================================
+
+def status_pdf(prontuario, tarefa):
+    # sem tarefa: o prontuário mudou depois do pedido; a página volta à view, que enfileira a versão nova
+    status = tarefa.status if tarefa else "ausente"
+
+    return {
+        "status": status,
+        "pronto": status == "pronto",
+        "url": reverse("prontuario_pdf", args=[prontuario.pk]),
+    }
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+def prontuario_pdf(request, pk):
+    prontuario = get_object_or_404(Prontuario.objects.select_related("paciente"), pk=pk)
+    tarefa = tarefa_do_prontuario(prontuario)
+
+    if tarefa.status != "pronto" and modo_pdf() == "sincrono":
+        processar_tarefa(tarefa, tentar_de_novo=False)
+
+    if tarefa.status == "pronto":
+        registrar_acesso(tarefa)
+        etag = f'"{tarefa.chave}"'
+
+        # o navegador já tem esta versão
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(
+                tarefa.arquivo.open("rb"),
+                as_attachment=True,
+                filename=f"prontuario_{pk}.pdf",
+                content_type="application/pdf",
+            )
+            response["Content-Length"] = tarefa.arquivo.size
+
+        response["ETag"] = etag
+        return response
+
+    # ainda na fila — página que acompanha a geração e baixa quando pronto
+    context = {"prontuario": prontuario, "tarefa": tarefa}
+
+    return render(request, "agendamento/prontuarios/prontuario_pdf_aguarde.html", context, status=202)
+
+
+@login_required
+def prontuario_pdf_status(request, pk):
+    prontuario = get_object_or_404(Prontuario.objects.select_related("paciente"), pk=pk)
+    dados = status_pdf(prontuario, tarefa_atual(prontuario))
+
+    return JsonResponse(dados, status=200 if dados["pronto"] else 202)
+
+
+# ===============================================================
+# CID-10 — BUSCA (JSON)
+# ===============================================================
+
+@login_required
+def buscar_cids_json(request):
+    """Catálogo CID por prefixo do código ou palavras da descrição, paginado por cursor."""
+    cids = paginar_keyset(request, buscar_cids(request.GET.get('q', '')), ORDEM_BUSCA_CID)
+
+    return JsonResponse({
+        'resultados': [
+            {
+                'codigo': cid.codigo_formatado,
+                'descricao': cid.descricao,
+                'relevancia': cid.relevancia,
+            }
+            for cid in cids
+        ],
+        'proxima': cids.url_proxima,
+        'anterior': cids.url_anterior,
+    })
+
+
+# ===============================================================
+# RELATÓRIO — DIAGNÓSTICOS POR CID
+# ===============================================================
+
+@login_required
+def relatorio_cid(request):
+    user = request.user
+
+    if not (is_secretaria(user) or is_medico(user)):
+        messages.error(request, "Você não tem permissão para ver este relatório.")
+        return redirect('pagina_inicial')
+
+    try:
+        filtros = ler_filtros(request.GET)
+    except ValueError:
+        messages.error(request, "Filtro inválido.")
+        filtros = {}
+
+    hoje = timezone.localdate()
+    filtros.setdefault("inicio", hoje.replace(day=1))
+    filtros.setdefault("fim", hoje)
+
+    # médico vê só os próprios diagnósticos
+    if not is_secretaria(user):
+        filtros["medico"] = user.perfil_medico.pk
+
+    context = {
+        "linhas": diagnosticos_por_cid(filtrar_prontuarios(**filtros)),
+        "filtros": filtros,
+        "medicos": referencias.medicos() if is_secretaria(user) else [],
+    }
+
+    return render(request, 'agendamento/prontuarios/relatorio_cid.html', context)
+
+
+# ===============================================================
+# PRONTUÁRIOS — EXPORTAÇÃO EM LOTE (ZIP)
+# ===============================================================
+
+@login_required
+@user_passes_test(is_secretaria)
+def exportar_prontuarios(request):
+    try:
+        filtros = ler_filtros(request.GET)
+    except ValueError:
+        messages.error(request, "Filtro de exportação inválido.")
+        return redirect('listar_prontuarios')
+
+    response = StreamingHttpResponse(
+        exportar_prontuarios_zip(filtrar_prontuarios(**filtros)),
+        content_type="application/zip",
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="prontuarios_{timezone.localdate():%Y%m%d}.zip"'
+    )
+    return response
+
+
+# ===============================================================
+# PRONTUÁRIO — COMPLETO
+# ===============================================================
+
+@login_required
+def prontuario_completo(request, pk):
+    prontuario = get_object_or_404(Prontuario, pk=pk)
+    paciente = prontuario.paciente
+
+    consultas = Consulta.objects.filter(paciente=paciente).order_by("-data_hora")
+    exames = Exame.objects.filter(prontuario=prontuario).order_by("-criado_em")
+
+    context = {
+        "prontuario": prontuario,
+        "paciente": paciente,
+        "consultas": consultas,
+        "exames": exames
+    }
+
+    return render(request, "agendamento/prontuarios/prontuario_completo.html", context)
+
+
+# ===============================================================
+# PRONTUÁRIOS — LISTAR
+# ===============================================================
+
+ORDEM_PRONTUARIOS = ("-criado_em", "-id")
+
+
+def paginar_prontuarios(request, prontuarios):
+    """Página da listagem; com ?q= busca no texto clínico, por relevância e com trechos."""
+    termo = request.GET.get("q", "").strip()
+
+    if not termo:
+        return paginar_keyset(request, prontuarios, ORDEM_PRONTUARIOS)
+
+    pagina = paginar_keyset(request, buscar_prontuarios(termo, prontuarios), ORDEM_BUSCA_PRONTUARIOS)
+    destacar_trechos(pagina, termo)
+    return pagina
+
+
+@login_required
+def listar_prontuarios(request):
+    user = request.user
+    termo = request.GET.get("q", "").strip()
+
+    # Paciente — vê apenas dele
+    if is_usuario_padrao(user):
+        paciente = getattr(user, "perfil_paciente", None)
+
+        prontuarios = Prontuario.objects.filter(paciente=paciente)
+
+        context = {
+            "patient": paciente,
+            "prontuarios": paginar_prontuarios(request, prontuarios),
+            "termo": termo,
+        }
+
+        return render(request, "agendamento/prontuarios/listar_prontuarios.html", context)
+
+    # Médico — vê prontuários dos seus pacientes
+    elif is_medico(user):
+        medico = user.perfil_medico
+
+        pacientes_ids = Consulta.objects.filter(
+            medico=medico
+        ).values_list("paciente_id", flat=True)
+
+        prontuarios = Prontuario.objects.filter(
+            paciente__in=pacientes_ids
+        ).select_related("paciente")
+
+        context = {
+            "patient": None,
+            "prontuarios": paginar_prontuarios(request, prontuarios),
+            "termo": termo,
+        }
+
+        return render(request, "agendamento/prontuarios/listar_prontuarios.html", context)
+
+    # Admin / secretaria — vê tudo
+    else:
+        prontuarios = Prontuario.objects.all().select_related("paciente")
+
+        context = {
+            "patient": None,
+            "prontuarios": paginar_prontuarios(request, prontuarios),
+            "termo": termo,
+            # filtros da exportação em lote
+            "medicos": referencias.medicos(),
+            "convenios": referencias.convenios(),
+        }
+
+        return render(request, "agendamento/prontuarios/listar_prontuarios.html", context)
+
+
+# ===============================================================
+# PRONTUÁRIO — DETALHE
+# ===============================================================
+
+@login_required
+def prontuario_detalhe(request, pk):
+    prontuario = get_object_or_404(Prontuario, pk=pk)
+    paciente = prontuario.paciente
+
+    exames = Exame.objects.filter(prontuario=prontuario).order_by('-criado_em')
+    consultas = Consulta.objects.filter(paciente=paciente).order_by('-data_hora')
+
+    context = {
+        "prontuario": prontuario,
+        "paciente": paciente,
+        "exames": exames,
+        "consultas": consultas,
+    }
+
+    return render(request, "agendamento/prontuarios/prontuario_detalhe.html", context)
+
+
+# ===============================================================
+# PRONTUÁRIO — EDITAR
+# ===============================================================
+
+@login_required
+def editar_prontuario(request, pk):
+    prontuario = get_object_or_404(Prontuario, pk=pk)
+
+    # Permissões: médico, secretaria ou admin
+    if not (
+        request.user.is_staff or request.user.is_superuser or
+        is_medico(request.user)
+    ):
+        messages.error(request, "Você não tem permissão para editar este prontuário.")
+        return redirect("listar_prontuarios")
+
+    if request.method == "POST":
+
+        # Botão cancelar
+        if "cancelar" in request.POST:
+            messages.info(request, "Edição cancelada.")
+            return redirect("prontuario_detalhe", pk=pk)
+
+        prontuario.descricao   = request.POST.get("descricao", "").strip()
+        prontuario.queixa      = request.POST.get("queixa", "").strip()
+        prontuario.diagnostico = request.POST.get("diagnostico", "").strip()
+        prontuario.cid         = request.POST.get("cid", "").strip()
+        prontuario.medicacao   = request.POST.get("medicacao", "").strip()
+
+        # validações simples
+        if prontuario.descricao == "":
+            messages.error(request, "O campo descrição é obrigatório.")
+            return redirect("editar_prontuario", pk=pk)
+
+        if prontuario.diagnostico == "":
+            messages.error(request, "O campo diagnóstico é obrigatório.")
+            return redirect("editar_prontuario", pk=pk)
+
+        # arquivo novo
+        if request.FILES.get("arquivo"):
+            arquivo = request.FILES["arquivo"]
+
+            if arquivo.size > 10 * 1024 * 1024:
+                messages.error(request, "Arquivo muito grande! Máximo 10MB.")
+                return redirect("editar_prontuario", pk=pk)
+
+            prontuario.anexo = arquivo
+
+        prontuario.save()
+
+        messages.success(request, "Prontuário atualizado com sucesso!")
+        return redirect("prontuario_detalhe", pk=pk)
+
+    # Método GET
+    form = ProntuarioForm(instance=prontuario)
+
+    return render(request, "agendamento/prontuarios/prontuario_form.html", {
+        "form": form,
+        "prontuario": prontuario,
+        "edit_mode": True
+    })
+
+
+# ===============================================================
+# PRONTUÁRIO — EDITAR COMPLETO
+# ===============================================================
+
+@login_required
+def editar_prontuario_completo(request, pk):
+    prontuario = get_object_or_404(Prontuario, pk=pk)
+    paciente = prontuario.paciente
+
+    exames = Exame.objects.filter(prontuario=prontuario).order_by("-criado_em")
+
+    if request.method == "POST":
+        prontuario.descricao = request.POST.get("descricao", "")
+        prontuario.queixa = request.POST.get("queixa", "")
+        prontuario.diagnostico = request.POST.get("diagnostico", "")
+        prontuario.cid = request.POST.get("cid", "")
+        prontuario.medicacao = request.POST.get("medicacao", "")
+
+        # Novo documento principal
+        if request.FILES.get("novo_documento"):
+            prontuario.anexo = request.FILES["novo_documento"]
+
+        # Novo exame anexado
+        if request.FILES.get("novo_exame"):
+            nome = request.POST.get("nome_exame", "")
+
+            Exame.objects.create(
+                prontuario=prontuario,
+                arquivo=request.FILES["novo_exame"],
+                nome=nome,
+                observado_por=request.user
+            )
+
+        prontuario.save()
+
+        messages.success(request, "Prontuário atualizado com sucesso!")
+        return redirect("editar_prontuario_completo", pk=pk)
+
+    context = {
+        "prontuario": prontuario,
+        "paciente": paciente,
+        "exames": exames,
+        "consultas": Consulta.objects.filter(paciente=paciente),
+    }
+
+    return render(request, "agendamento/prontuarios/prontuario_editar.html", context)
+
+
+# ===============================================================
+# PRONTUÁRIO — EXCLUIR
+# ===============================================================
+
+@login_required
+def excluir_prontuario(request, pk):
+    prontuario = get_object_or_404(Prontuario, pk=pk)
+
+    if request.method == 'POST':
+        prontuario.delete()
+        messages.success(request, 'Prontuário excluído com sucesso!')
+        return redirect('listar_prontuarios')
+
+    context = {'prontuario': prontuario, 'titulo': 'Excluir Prontuário'}
+
+    return render(request, 'agendamento/prontuarios/prontuario_confirm_delete.html', context)
+
+
+# ===============================================================
+# EXAMES — UPLOAD
+# ===============================================================
+
+@login_required
+def upload_exame(request, pk):
+    prontuario = get_object_or_404(Prontuario, pk=pk)
+    form = ExameForm(request.POST or None, request.FILES or None)
+
+    if request.method == "POST" and form.is_valid():
+        exame = form.save(commit=False)
+        exame.prontuario = prontuario
+        exame.observado_por = request.user
+        exame.save()
+
+        messages.success(request, "Exame enviado com sucesso!")
+        return redirect("prontuario_detalhe", pk=pk)
+
+    context = {
+        "form": form,
+        "prontuario": prontuario
+    }
+
+    return render(request, "agendamento/exames/upload_exame.html", context)
+
+
+# ===============================================================
+# EXAMES — ANEXAR DOCUMENTO
+# ===============================================================
+
+@login_required
+def anexar_exame(request, prontuario_id):
+    prontuario = get_object_or_404(Prontuario, pk=prontuario_id)
+
+    if request.method == "POST":
+        arquivo = request.FILES.get("arquivo")
+        nome = request.POST.get("nome")
+
+        if arquivo and nome:
+            Exame.objects.create(
+                prontuario=prontuario,
+                arquivo=arquivo,
+                nome=nome,
+                observado_por=request.user
+            )
+
+            messages.success(request, "Documento anexado com sucesso!")
+            return redirect("prontuario_detalhe", pk=prontuario.pk)
+
+        messages.error(request, "Erro ao enviar arquivo. Verifique os campos.")
+
+    context = {"prontuario": prontuario}
+
+    return render(request, "agendamento/exames/anexar_exame.html", context)
+
+
+# ===============================================================
+# EXAMES — EXCLUIR EXAME
+# ===============================================================
+
+@login_required
+def excluir_exame(request, exame_id):
+    exame = get_object_or_404(Exame, pk=exame_id)
+
+    prontuario_id = exame.prontuario.pk
+    exame.delete()
+
+    messages.success(request, "Exame removido com sucesso!")
+    return redirect("editar_prontuario_completo", pk=prontuario_id)
+
+
+# ===============================================================
+# EXAMES — EXCLUIR DOCUMENTO
+# ===============================================================
+
+@login_required
+def excluir_documento(request, doc_id):
+    doc = get_object_or_404(Exame, pk=doc_id)
+
+    prontuario_id = doc.prontuario.pk
+    doc.delete()
+
+    messages.success(request, "Documento removido com sucesso!")
+    return redirect("editar_prontuario_completo", pk=prontuario_id)
@@ -0,0 +1,81 @@
+# ===============================================================
+# VIEWS — USUÁRIOS
+# ===============================================================
+#
+# Cadastro, perfil e validações AJAX do formulário de cadastro.
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import Group, User
+from django.http import JsonResponse
+from django.shortcuts import redirect, render
+
+from ..forms import CustomUserCreationForm, UserPacienteProfileForm
+from ..papeis import GRUPO_USUARIO_PADRAO
+
+
+# ===============================================================
+# PERFIL — PERFIL DO USUÁRIO
+# ===============================================================
+
+@login_required
+def perfil_usuario(request):
+    user = request.user
+
+    if request.method == 'POST':
+        form = UserPacienteProfileForm(request.POST, request.FILES, instance=user)
+
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Perfil atualizado com sucesso!")
+            return redirect('perfil_usuario')
+
+        messages.error(request, "Corrija os erros abaixo.")
+
+    else:
+        form = UserPacienteProfileForm(instance=user)
+
+    context = {"form": form, "titulo": "Meu Perfil"}
+
+    return render(request, 'agendamento/usuarios/perfil_usuario.html', context)
+
+
+# ===============================================================
+# USUÁRIOS — CADASTRAR NOVO USUÁRIO
+# ===============================================================
+
+def cadastrar_usuario(request):
+    form = CustomUserCreationForm(request.POST or None)
+
+    if request.method == 'POST':
+        if form.is_valid():
+            user = form.save()
+
+            # adiciona automaticamente ao grupo Usuário Padrão
+            grupo, _ = Group.objects.get_or_create(name=GRUPO_USUARIO_PADRAO)
+            user.groups.add(grupo)
+
+            messages.success(request, "Conta criada com sucesso. Faça login para continuar.")
+            return redirect('login')
+
+        messages.error(request, "Corrija os erros abaixo.")
+
+    context = {'form': form}
+
+    return render(request, 'agendamento/cadastrar.html', context)
+
+
+# ===============================================================
+# USUÁRIOS — VALIDAÇÃO AJAX (username / email)
+# ===============================================================
+
+def validar_username(request):
+    username = request.GET.get("u", "")
+    exists = User.objects.filter(username__iexact=username).exists()
+    return JsonResponse({"exists": exists})
+
+
+def validar_email(request):
+    email = request.GET.get("e", "")
+    exists = User.objects.filter(email__iexact=email).exists()
+    return JsonResponse({"exists": exists})
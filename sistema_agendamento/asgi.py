@@ -3,6 +3,10 @@ ASGI config for sistema_agendamento project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The notification stream (``/notificacoes/stream/``) is an async view that keeps
+the connection open; serve it through this module (e.g. ``uvicorn
+sistema_agendamento.asgi:application``) so idle streams do not hold a worker.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
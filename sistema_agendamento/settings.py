@@ -33,6 +33,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Libs externas
     'widget_tweaks',
@@ -79,6 +80,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'agendamento.context_processors.usuario',
             ],
         },
     },
@@ -144,10 +146,73 @@ MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# ===============================================================
+# NOTIFICAÇÕES EM TEMPO REAL (SSE)
+# ===============================================================
+
+# "postgres" usa LISTEN/NOTIFY e entrega entre workers;
+# "local" entrega apenas no próprio processo (desenvolvimento).
+NOTIFICACOES_PUBSUB = os.environ.get('NOTIFICACOES_PUBSUB', 'postgres')
+NOTIFICACOES_SSE_HEARTBEAT = int(os.environ.get('NOTIFICACOES_SSE_HEARTBEAT', '15'))
+
+# Segundos que o total de não lidas exibido no menu fica em cache (0 desliga).
+NOTIFICACOES_CACHE_SEGUNDOS = int(os.environ.get('NOTIFICACOES_CACHE_SEGUNDOS', '30'))
+
+
+# ===============================================================
+# AUTOCOMPLETE
+# ===============================================================
+
+# Segundos até refazer os índices de prefixos em memória (médicos,
+# especialidades, usuários) usados pelos campos com autocomplete.
+AUTOCOMPLETE_TTL = int(os.environ.get('AUTOCOMPLETE_TTL', '60'))
+
+
+# ===============================================================
+# DASHBOARD
+# ===============================================================
+
+# Segundos que os contadores da página inicial ficam em cache (0 desliga).
+DASHBOARD_CACHE_SEGUNDOS = int(os.environ.get('DASHBOARD_CACHE_SEGUNDOS', '30'))
+
+# Segundos que especialidades, convênios e médicos ficam em cache (0 desliga).
+# Alterações nessas tabelas invalidam o cache do processo que as fez na hora;
+# sem um cache compartilhado (CACHES não definido = LocMemCache por processo),
+# os demais workers as veem em até REFERENCIAS_VERSAO_SEGUNDOS.
+REFERENCIAS_CACHE_SEGUNDOS = int(os.environ.get('REFERENCIAS_CACHE_SEGUNDOS', '3600'))
+REFERENCIAS_VERSAO_SEGUNDOS = int(os.environ.get('REFERENCIAS_VERSAO_SEGUNDOS', '60'))
+
+
+# ===============================================================
+# PDF DE PRONTUÁRIOS
+# ===============================================================
+
+# "fila": a view enfileira e o worker `manage.py processar_pdfs` gera;
+# "sincrono": gera dentro da própria requisição (desenvolvimento).
+PDF_GERACAO = os.environ.get('PDF_GERACAO', 'fila')
+
+# Cache dos PDFs gerados: remove os sem acesso há mais de N dias e,
+# acima do limite de tamanho, os menos acessados.
+PDF_CACHE_MAX_MB = int(os.environ.get('PDF_CACHE_MAX_MB', '500'))
+PDF_CACHE_MAX_DIAS = int(os.environ.get('PDF_CACHE_MAX_DIAS', '30'))
+
+# Processos que convertem HTML em PDF na exportação em lote (1 = sem pool).
+EXPORTACAO_PROCESSOS = int(os.environ.get('EXPORTACAO_PROCESSOS', '2'))
+
+
 # ===============================================================
 # AUTENTICAÇÃO
 # ===============================================================
 
+# Carrega perfil_medico/perfil_paciente junto com o usuário da sessão.
+# ModelBackend continua na lista para as sessões abertas antes da troca
+# (a sessão guarda o caminho do backend; sem ele o usuário seria
+# deslogado). Novos logins usam o primeiro da lista.
+AUTHENTICATION_BACKENDS = [
+    'agendamento.papeis.BackendComPerfis',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'pagina_inicial'
 LOGOUT_REDIRECT_URL = 'login'
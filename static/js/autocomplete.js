@@ -0,0 +1,70 @@
+// ===============================================================
+// AUTOCOMPLETE — <select data-autocomplete="/autocomplete/<tipo>/">
+// ===============================================================
+// O servidor renderiza só a opção escolhida; aqui um campo de texto
+// acima do select busca as demais conforme o usuário digita.
+
+document.addEventListener("DOMContentLoaded", () => {
+
+  document.querySelectorAll("select[data-autocomplete]").forEach(select => {
+    const url = select.dataset.autocomplete;
+
+    const busca = document.createElement("input");
+    busca.type = "search";
+    busca.className = "form-control form-control-sm mb-1";
+    busca.placeholder = "Digite para buscar…";
+    busca.autocomplete = "off";
+    select.parentNode.insertBefore(busca, select);
+
+    let espera = null;
+    let controle = null;
+
+    function preencher(resultados) {
+      const escolhido = select.querySelector("option:checked");
+      select.innerHTML = "";
+
+      const vazio = document.createElement("option");
+      vazio.value = "";
+      vazio.textContent = resultados.length ? `${resultados.length} resultado(s)` : "Nenhum resultado";
+      select.appendChild(vazio);
+
+      if (escolhido && escolhido.value && !resultados.some(r => String(r.id) === escolhido.value)) {
+        select.appendChild(escolhido);
+      }
+
+      resultados.forEach(r => {
+        const opt = document.createElement("option");
+        opt.value = r.id;
+        opt.textContent = r.texto;
+        select.appendChild(opt);
+      });
+
+      if (resultados.length === 1) {
+        select.value = resultados[0].id;
+        select.dispatchEvent(new Event("change"));
+      } else if (escolhido) {
+        select.value = escolhido.value;
+      }
+    }
+
+    busca.addEventListener("input", () => {
+      clearTimeout(espera);
+      const termo = busca.value.trim();
+      if (!termo) return;
+
+      espera = setTimeout(() => {
+        if (controle) controle.abort();
+        controle = new AbortController();
+
+        fetch(`${url}?q=${encodeURIComponent(termo)}`, {
+          credentials: "same-origin",
+          signal: controle.signal,
+        })
+          .then(r => r.json())
+          .then(res => preencher(res.resultados || []))
+          .catch(() => {});
+      }, 250);
+    });
+  });
+
+});
@@ -54,6 +54,28 @@ document.addEventListener("DOMContentLoaded", async () => {
   medicoSelect.disabled = true;
   btnConfirmar.disabled = true;
 
+  // ========================================================
+  // CALENDÁRIO — dias com horários livres do médico
+  // ========================================================
+  let calendario = {};
+
+  function carregarCalendario(medicoId) {
+    calendario = {};
+    if (!medicoId) return;
+
+    fetch(`/consultas/calendario_disponibilidade/?medico_id=${medicoId}&inicio=${hoje}`)
+      .then(r => r.json())
+      .then(res => {
+        (res.dias || []).forEach(d => { calendario[d.data] = d; });
+      })
+      .catch(() => {});
+  }
+
+  function proximoDiaLivre(data) {
+    const dia = Object.values(calendario).find(d => d.data > data && d.livres > 0);
+    return dia ? dia.data.split("-").reverse().join("/") : null;
+  }
+
   // ========================================================
   // MODO EDIÇÃO — CARREGAMENTO AUTOMÁTICO
   // ========================================================
@@ -99,13 +121,8 @@ document.addEventListener("DOMContentLoaded", async () => {
 
         grade.innerHTML = "";
 
-        const horarios = [
-          "08:00","08:30","09:00","09:30",
-          "10:00","10:30","11:00","11:30",
-          "12:00","12:30","13:00","13:30",
-          "14:00","14:30","15:00","15:30",
-          "16:00","16:30"
-        ];
+        // grade do expediente do médico (livres + ocupados)
+        const horarios = res.grade || [];
 
         horarios.forEach(h => {
           const btn = document.createElement("button");
@@ -190,6 +207,8 @@ document.addEventListener("DOMContentLoaded", async () => {
     }
 
     grade.innerHTML = '<span class="text-muted small">Selecione uma data.</span>';
+
+    carregarCalendario(medicoSelect.value);
   });
 
   // ========================================================
@@ -204,6 +223,17 @@ document.addEventListener("DOMContentLoaded", async () => {
 
     if (!data || !medico) return;
 
+    // dia lotado segundo o calendário → não consulta o servidor
+    const diaCalendario = calendario[data];
+    if (diaCalendario && diaCalendario.livres === 0) {
+      const proximo = proximoDiaLivre(data);
+      grade.innerHTML = `<span class="text-muted small">Nenhum horário livre neste dia.${
+        proximo ? ` Próximo dia disponível: ${proximo}.` : ""
+      }</span>`;
+      btnConfirmar.disabled = true;
+      return;
+    }
+
     grade.innerHTML = '<span class="text-muted small">Carregando horários...</span>';
 
     fetch(`/consultas/horarios_disponiveis/?medico_id=${medico}&data=${data}`)
@@ -212,13 +242,8 @@ document.addEventListener("DOMContentLoaded", async () => {
 
         grade.innerHTML = "";
 
-        const horarios = [
-          "08:00","08:30","09:00","09:30",
-          "10:00","10:30","11:00","11:30",
-          "12:00","12:30","13:00","13:30",
-          "14:00","14:30","15:00","15:30",
-          "16:00","16:30"
-        ];
+        // grade do expediente do médico (livres + ocupados)
+        const horarios = res.grade || [];
 
         horarios.forEach(h => {
           const btn = document.createElement("button");